@@ -0,0 +1,523 @@
+"""
+Performance benchmarks for every core_helpers subsystem.
+
+Run all benchmarks and compare them against the tracked baseline:
+
+    python -m benchmarks.run
+
+Options:
+    --update-baseline    Store the current results as the new baseline.
+    --threshold FACTOR   Allowed slowdown factor before a result is reported
+                         as a regression (defaults to the baseline's value).
+    --delay SECONDS      Latency of the stub API server used by check_updates.
+    -k PATTERN           Only run benchmarks whose name contains PATTERN.
+
+The command exits with a non-zero status when a regression is detected.
+"""
+
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import timeit
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Any, Callable, NamedTuple
+from unittest import mock
+
+from tests.stub_server import REPO_URLS, stub_api
+
+BASELINE_FILE: Path = Path(__file__).with_name("baseline.json")
+DEFAULT_THRESHOLD = 1.5
+
+
+class Benchmark(NamedTuple):
+    name: str
+    unit: str
+    higher_is_better: bool
+    func: Callable[[argparse.Namespace], float]
+
+
+BENCHMARKS: list[Benchmark] = []
+
+
+def benchmark(
+    name: str, unit: str = "ms", higher_is_better: bool = False
+) -> Callable[[Callable[[argparse.Namespace], float]], Callable]:
+    """
+    Register a benchmark function.
+
+    Args:
+        name (str): The name of the benchmark.
+        unit (str): The unit of the returned value.
+        higher_is_better (bool): Whether larger values are better.
+    """
+
+    def decorator(func: Callable[[argparse.Namespace], float]) -> Callable:
+        BENCHMARKS.append(Benchmark(name, unit, higher_is_better, func))
+        return func
+
+    return decorator
+
+
+def _per_call_ms(func: Callable[[], Any], number: int, repeat: int = 5) -> float:
+    """
+    Return the best per-call latency of `func` in milliseconds.
+
+    Args:
+        func (Callable[[], Any]): The function to time.
+        number (int): Number of calls per measurement.
+        repeat (int): Number of measurements.
+
+    Returns:
+        float: The fastest per-call latency observed.
+    """
+    timings: list[float] = timeit.Timer(func).repeat(repeat=repeat, number=number)
+    return min(timings) / number * 1000
+
+
+def _import_ms(pycache_prefix: str, repeat: int = 5) -> float:
+    """
+    Time `import core_helpers` in fresh interpreters.
+
+    Args:
+        pycache_prefix (str): Directory where the bytecode cache is stored.
+        repeat (int): Number of interpreters to start.
+
+    Returns:
+        float: The fastest import time in milliseconds.
+    """
+    code = (
+        "import time; start = time.perf_counter(); import core_helpers; "
+        "print((time.perf_counter() - start) * 1000)"
+    )
+    env: dict[str, str] = {**os.environ, "PYTHONPYCACHEPREFIX": pycache_prefix}
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    timings: list[float] = []
+    for _ in range(repeat):
+        output: str = subprocess.run(
+            [sys.executable, "-c", code],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        timings.append(float(output))
+    return min(timings)
+
+
+@benchmark("import.cold")
+def bench_import_cold(options: argparse.Namespace) -> float:
+    timings: list[float] = []
+    for _ in range(3):
+        # A new bytecode cache directory forces every module to be compiled
+        with tempfile.TemporaryDirectory() as pycache_prefix:
+            timings.append(_import_ms(pycache_prefix, repeat=1))
+    return min(timings)
+
+
+@benchmark("import.warm")
+def bench_import_warm(options: argparse.Namespace) -> float:
+    with tempfile.TemporaryDirectory() as pycache_prefix:
+        _import_ms(pycache_prefix, repeat=1)  # Populate the bytecode cache
+        return _import_ms(pycache_prefix)
+
+
+def _logger_throughput(
+    use_loguru: bool, binary: bool = False, redact: bool = False, sinks: int = 0
+) -> float:
+    """
+    Measure records per second written by a `LoggerProxy`.
+
+    Args:
+        use_loguru (bool): Whether to benchmark the Loguru backend.
+        binary (bool): Whether to write the binary log format.
+        redact (bool): Whether to redact secrets with the default patterns.
+        sinks (int): Number of additional log files receiving every record.
+
+    Returns:
+        float: Number of records written per second.
+    """
+    from core_helpers.logs import LoggerProxy
+    from core_helpers.sinks import FileSink
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        logger = LoggerProxy()
+        logger.setup_logger(
+            "core_helpers_bench",
+            Path(tmp_dir) / "bench.log",
+            use_loguru=use_loguru,
+            cache=False,
+            binary=binary,
+            redact=redact,
+            sinks=[FileSink(Path(tmp_dir) / f"sink{i}.log") for i in range(sinks)],
+        )
+        records = 20_000
+        per_call_ms: float = _per_call_ms(
+            lambda: logger.info("Benchmark record %d", 42), number=records, repeat=3
+        )
+        if use_loguru:
+            logger.remove()
+        else:
+            for handler in logger.handlers:
+                handler.close()
+            logger.handlers.clear()
+    return 1000 / per_call_ms
+
+
+@benchmark("logs.logging_throughput", unit="records/s", higher_is_better=True)
+def bench_logging_throughput(options: argparse.Namespace) -> float:
+    return _logger_throughput(use_loguru=False)
+
+
+@benchmark("logs.loguru_throughput", unit="records/s", higher_is_better=True)
+def bench_loguru_throughput(options: argparse.Namespace) -> float:
+    return _logger_throughput(use_loguru=True)
+
+
+@benchmark("logs.binary_throughput", unit="records/s", higher_is_better=True)
+def bench_binary_throughput(options: argparse.Namespace) -> float:
+    return _logger_throughput(use_loguru=False, binary=True)
+
+
+def _threaded_logging_throughput(threads: int) -> float:
+    """
+    Measure the records per second written by threads sharing a `LoggerProxy`.
+
+    Every thread logs through its own child logger, so the level checks, the
+    proxy and the handlers are all shared. On a free-threaded build the
+    throughput should grow with the number of threads until the file handler
+    lock saturates.
+
+    Args:
+        threads (int): Number of logging threads.
+
+    Returns:
+        float: Number of records written per second by all threads.
+    """
+    import threading
+
+    from core_helpers.logs import LoggerProxy
+
+    records_per_thread = 5_000
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        logger = LoggerProxy()
+        logger.setup_logger(
+            "core_helpers_bench", Path(tmp_dir) / "bench.log", cache=False
+        )
+        barrier = threading.Barrier(threads + 1)
+
+        def work(index: int) -> None:
+            child = logger.get_child(f"worker{index}")
+            barrier.wait()
+            for i in range(records_per_thread):
+                child.info("Benchmark record %d", i)
+                child.debug("Filtered record %d", i)
+
+        workers = [
+            threading.Thread(target=work, args=(index,)) for index in range(threads)
+        ]
+        for worker in workers:
+            worker.start()
+        barrier.wait()
+        start: float = timeit.default_timer()
+        for worker in workers:
+            worker.join()
+        elapsed: float = timeit.default_timer() - start
+
+        for handler in logger.handlers:
+            handler.close()
+        logger.handlers.clear()
+    return threads * records_per_thread / elapsed
+
+
+def _register_threaded_benchmarks() -> None:
+    for threads in (1, 2, 4, 8):
+
+        def func(options: argparse.Namespace, threads: int = threads) -> float:
+            return _threaded_logging_throughput(threads)
+
+        benchmark(
+            f"logs.threaded_throughput.{threads}",
+            unit="records/s",
+            higher_is_better=True,
+        )(func)
+
+
+_register_threaded_benchmarks()
+
+
+@benchmark("logs.redacted_throughput", unit="records/s", higher_is_better=True)
+def bench_redacted_throughput(options: argparse.Namespace) -> float:
+    return _logger_throughput(use_loguru=False, redact=True)
+
+
+@benchmark("logs.fanout_throughput", unit="records/s", higher_is_better=True)
+def bench_fanout_throughput(options: argparse.Namespace) -> float:
+    return _logger_throughput(use_loguru=False, sinks=3)
+
+
+@benchmark("rich_print.print_message")
+def bench_print_message(options: argparse.Namespace) -> float:
+    from core_helpers.rich_print import (print_error_message,
+                                         print_info_message,
+                                         print_warning_message)
+
+    def print_messages() -> None:
+        print_error_message("Benchmark error message")
+        print_warning_message("Benchmark warning message")
+        print_info_message("Benchmark info message")
+
+    with redirect_stderr(io.StringIO()):
+        return _per_call_ms(print_messages, number=100) / 3
+
+
+@benchmark("cli.setup_parser")
+def bench_setup_parser(options: argparse.Namespace) -> float:
+    from core_helpers.cli import setup_parser
+
+    return _per_call_ms(
+        lambda: setup_parser("bench", "Benchmark parser", "1.0.0"), number=500
+    )
+
+
+@benchmark("cli.setup_parser_subcommands")
+def bench_setup_parser_subcommands(options: argparse.Namespace) -> float:
+    from core_helpers.cli import Subcommand, setup_parser
+
+    # The modules do not exist: building the parser must not import them
+    subcommands = {
+        f"command{i}": Subcommand(f"bench_commands.command{i}", help=f"Command {i}.")
+        for i in range(40)
+    }
+    return _per_call_ms(
+        lambda: setup_parser(
+            "bench", "Benchmark parser", "1.0.0", subcommands=subcommands
+        ),
+        number=50,
+    )
+
+
+@benchmark("cli.parse_args")
+def bench_parse_args(options: argparse.Namespace) -> float:
+    from core_helpers.cli import setup_parser
+
+    parser, main_group = setup_parser("bench", "Benchmark parser", "1.0.0")
+    main_group.add_argument("-f", "--file", dest="file", type=str)
+    return _per_call_ms(
+        lambda: parser.parse_args(["-f", "file.txt", "-v", "-d"]), number=2000
+    )
+
+
+@benchmark("cli.format_help")
+def bench_format_help(options: argparse.Namespace) -> float:
+    from core_helpers.cli import setup_parser
+
+    parser, _ = setup_parser("bench", "Benchmark parser", "1.0.0")
+    return _per_call_ms(parser.format_help, number=100)
+
+
+@benchmark("cli.cached_help")
+def bench_cached_help(options: argparse.Namespace) -> float:
+    from core_helpers import cli
+    from core_helpers.cache import DiskCache
+    from core_helpers.cli import setup_parser
+
+    parser, _ = setup_parser("bench", "Benchmark parser", "1.0.0")
+    with (
+        tempfile.TemporaryDirectory() as cache_home,
+        mock.patch.dict(os.environ, {"XDG_CACHE_HOME": cache_home}),
+        mock.patch.object(cli, "_help_cache", DiskCache("core_helpers", "help")),
+        redirect_stdout(io.StringIO()),
+    ):
+        return _per_call_ms(
+            lambda: cli._get_help_text(parser, ("bench", "1.0.0", "default")),
+            number=100,
+        )
+
+
+@benchmark("tracing.span_disabled", unit="us")
+def bench_span_disabled(options: argparse.Namespace) -> float:
+    from core_helpers.tracing import span
+
+    def traced() -> None:
+        with span("bench"):
+            pass
+
+    return _per_call_ms(traced, number=100_000) * 1000
+
+
+@benchmark("tracing.span_histogram", unit="us")
+def bench_span_histogram(options: argparse.Namespace) -> float:
+    from core_helpers.tracing import (SpanMode, disable_tracing,
+                                      enable_tracing, span)
+
+    def traced() -> None:
+        with span("bench"):
+            pass
+
+    enable_tracing(SpanMode.HISTOGRAM)
+    try:
+        return _per_call_ms(traced, number=20_000) * 1000
+    finally:
+        disable_tracing()
+
+
+@benchmark("versions.latest_version")
+def bench_latest_version(options: argparse.Namespace) -> float:
+    from core_helpers.versions import get_latest_version
+
+    # A large tag page, parsed once then ranked again by every check
+    tags: list[str] = [
+        f"v{major}.{minor}.{patch}"
+        for major in range(10)
+        for minor in range(10)
+        for patch in range(10)
+    ]
+    return _per_call_ms(lambda: get_latest_version(tags), number=20)
+
+
+@benchmark("http_client.json_items")
+def bench_json_items(options: argparse.Namespace) -> float:
+    from core_helpers.http_client import CHUNK_SIZE, iter_json_items
+
+    # A large tag page received in network-sized chunks, of which only the
+    # names are kept
+    data: bytes = json.dumps(
+        [
+            {"name": f"v1.{index}.0", "commit": {"sha": "0" * 40, "url": "x" * 80}}
+            for index in range(10_000)
+        ]
+    ).encode()
+    chunks: list[bytes] = [
+        data[i : i + CHUNK_SIZE] for i in range(0, len(data), CHUNK_SIZE)
+    ]
+    return _per_call_ms(
+        lambda: [tag["name"] for _, tag in iter_json_items(chunks)], number=20
+    )
+
+
+@benchmark("utils.print_welcome")
+def bench_print_welcome(options: argparse.Namespace) -> float:
+    from core_helpers.utils import print_welcome
+
+    with redirect_stdout(io.StringIO()):
+        return _per_call_ms(
+            lambda: print_welcome(
+                "bench", "1.0.0", "Benchmark", "https://github.com/owner/bench"
+            ),
+            number=50,
+        )
+
+
+def _check_updates_ms(platform: str, delay: float, releases: bool) -> float:
+    """
+    Time `check_updates` against the stub API server.
+
+    Args:
+        platform (str): The platform to simulate.
+        delay (float): Latency of every stub response in seconds.
+        releases (bool): Whether the repository has releases.
+
+    Returns:
+        float: The fastest latency in milliseconds.
+    """
+    from core_helpers import updates
+    from core_helpers.updates import check_updates
+
+    # Measure the network path, not results published by a previous call
+    with (
+        stub_api(delay=delay, releases=releases),
+        mock.patch.object(updates, "SINGLE_FLIGHT_TTL", 0),
+        redirect_stdout(io.StringIO()),
+    ):
+        return _per_call_ms(
+            lambda: check_updates(REPO_URLS[platform], "1.0.0"), number=5, repeat=3
+        )
+
+
+def _register_update_benchmarks() -> None:
+    for platform in REPO_URLS:
+        for releases in (True, False):
+            suffix: str = "release" if releases else "tags"
+
+            def func(
+                options: argparse.Namespace,
+                platform: str = platform,
+                releases: bool = releases,
+            ) -> float:
+                return _check_updates_ms(platform, options.delay, releases)
+
+            benchmark(f"updates.check_updates.{platform}.{suffix}")(func)
+
+
+_register_update_benchmarks()
+
+
+def _load_baseline() -> dict[str, Any]:
+    if BASELINE_FILE.exists():
+        return json.loads(BASELINE_FILE.read_text(encoding="utf-8"))
+    return {"threshold": DEFAULT_THRESHOLD, "results": {}}
+
+
+def _is_regression(
+    bench: Benchmark, value: float, baseline: float, threshold: float
+) -> bool:
+    if bench.higher_is_better:
+        return value < baseline / threshold
+    return value > baseline * threshold
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the core_helpers benchmarks.")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=None)
+    parser.add_argument("--delay", type=float, default=0.01)
+    parser.add_argument("-k", dest="pattern", default="")
+    options: argparse.Namespace = parser.parse_args(argv)
+
+    baseline: dict[str, Any] = _load_baseline()
+    threshold: float = options.threshold or baseline.get("threshold", DEFAULT_THRESHOLD)
+
+    results: dict[str, dict[str, Any]] = {}
+    regressions: list[str] = []
+    for bench in BENCHMARKS:
+        if options.pattern not in bench.name:
+            continue
+        try:
+            value: float = bench.func(options)
+        except ImportError as e:
+            print(f"{bench.name:<45} skipped ({e})")
+            continue
+
+        results[bench.name] = {"value": round(value, 4), "unit": bench.unit}
+        line: str = f"{bench.name:<45} {value:>14.3f} {bench.unit}"
+        previous: dict[str, Any] | None = baseline["results"].get(bench.name)
+        if previous:
+            ratio: float = value / previous["value"]
+            line += f"  ({ratio:.2f}x baseline)"
+            if _is_regression(bench, value, previous["value"], threshold):
+                line += "  REGRESSION"
+                regressions.append(bench.name)
+        print(line)
+
+    if options.update_baseline:
+        baseline["threshold"] = threshold
+        baseline["results"].update(results)
+        BASELINE_FILE.write_text(
+            json.dumps(baseline, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+        )
+        print(f"Baseline written to {BASELINE_FILE}")
+        return 0
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
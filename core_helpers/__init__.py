@@ -1,20 +1,50 @@
-from core_helpers.cli import ArgparseColorThemes, setup_parser
-from core_helpers.logs import logger
-from core_helpers.rich_print import (print_error_message, print_info_message,
-                                     print_warning_message)
-from core_helpers.updates import check_updates
-from core_helpers.utils import exit_session, print_welcome
-from core_helpers.xdg_paths import get_user_path
+from core_helpers.profiling import enable_profiling, profile_phase
+
+with profile_phase("import"):
+    from core_helpers.cache import DiskCache
+    from core_helpers.cli import ArgparseColorThemes, Subcommand, setup_parser
+    from core_helpers.logs import logger
+    from core_helpers.memory import enable_memory_profiling
+    from core_helpers.rich_print import (ThrottledProgress,
+                                         enable_threaded_output,
+                                         print_error_message,
+                                         print_info_message,
+                                         print_warning_message)
+    from core_helpers.runtime_checks import (disable_runtime_checks,
+                                             enable_runtime_checks)
+    from core_helpers.scratch import ScratchSpace
+    from core_helpers.shutdown import register_shutdown_hook
+    from core_helpers.sinks import FileSink, StreamSink, SyslogSink
+    from core_helpers.tracing import SpanMode, enable_tracing, span
+    from core_helpers.updates import check_updates
+    from core_helpers.utils import exit_session, print_welcome
+    from core_helpers.xdg_paths import get_user_path
 
 __all__: list[str] = [
     "ArgparseColorThemes",
     "check_updates",
+    "disable_runtime_checks",
+    "DiskCache",
+    "enable_memory_profiling",
+    "enable_profiling",
+    "enable_runtime_checks",
+    "enable_threaded_output",
+    "enable_tracing",
     "exit_session",
+    "FileSink",
     "get_user_path",
     "logger",
     "print_error_message",
     "print_info_message",
     "print_warning_message",
     "print_welcome",
+    "register_shutdown_hook",
+    "ScratchSpace",
     "setup_parser",
+    "span",
+    "SpanMode",
+    "StreamSink",
+    "Subcommand",
+    "SyslogSink",
+    "ThrottledProgress",
 ]
@@ -0,0 +1,48 @@
+"""
+Command-line tools of core_helpers.
+
+    python -m core_helpers decode FILE [-o OUTPUT]
+
+This module is not imported by the package, so running it does not load a
+second copy of the modules it uses.
+"""
+
+import sys
+from argparse import ArgumentParser, Namespace
+from pathlib import Path
+from typing import Optional
+
+from core_helpers.binlog import decode_file
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Command-line entry point: `python -m core_helpers decode FILE`.
+
+    Args:
+        argv (list[str], optional): The arguments. Defaults to `sys.argv`.
+
+    Returns:
+        int: The exit value.
+    """
+    parser = ArgumentParser(prog="python -m core_helpers")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    decode_parser: ArgumentParser = subparsers.add_parser(
+        "decode", help="Convert a binary log file to text."
+    )
+    decode_parser.add_argument("file", type=Path, help="The binary log file.")
+    decode_parser.add_argument(
+        "-o", "--output", type=Path, help="The text file to write (default: stdout)."
+    )
+    args: Namespace = parser.parse_args(argv)
+
+    try:
+        decode_file(args.file, args.output)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+"""
+Compact binary log format.
+
+A binary log file starts with a magic header and contains a sequence of
+length-prefixed frames:
+
+- Session frames reset the string dictionary, each process appending to the
+  file starts one.
+- String frames add a format string to the dictionary of the session. Every
+  format string is stored once, records refer to it by ID.
+- Record frames hold the timestamp, the level, the format string ID and the
+  packed arguments of one record, and optionally the exception text.
+
+Writing a record only packs its arguments, the message is formatted when the
+file is decoded with `python -m core_helpers decode FILE`. Records with other
+arguments than None, bool, int, float and str are formatted right away, so
+that the decoded message matches the one of the other handlers.
+"""
+
+import logging
+import struct
+import time
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+MAGIC = b"CHBL\x01"
+
+FRAME_SESSION = 0
+FRAME_STRING = 1
+FRAME_RECORD = 2
+
+# Frame type and payload length
+_FRAME_HEADER = struct.Struct("<BI")
+# Timestamp, level number, format string ID and number of arguments
+_RECORD_HEADER = struct.Struct("<dHIB")
+_STRING_ID = struct.Struct("<I")
+_INT = struct.Struct("<q")
+_FLOAT = struct.Struct("<d")
+_LENGTH = struct.Struct("<I")
+
+# Format string ID used for messages that are not interned
+LITERAL_ID = 0
+# Maximum number of format strings interned per session, messages built with
+# f-strings would otherwise grow the dictionary forever
+MAX_INTERNED_STRINGS = 65536
+
+# Records with more arguments are formatted right away
+MAX_ARGS = 255
+
+_FORMATTER = logging.Formatter()
+
+
+def _pack_str(value: str) -> bytes:
+    data: bytes = value.encode("utf-8", "backslashreplace")
+    return _LENGTH.pack(len(data)) + data
+
+
+def _pack_arg(arg: object) -> Optional[bytes]:
+    """
+    Pack a record argument with a one-byte type tag.
+
+    Args:
+        arg (object): The argument.
+
+    Returns:
+        bytes | None: The packed argument, or None for objects other than
+            None, bool, 64-bit int, float and str. Their subclasses are not
+            packed either, an `IntEnum` member is not formatted like its value.
+    """
+    if type(arg) is str:
+        return b"s" + _pack_str(arg)
+    if type(arg) is int:
+        if -(2**63) <= arg < 2**63:
+            return b"i" + _INT.pack(arg)
+        return None
+    if type(arg) is float:
+        return b"d" + _FLOAT.pack(arg)
+    if type(arg) is bool:
+        return b"t" if arg else b"f"
+    if arg is None:
+        return b"n"
+    return None
+
+
+class BinaryLogHandler(logging.Handler):
+    """
+    Logging handler writing records in the compact binary format.
+
+    The file is written through a buffer which is flushed for records at or
+    above `flush_level`, and when the handler is flushed or closed.
+
+    Args:
+        filename (str | Path): The path to the binary log file.
+        flush_level (int): Records at or above this level are flushed at once.
+    """
+
+    def __init__(self, filename: str | Path, flush_level: int = logging.ERROR) -> None:
+        super().__init__()
+        self.filename: Path = Path(filename)
+        self.flush_level: int = flush_level
+        self._file: BinaryIO = open(self.filename, "ab")
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+        self._file.write(_FRAME_HEADER.pack(FRAME_SESSION, 0))
+        self._strings: dict[str, int] = {}
+
+    def _get_string_id(self, value: str) -> int:
+        """
+        Get the dictionary ID of a format string, writing its definition the
+        first time it is seen.
+
+        Args:
+            value (str): The format string.
+
+        Returns:
+            int: Its ID, or `LITERAL_ID` if the dictionary is full.
+        """
+        string_id: int | None = self._strings.get(value)
+        if string_id is None:
+            if len(self._strings) >= MAX_INTERNED_STRINGS:
+                return LITERAL_ID
+            string_id = self._strings[value] = len(self._strings) + 1
+            payload: bytes = _STRING_ID.pack(string_id) + value.encode(
+                "utf-8", "backslashreplace"
+            )
+            self._file.write(_FRAME_HEADER.pack(FRAME_STRING, len(payload)) + payload)
+        return string_id
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            msg: str = str(record.msg)
+            args: tuple = record.args if isinstance(record.args, tuple) else ()
+            if record.args and not args:
+                # Mapping arguments are formatted right away
+                msg, args = record.getMessage(), ()
+
+            string_id: int = LITERAL_ID
+            packed_args: list[bytes] = []
+            if len(args) <= MAX_ARGS:
+                for arg in args:
+                    packed: Optional[bytes] = _pack_arg(arg)
+                    if packed is None:
+                        break
+                    packed_args.append(packed)
+                else:
+                    string_id = self._get_string_id(msg)
+            if string_id == LITERAL_ID:
+                # Other objects must be formatted while they are available
+                packed_args = [b"s" + _pack_str(record.getMessage())]
+
+            exc_text: str = ""
+            if record.exc_info:
+                exc_text = (self.formatter or _FORMATTER).formatException(
+                    record.exc_info
+                )
+
+            payload: bytes = b"".join(
+                [
+                    _RECORD_HEADER.pack(
+                        record.created, record.levelno, string_id, len(packed_args)
+                    ),
+                    *packed_args,
+                    _pack_str(exc_text),
+                ]
+            )
+            self._file.write(_FRAME_HEADER.pack(FRAME_RECORD, len(payload)) + payload)
+            if record.levelno >= self.flush_level:
+                self._file.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        with self.lock:
+            if not self._file.closed:
+                self._file.flush()
+
+    def close(self) -> None:
+        with self.lock:
+            if not self._file.closed:
+                self._file.close()
+        super().close()
+
+
+def _unpack_arg(data: bytes, offset: int) -> tuple[object, int]:
+    """
+    Unpack an argument packed by `_pack_arg`.
+
+    Args:
+        data (bytes): The record payload.
+        offset (int): The offset of the argument's type tag.
+
+    Returns:
+        tuple[object, int]: The argument and the offset following it.
+    """
+    tag: bytes = data[offset : offset + 1]
+    offset += 1
+    if tag == b"n":
+        return None, offset
+    if tag in (b"t", b"f"):
+        return tag == b"t", offset
+    if tag == b"i":
+        return _INT.unpack_from(data, offset)[0], offset + _INT.size
+    if tag == b"d":
+        return _FLOAT.unpack_from(data, offset)[0], offset + _FLOAT.size
+    if tag == b"s":
+        return _unpack_str(data, offset)
+    raise ValueError(f"Unknown argument type: {tag!r}")
+
+
+def _unpack_str(data: bytes, offset: int) -> tuple[str, int]:
+    (length,) = _LENGTH.unpack_from(data, offset)
+    offset += _LENGTH.size
+    return data[offset : offset + length].decode("utf-8"), offset + length
+
+
+def _format_time(created: float) -> str:
+    """
+    Format a timestamp like `logging.Formatter`'s default `asctime`.
+
+    Args:
+        created (float): The record creation time.
+
+    Returns:
+        str: The formatted time.
+    """
+    msecs: int = int((created - int(created)) * 1000)
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(created)) + f",{msecs:03d}"
+
+
+def decode(stream: BinaryIO) -> Iterator[str]:
+    """
+    Decode a binary log into text lines.
+
+    Args:
+        stream (BinaryIO): The binary log file.
+
+    Yields:
+        str: One `[asctime] LEVEL: message` line per record.
+
+    Raises:
+        ValueError: If the stream is not a binary log, or a frame is corrupted.
+    """
+    if stream.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a core_helpers binary log file")
+
+    strings: dict[int, str] = {}
+    while True:
+        header: bytes = stream.read(_FRAME_HEADER.size)
+        if len(header) < _FRAME_HEADER.size:
+            return  # End of file, or a frame truncated by a crash
+        frame_type, length = _FRAME_HEADER.unpack(header)
+        payload: bytes = stream.read(length)
+        if len(payload) < length:
+            return
+
+        if frame_type == FRAME_SESSION:
+            strings = {}
+        elif frame_type == FRAME_STRING:
+            try:
+                (string_id,) = _STRING_ID.unpack_from(payload)
+            except struct.error as e:
+                raise ValueError(f"Corrupted string frame: {e}") from e
+            strings[string_id] = payload[_STRING_ID.size :].decode("utf-8")
+        elif frame_type == FRAME_RECORD:
+            args: list[object] = []
+            try:
+                created, levelno, string_id, nargs = _RECORD_HEADER.unpack_from(payload)
+                offset: int = _RECORD_HEADER.size
+                for _ in range(nargs):
+                    arg, offset = _unpack_arg(payload, offset)
+                    args.append(arg)
+                exc_text, offset = _unpack_str(payload, offset)
+            except struct.error as e:
+                raise ValueError(f"Corrupted record frame: {e}") from e
+
+            msg: str = strings.get(string_id, "%s") if string_id else "%s"
+            if args:
+                try:
+                    msg = msg % tuple(args)
+                except (TypeError, ValueError):
+                    msg = " ".join([msg, *map(str, args)])
+            line: str = (
+                f"[{_format_time(created)}] {logging.getLevelName(levelno)}: {msg}"
+            )
+            if exc_text:
+                line += "\n" + exc_text
+            yield line
+
+
+def decode_file(path: str | Path, output: Optional[str | Path] = None) -> None:
+    """
+    Decode a binary log file to text.
+
+    Args:
+        path (str | Path): The binary log file.
+        output (str | Path, optional): The text file to write. Defaults to None
+            (print to stdout).
+    """
+    with open(path, "rb") as stream:
+        if output is None:
+            for line in decode(stream):
+                print(line)
+            return
+        with open(output, "w", encoding="utf-8") as out:
+            for line in decode(stream):
+                out.write(line + "\n")
@@ -0,0 +1,245 @@
+"""
+Size-bounded key-value disk cache.
+
+Entries are stored as one file each in a directory of the package's cache
+path. Writes are atomic (written to a temporary file, then renamed), so
+concurrent processes can share a cache. When the total size exceeds the cap,
+the least recently used entries are evicted.
+
+Values are serialized with pickle: only cache data produced by the same user,
+the cache directory must not be writable by others.
+"""
+
+import functools
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, NamedTuple, Optional, TypeVar
+
+from core_helpers.xdg_paths import PathType, get_user_path
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Default total size of a cache
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+# Entries are evicted until the cache is below this fraction of its cap
+EVICTION_TARGET = 0.9
+
+_MISSING = object()
+_SUFFIX = ".cache"
+
+
+class CacheStats(NamedTuple):
+    """Hit and miss statistics of a `DiskCache` in the current process."""
+
+    hits: int
+    misses: int
+    evictions: int
+
+
+class DiskCache:
+    """
+    Key-value cache stored in `get_user_path(package, PathType.CACHE) / name`.
+
+    The directory is only created when the cache is first used. If it cannot be
+    created, every lookup is a miss and every write is skipped.
+
+    Args:
+        package (str): The name of the package or project.
+        name (str): The name of the cache directory. Defaults to "cache".
+        max_size (int): The maximum total size of the entries in bytes.
+        default_ttl (float | None): Seconds an entry stays valid, None for no
+            expiration. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        package: str,
+        name: str = "cache",
+        max_size: int = DEFAULT_MAX_SIZE,
+        default_ttl: Optional[float] = None,
+    ) -> None:
+        self.package: str = package
+        self.name: str = name
+        self.max_size: int = max_size
+        self.default_ttl: Optional[float] = default_ttl
+        self._directory: Optional[Path] = None
+        # Estimated total size, None until the directory has been scanned
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+        self._hits: int = 0
+        self._misses: int = 0
+        self._evictions: int = 0
+
+    @property
+    def directory(self) -> Path:
+        """The directory holding the entries."""
+        if self._directory is None:
+            directory: Path = get_user_path(self.package, PathType.CACHE) / self.name
+            directory.mkdir(parents=True, exist_ok=True)
+            self._directory = directory
+        return self._directory
+
+    def _get_path(self, key: str) -> Path:
+        digest: str = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / (digest + _SUFFIX)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Get the value of a key.
+
+        Args:
+            key (str): The key.
+            default (Any): Returned if the key is missing or expired.
+
+        Returns:
+            Any: The cached value, or `default`.
+        """
+        try:
+            path: Path = self._get_path(key)
+            with open(path, "rb") as cache_file:
+                expires_at, value = pickle.load(cache_file)
+        except OSError:
+            self._misses += 1
+            return default
+        except Exception:
+            # Corrupted entry, or a pickled class that was renamed or removed
+            self._misses += 1
+            path.unlink(missing_ok=True)
+            return default
+
+        if expires_at is not None and expires_at <= time.time():
+            self._misses += 1
+            path.unlink(missing_ok=True)
+            return default
+
+        self._hits += 1
+        try:
+            # The modification time tracks the last use for LRU eviction
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store the value of a key, evicting old entries if the cache is full.
+
+        Failing to write the entry (e.g. on a full disk) is silently ignored.
+
+        Args:
+            key (str): The key.
+            value (Any): The value, which must be picklable.
+            ttl (float | None): Seconds the entry stays valid. Defaults to the
+                cache's `default_ttl`.
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at: Optional[float] = None if ttl is None else time.time() + ttl
+        data: bytes = pickle.dumps((expires_at, value), pickle.HIGHEST_PROTOCOL)
+        try:
+            path: Path = self._get_path(key)
+            with tempfile.NamedTemporaryFile(
+                dir=path.parent, suffix=".tmp", delete=False
+            ) as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_file.name, path)
+        except OSError:
+            # A cache is only an optimization, never fail the caller
+            return
+
+        with self._lock:
+            if self._size is not None:
+                self._size += len(data)
+            if self._size is None or self._size > self.max_size:
+                self._evict()
+
+    def delete(self, key: str) -> None:
+        """
+        Remove a key from the cache.
+
+        Args:
+            key (str): The key.
+        """
+        try:
+            self._get_path(key).unlink(missing_ok=True)
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        """Remove every entry of the cache."""
+        try:
+            for path in self.directory.glob("*" + _SUFFIX):
+                path.unlink(missing_ok=True)
+        except OSError:
+            return
+        with self._lock:
+            self._size = 0
+
+    def stats(self) -> CacheStats:
+        """
+        Get the hit and miss statistics of this process.
+
+        Returns:
+            CacheStats: The number of hits, misses and evicted entries.
+        """
+        return CacheStats(self._hits, self._misses, self._evictions)
+
+    def _evict(self) -> None:
+        """
+        Scan the directory and remove the least recently used entries until the
+        cache is below `EVICTION_TARGET` of its cap.
+
+        Must be called with the lock held.
+        """
+        entries: list[tuple[float, int, Path]] = []
+        for path in self.directory.glob("*" + _SUFFIX):
+            try:
+                stat: os.stat_result = path.stat()
+            except FileNotFoundError:
+                continue  # Removed by another process
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        size: int = sum(entry_size for _, entry_size, _ in entries)
+        if size > self.max_size:
+            target: float = self.max_size * EVICTION_TARGET
+            for _, entry_size, path in sorted(entries):
+                if size <= target:
+                    break
+                path.unlink(missing_ok=True)
+                size -= entry_size
+                self._evictions += 1
+        self._size = size
+
+    def memoize(self, ttl: Optional[float] = None) -> Callable[[F], F]:
+        """
+        Cache the results of a function keyed by its arguments.
+
+        The arguments must have a stable `repr`.
+
+        Args:
+            ttl (float | None): Seconds a result stays valid. Defaults to the
+                cache's `default_ttl`.
+
+        Returns:
+            Callable[[F], F]: The decorator.
+        """
+
+        def decorator(func: F) -> F:
+            prefix: str = f"{func.__module__}.{func.__qualname__}"
+
+            @functools.wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                key: str = f"{prefix}:{args!r}:{sorted(kwargs.items())!r}"
+                value: Any = self.get(key, _MISSING)
+                if value is _MISSING:
+                    value = func(*args, **kwargs)
+                    self.set(key, value, ttl)
+                return value
+
+            return wrapper  # type: ignore[return-value]
+
+        return decorator
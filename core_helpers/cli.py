@@ -1,10 +1,21 @@
 """Command-line interface helper functions."""
 
-from argparse import ArgumentParser, _ArgumentGroup
+import hashlib
+import importlib
+import sys
+from argparse import (SUPPRESS, Action, ArgumentError, ArgumentParser,
+                      Namespace, _ArgumentGroup, _SubParsersAction)
 from enum import Enum
+from importlib.metadata import entry_points
+from typing import Any, Mapping, NamedTuple, Optional, Sequence
 
+from rich.console import Console
 from rich_argparse_plus import RichHelpFormatterPlus  # type: ignore
 
+from core_helpers.cache import DiskCache
+from core_helpers.profiling import profile_phase
+from core_helpers.runtime_checks import runtime_checked
+
 
 class ArgparseColorThemes(Enum):
     """
@@ -31,15 +42,325 @@ class ArgparseColorThemes(Enum):
     MOTHER_EARTH = "mother_earth"
 
 
+# Rendered help messages, keyed by the parser signature and the rendering context
+_help_cache = DiskCache("core_helpers", "help", max_size=4 * 1024 * 1024)
+
+
+def _get_parser_signature(parser: ArgumentParser) -> list[Any]:
+    """
+    Describe everything that affects the help message of a parser.
+
+    Args:
+        parser (ArgumentParser): The parser.
+
+    Returns:
+        list[Any]: The parser's texts, groups and arguments.
+    """
+    signature: list[Any] = [
+        parser.prog,
+        parser.usage,
+        parser.description,
+        parser.epilog,
+        [
+            ([action.dest for action in group._group_actions], group.required)
+            for group in parser._mutually_exclusive_groups
+        ],
+    ]
+    for group in parser._action_groups:
+        signature.append((group.title, group.description))
+        for action in group._group_actions:
+            signature.append(
+                (
+                    action.option_strings,
+                    action.dest,
+                    action.nargs,
+                    action.default,
+                    getattr(action.type, "__qualname__", action.type),
+                    action.choices,
+                    action.required,
+                    action.help,
+                    action.metavar,
+                )
+            )
+    return signature
+
+
+def _get_help_text(parser: ArgumentParser, context: tuple[str, ...]) -> str:
+    """
+    Get the help message of a parser, rendering it only if it is not cached.
+
+    Args:
+        parser (ArgumentParser): The parser.
+        context (tuple[str, ...]): The package name, version and theme.
+
+    Returns:
+        str: The rendered help message, including ANSI styles if the terminal
+            supports them.
+    """
+    width: Optional[int] = getattr(parser._get_formatter(), "_width", None)
+    key_data: str = repr(
+        [
+            context,
+            width,
+            Console().color_system,
+            sorted(RichHelpFormatterPlus.styles.items()),
+            _get_parser_signature(parser),
+        ]
+    )
+    key: str = hashlib.sha256(key_data.encode("utf-8")).hexdigest()
+
+    help_text: Optional[str] = _help_cache.get(key)
+    if help_text is None:
+        help_text = parser.format_help()
+        _help_cache.set(key, help_text)
+    return help_text
+
+
+class _CachedHelpAction(Action):
+    """
+    Like argparse's "help" action, but print a cached copy of the rendered help
+    message when the parser did not change since it was last rendered.
+
+    Args:
+        context (tuple[str, ...]): The package name, version and theme, which
+            are part of the cache key.
+    """
+
+    def __init__(
+        self,
+        option_strings: Sequence[str],
+        context: tuple[str, ...],
+        dest: str = SUPPRESS,
+        default: Any = SUPPRESS,
+        help: Optional[str] = None,
+    ) -> None:
+        super().__init__(
+            option_strings=option_strings,
+            dest=dest,
+            default=default,
+            nargs=0,
+            help=help,
+        )
+        self.context: tuple[str, ...] = context
+
+    def __call__(
+        self,
+        parser: ArgumentParser,
+        namespace: Namespace,
+        values: Any,
+        option_string: Optional[str] = None,
+    ) -> None:
+        parser._print_message(_get_help_text(parser, self.context), sys.stdout)
+        parser.exit()
+
+
+class _MemoryProfileAction(Action):
+    """
+    Enable memory profiling as soon as the option is parsed.
+
+    Args:
+        package (str): The package whose log directory receives the report.
+    """
+
+    def __init__(
+        self,
+        option_strings: Sequence[str],
+        dest: str,
+        package: str,
+        default: bool = False,
+        help: Optional[str] = None,
+    ) -> None:
+        super().__init__(
+            option_strings=option_strings,
+            dest=dest,
+            default=default,
+            nargs=0,
+            help=help,
+        )
+        self.package: str = package
+
+    def __call__(
+        self,
+        parser: ArgumentParser,
+        namespace: Namespace,
+        values: Any,
+        option_string: Optional[str] = None,
+    ) -> None:
+        from core_helpers.memory import enable_memory_profiling
+
+        enable_memory_profiling(self.package)
+        setattr(namespace, self.dest, True)
+
+
+class Subcommand(NamedTuple):
+    """
+    A subcommand whose implementation is imported only when it is selected.
+
+    The module may define `add_arguments(parser)` to add the subcommand's
+    arguments to its parser. The function is stored as `func` in the parsed
+    namespace.
+
+    Args:
+        target (str): The implementation, as "module:function". The function
+            defaults to "main".
+        help (str, optional): The help shown in the list of subcommands.
+    """
+
+    target: str
+    help: Optional[str] = None
+
+
+class _LazySubParsersAction(_SubParsersAction):
+    """
+    Subparsers action that imports the module of a lazy subcommand, and lets it
+    add its arguments, only when the subcommand is selected.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # Subcommand name -> implementation not imported yet
+        self._lazy: dict[str, Subcommand] = {}
+
+    def add_lazy_parser(self, name: str, subcommand: Subcommand) -> None:
+        """
+        Register a lazy subcommand.
+
+        Its parser is only created when the subcommand is selected, so adding
+        a subcommand costs no more than listing it in the help.
+
+        Args:
+            name (str): The subcommand name.
+            subcommand (Subcommand): Its implementation and help.
+
+        Raises:
+            ArgumentError: If the name is already used.
+        """
+        if name in self._name_parser_map:
+            raise ArgumentError(self, f"conflicting subparser: {name}")
+        # Listed even without help, the COMMAND metavar hides the choices
+        self._choices_actions.append(
+            self._ChoicesPseudoAction(name, (), subcommand.help or "")
+        )
+        self._name_parser_map[name] = None
+        self._lazy[name] = subcommand
+
+    def _load(self, name: str) -> None:
+        """
+        Create the parser of a lazy subcommand, import its implementation and
+        let it add its arguments.
+
+        Args:
+            name (str): The subcommand name.
+        """
+        subcommand: Optional[Subcommand] = self._lazy.pop(name, None)
+        if subcommand is None:
+            return
+        parser: ArgumentParser = self._parser_class(
+            prog=f"{self._prog_prefix} {name}",
+            description=subcommand.help,
+            formatter_class=RichHelpFormatterPlus,
+        )
+        self._name_parser_map[name] = parser
+
+        module_name, _, func_name = subcommand.target.partition(":")
+        with profile_phase(f"subcommand.{name}"):
+            module = importlib.import_module(module_name)
+        add_arguments = getattr(module, "add_arguments", None)
+        if add_arguments is not None:
+            add_arguments(parser)
+        parser.set_defaults(func=getattr(module, func_name or "main"))
+
+    def __call__(
+        self,
+        parser: ArgumentParser,
+        namespace: Namespace,
+        values: Any,
+        option_string: Optional[str] = None,
+    ) -> None:
+        self._load(values[0])
+        super().__call__(parser, namespace, values, option_string)
+
+
+def add_subcommands(
+    parser: ArgumentParser,
+    subcommands: Optional[Mapping[str, str | Subcommand]] = None,
+    entry_point_group: Optional[str] = None,
+) -> _LazySubParsersAction:
+    """
+    Add lazy subcommands to a parser.
+
+    Only the names and help texts are registered: the module implementing a
+    subcommand is imported when the subcommand is selected, so building the
+    parser and showing its help stay fast however many subcommands there are.
+
+    Args:
+        parser (ArgumentParser): The parser.
+        subcommands (Mapping[str, str | Subcommand], optional): The subcommand
+            names mapped to their implementation, as "module:function" or as a
+            `Subcommand`.
+        entry_point_group (str, optional): An entry point group whose entries
+            are added as subcommands, e.g. "my_package.commands".
+
+    Returns:
+        _LazySubParsersAction: The subparsers action, to add more subcommands
+            with `add_lazy_parser`.
+    """
+    action: Optional[_LazySubParsersAction] = next(
+        (
+            action
+            for action in parser._actions
+            if isinstance(action, _LazySubParsersAction)
+        ),
+        None,
+    )
+    if action is None:
+        action = parser.add_subparsers(
+            title="Commands",
+            dest="command",
+            metavar="COMMAND",
+            action=_LazySubParsersAction,
+        )
+
+    table: dict[str, Subcommand] = {}
+    if entry_point_group is not None:
+        for entry_point in entry_points(group=entry_point_group):
+            table[entry_point.name] = Subcommand(entry_point.value)
+    for name, subcommand in (subcommands or {}).items():
+        table[name] = (
+            Subcommand(subcommand) if isinstance(subcommand, str) else subcommand
+        )
+
+    for name, subcommand in table.items():
+        action.add_lazy_parser(name, subcommand)
+    return action
+
+
+@profile_phase("setup_parser")
+@runtime_checked
 def setup_parser(
     package: str,
     description: str,
     version: str,
     theme: ArgparseColorThemes = ArgparseColorThemes.DEFAULT,
+    subcommands: Optional[Mapping[str, str | Subcommand]] = None,
+    entry_point_group: Optional[str] = None,
 ) -> tuple[ArgumentParser, _ArgumentGroup]:
     """
     Create a parser with the default command-line arguments.
 
+    The help message is cached once rendered, until the arguments, the version,
+    the theme or the terminal width change.
+
+    Args:
+        package (str): The name of the package or project.
+        description (str): The program description.
+        version (str): The program version.
+        theme (ArgparseColorThemes): The help color theme.
+        subcommands (Mapping[str, str | Subcommand], optional): Lazy
+            subcommands, see `add_subcommands`.
+        entry_point_group (str, optional): Entry point group of lazy
+            subcommands, see `add_subcommands`.
+
     Returns:
         tuple[ArgumentParser, _ArgumentGroup]: The parser and the main group.
     """
@@ -61,7 +382,11 @@ def setup_parser(
     misc_group: _ArgumentGroup = parser.add_argument_group("Miscellaneous Options")
     # Help
     misc_group.add_argument(
-        "-h", "--help", action="help", help="Show this help message and exit."
+        "-h",
+        "--help",
+        action=_CachedHelpAction,
+        context=(package, version, theme.value),
+        help="Show this help message and exit.",
     )
     # Verbose
     misc_group.add_argument(
@@ -81,6 +406,14 @@ def setup_parser(
         default=False,
         help="Activate debug logs. Default is False.",
     )
+    # Memory profiling
+    misc_group.add_argument(
+        "--memory-profile",
+        dest="memory_profile",
+        action=_MemoryProfileAction,
+        package=package,
+        help="Trace memory allocations and report them at exit.",
+    )
     # Version
     misc_group.add_argument(
         "-V",
@@ -90,4 +423,7 @@ def setup_parser(
         version=f"[argparse.prog]{package}[/] version [i]{version}[/]",
     )
 
+    if subcommands or entry_point_group:
+        add_subcommands(parser, subcommands, entry_point_group)
+
     return parser, main_group
@@ -0,0 +1,669 @@
+"""
+Minimal HTTP client for the update checks.
+
+Requests are sent with `http.client`, reusing one keep-alive connection per
+host, so importing core_helpers does not import an HTTP library. When the
+optional `requests` package is installed, it is imported on the first request
+and used instead, through a shared session.
+
+`get` reads the whole body, while `stream` lets the caller read it in chunks
+with `Response.iter_content`, or decode a JSON document one top-level item at
+a time with `Response.iter_json_items`, keeping memory bounded whatever the
+size of the response:
+
+    with stream(url, max_bytes=4 * 1024 * 1024) as response:
+        for _, tag in response.iter_json_items():
+            ...
+"""
+
+import json
+import re
+import ssl
+import sys
+import threading
+import zlib
+from codecs import getincrementaldecoder
+from contextlib import contextmanager
+from http.client import (HTTPConnection, HTTPException, HTTPResponse,
+                         HTTPSConnection)
+from typing import Any, Callable, Iterable, Iterator, Mapping, Optional
+from urllib.error import HTTPError
+from urllib.parse import urljoin, urlsplit
+from urllib.request import Request, getproxies, proxy_bypass, urlopen
+
+# Use `requests` when it is installed. Set to False to always use the stdlib.
+PREFER_REQUESTS: bool = True
+USER_AGENT = "core-helpers"
+# Size of the chunks read from the network and of the decompressed chunks
+CHUNK_SIZE = 64 * 1024
+# Most redirects followed for one request, like `urllib.request`
+MAX_REDIRECTS = 10
+REDIRECT_STATUSES = frozenset({301, 302, 303, 307, 308})
+
+
+class RequestError(Exception):
+    """Raised when a request fails."""
+
+
+class HTTPStatusError(RequestError):
+    """
+    Raised for responses with an error status.
+
+    Args:
+        response (Response): The response received.
+    """
+
+    def __init__(self, response: "Response") -> None:
+        super().__init__(f"{response.status_code} error for {response.url}")
+        self.response: Response = response
+
+
+class InvalidJSONError(RequestError, ValueError):
+    """Raised when a response body is not valid JSON."""
+
+
+class ResponseTooLarge(RequestError):
+    """Raised when a response body exceeds the size allowed by the caller."""
+
+
+class Headers(dict):
+    """Response headers with case-insensitive names."""
+
+    def __init__(self, headers: Mapping[str, str] = {}) -> None:
+        super().__init__((name.lower(), value) for name, value in headers.items())
+
+    def __getitem__(self, name: str) -> str:
+        return super().__getitem__(name.lower())
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and super().__contains__(name.lower())
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return super().get(name.lower(), default)
+
+
+class Response:
+    """
+    A received response.
+
+    Args:
+        status_code (int): The HTTP status code.
+        headers (Mapping[str, str]): The response headers.
+        content (bytes | Iterable[bytes]): The decoded response body, or its
+            chunks when it is read from the network as it is consumed.
+        url (str): The requested URL.
+        max_bytes (int, optional): The largest body size accepted, in bytes.
+        on_close (Callable[[], None], optional): Called once when the
+            response is closed, to release its connection.
+    """
+
+    def __init__(
+        self,
+        status_code: int,
+        headers: Mapping[str, str],
+        content: bytes | Iterable[bytes] = b"",
+        url: str = "",
+        max_bytes: Optional[int] = None,
+        on_close: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.status_code: int = status_code
+        self.headers: Headers = Headers(headers)
+        self.url: str = url
+        self.max_bytes: Optional[int] = max_bytes
+        self._content: Optional[bytes] = None
+        self._chunks: Optional[Iterator[bytes]] = None
+        if isinstance(content, bytes):
+            self._content = content
+        else:
+            self._chunks = iter(content)
+        self._consumed: bool = False
+        self._on_close: Optional[Callable[[], None]] = on_close
+
+    @property
+    def content(self) -> bytes:
+        """The whole decoded body, read on first access."""
+        if self._content is None:
+            self._content = b"".join(self.iter_content())
+        return self._content
+
+    def iter_content(self) -> Iterator[bytes]:
+        """
+        Iterate over the decoded body, the response is closed once it is read.
+
+        A streamed body can only be iterated over once, unless `content` was
+        accessed first.
+
+        Yields:
+            bytes: The chunks of the body.
+
+        Raises:
+            ResponseTooLarge: If the body exceeds `max_bytes`.
+            RequestError: If reading the body fails or it was already read.
+        """
+        if self._content is not None:
+            yield self._content
+            return
+        if self._consumed:
+            raise RequestError(f"The body of {self.url} was already read")
+        self._consumed = True
+
+        size: int = 0
+        try:
+            for chunk in self._chunks or ():
+                size += len(chunk)
+                if self.max_bytes is not None and size > self.max_bytes:
+                    raise ResponseTooLarge(
+                        f"Response from {self.url} exceeds {self.max_bytes} bytes"
+                    )
+                yield chunk
+        finally:
+            self.close()
+
+    def iter_json_items(self) -> Iterator[tuple[Optional[str], Any]]:
+        """
+        Decode the JSON body one top-level item at a time, as it is read.
+
+        See `iter_json_items` (the module function).
+
+        Yields:
+            tuple[str | None, Any]: The key (None in an array) and the value
+                of each item.
+
+        Raises:
+            InvalidJSONError: If the body is not a valid JSON array or object.
+        """
+        return iter_json_items(self.iter_content(), self.url)
+
+    def json(self) -> Any:
+        """
+        Decode the JSON body.
+
+        Raises:
+            InvalidJSONError: If the body is not valid JSON.
+        """
+        try:
+            return json.loads(self.content)
+        except ValueError as e:
+            raise InvalidJSONError(f"Invalid JSON response from {self.url}: {e}")
+
+    def raise_for_status(self) -> None:
+        """
+        Raise an error if the status code is 400 or above.
+
+        Raises:
+            HTTPStatusError: If the response is an error.
+        """
+        if self.status_code >= 400:
+            raise HTTPStatusError(self)
+
+    def close(self) -> None:
+        """Stop reading the body and release the connection."""
+        chunks, self._chunks = self._chunks, None
+        close_chunks: Optional[Callable[[], None]] = getattr(chunks, "close", None)
+        if close_chunks is not None:
+            close_chunks()
+        on_close, self._on_close = self._on_close, None
+        if on_close is not None:
+            on_close()
+
+
+_NON_WHITESPACE = re.compile(r"[^ \t\n\r]")
+_DECODER = json.JSONDecoder()
+
+
+class _JSONReader:
+    """
+    Text buffer over the chunks of a JSON document, holding the unread part
+    of the chunks received so far.
+
+    Args:
+        chunks (Iterable[bytes]): The UTF-8 encoded document.
+        url (str): The URL of the document, for error messages.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], url: str) -> None:
+        self.chunks: Iterator[bytes] = iter(chunks)
+        self.url: str = url
+        self.decoder = getincrementaldecoder("utf-8-sig")()
+        self.buffer: str = ""
+        self.pos: int = 0
+        self.eof: bool = False
+
+    def _fill(self, min_size: int = 1) -> bool:
+        """
+        Read chunks until `min_size` more characters are buffered.
+
+        Returns:
+            bool: False if the document ended before any character was added.
+        """
+        self.buffer = self.buffer[self.pos :]
+        self.pos = 0
+        target: int = len(self.buffer) + min_size
+        added: bool = False
+        while not self.eof and len(self.buffer) < target:
+            try:
+                chunk: Optional[bytes] = next(self.chunks, None)
+                if chunk is None:
+                    self.eof = True
+                    text: str = self.decoder.decode(b"", final=True)
+                else:
+                    text = self.decoder.decode(chunk)
+            except UnicodeDecodeError as e:
+                raise self.error(str(e)) from e
+            if text:
+                self.buffer += text
+                added = True
+        return added
+
+    def error(self, reason: str) -> InvalidJSONError:
+        return InvalidJSONError(f"Invalid JSON response from {self.url}: {reason}")
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character, "" at the end."""
+        if self.pos < len(self.buffer) and self.buffer[self.pos] not in " \t\n\r":
+            return self.buffer[self.pos]
+        while True:
+            match: Optional[re.Match[str]] = _NON_WHITESPACE.search(
+                self.buffer, self.pos
+            )
+            if match is not None:
+                self.pos = match.start()
+                return self.buffer[self.pos]
+            self.pos = len(self.buffer)
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise self.error(f"expected {char!r} at offset {self.pos}")
+        self.pos += 1
+
+    def decode(self) -> Any:
+        """Decode the next value, reading chunks until it is complete."""
+        self.peek()
+        while True:
+            start: int = self.pos
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, start)
+            except json.JSONDecodeError as e:
+                pending: int = len(self.buffer) - self.pos
+                # The value may be cut, double the buffer so a large value is
+                # not decoded again for every chunk
+                if self._fill(max(pending, CHUNK_SIZE)):
+                    continue
+                raise self.error(
+                    e.msg if pending else "unexpected end of document"
+                ) from e
+            # A number may be cut too (e.g. "1" of "1.5e3"), yet decode
+            if (
+                isinstance(value, (int, float))
+                and not isinstance(value, bool)
+                and len(self.buffer) - end <= 2
+                and self._fill()
+            ):
+                continue
+            # Filling moves the unread text to the start of the buffer
+            self.pos += end - start
+            return value
+
+
+def iter_json_items(
+    chunks: Iterable[bytes], url: str = ""
+) -> Iterator[tuple[Optional[str], Any]]:
+    """
+    Decode a JSON array or object one top-level item at a time, as its chunks
+    are received.
+
+    Only the item being decoded and the unread part of the current chunk are
+    held in memory, so the consumer can keep a few fields of each item and
+    stop early without the whole document ever being built.
+
+    Args:
+        chunks (Iterable[bytes]): The UTF-8 encoded document.
+        url (str): The URL of the document, for error messages.
+
+    Yields:
+        tuple[str | None, Any]: The key (None in an array) and the value of
+            each item.
+
+    Raises:
+        InvalidJSONError: If the document is not a valid JSON array or object.
+    """
+    reader = _JSONReader(chunks, url)
+    opening: str = reader.peek()
+    if opening not in ("[", "{"):
+        raise reader.error("expected an array or an object")
+    closing: str = "]" if opening == "[" else "}"
+    reader.pos += 1
+
+    if reader.peek() == closing:
+        reader.pos += 1
+    else:
+        while True:
+            if opening == "[":
+                yield None, reader.decode()
+            else:
+                if reader.peek() != '"':
+                    raise reader.error(f"expected a key at offset {reader.pos}")
+                key: str = reader.decode()
+                reader.expect(":")
+                yield key, reader.decode()
+            separator: str = reader.peek()
+            if separator not in (",", closing):
+                raise reader.error(
+                    f"expected ',' or {closing!r} at offset {reader.pos}"
+                )
+            reader.pos += 1
+            if separator == closing:
+                break
+    if reader.peek():
+        raise reader.error("extra data after the document")
+
+
+# Idle keep-alive connections, keyed by (scheme, host, port)
+_connections: dict[tuple[str, str, int], list[HTTPConnection]] = {}
+_connections_lock = threading.Lock()
+_ssl_context: Optional[ssl.SSLContext] = None
+_session: Any = None
+
+
+def _get_session() -> Any:
+    """
+    Get the shared `requests` session, importing requests on the first call.
+
+    Returns:
+        requests.Session | None: The session, or None if requests is not
+            installed or not preferred.
+    """
+    global _session
+    if not PREFER_REQUESTS:
+        return None
+    if _session is None:
+        try:
+            import requests
+        except ImportError:
+            return None
+        with _connections_lock:
+            if _session is None:
+                _session = requests.Session()
+    return _session
+
+
+def _get_connection(
+    scheme: str, host: str, port: int, timeout: float
+) -> tuple[HTTPConnection, bool]:
+    """
+    Take an idle connection to a host, or open a new one.
+
+    Args:
+        scheme (str): "http" or "https".
+        host (str): The host name.
+        port (int): The port.
+        timeout (float): The socket timeout in seconds.
+
+    Returns:
+        tuple[HTTPConnection, bool]: The connection and whether it was reused.
+    """
+    global _ssl_context
+    with _connections_lock:
+        idle: list[HTTPConnection] = _connections.get((scheme, host, port), [])
+        if idle:
+            connection: HTTPConnection = idle.pop()
+            connection.timeout = timeout
+            if connection.sock is not None:
+                connection.sock.settimeout(timeout)
+            return connection, True
+        if scheme == "https" and _ssl_context is None:
+            _ssl_context = ssl.create_default_context()
+
+    if scheme == "https":
+        return HTTPSConnection(host, port, timeout=timeout, context=_ssl_context), False
+    return HTTPConnection(host, port, timeout=timeout), False
+
+
+def _release_connection(
+    scheme: str, host: str, port: int, connection: HTTPConnection
+) -> None:
+    with _connections_lock:
+        _connections.setdefault((scheme, host, port), []).append(connection)
+
+
+def close_connections() -> None:
+    """Close the idle keep-alive connections."""
+    with _connections_lock:
+        connections: list[HTTPConnection] = [
+            connection for idle in _connections.values() for connection in idle
+        ]
+        _connections.clear()
+    for connection in connections:
+        connection.close()
+
+
+def _iter_body(
+    read: Callable[[int], bytes], encoding: Optional[str], url: str
+) -> Iterator[bytes]:
+    """
+    Read a body in chunks, decompressing it when it is gzip encoded.
+
+    The decompressed chunks are at most `CHUNK_SIZE` bytes long, so a small
+    compressed chunk never expands to a large one.
+    """
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    try:
+        while data := read(CHUNK_SIZE):
+            if encoding != "gzip":
+                yield data
+                continue
+            while data:
+                chunk: bytes = decompressor.decompress(data, CHUNK_SIZE)
+                if chunk:
+                    yield chunk
+                data = decompressor.unconsumed_tail
+        if encoding == "gzip" and (tail := decompressor.flush()):
+            yield tail
+    except (HTTPException, OSError, zlib.error) as e:
+        raise RequestError(f"Reading the response from {url} failed: {e}") from e
+
+
+def _open_stdlib(
+    url: str, headers: dict[str, str], timeout: float, max_bytes: Optional[int]
+) -> Response:
+    """
+    Send a GET request with the stdlib, following up to `MAX_REDIRECTS`
+    redirects like `requests` does.
+
+    The headers given by the caller, such as credentials, are only sent to the
+    host of the original URL.
+    """
+    origin: tuple[str, Optional[str], Optional[int]] = _get_origin(url)
+    for _ in range(MAX_REDIRECTS + 1):
+        response: Response = _send_stdlib(url, headers, timeout, max_bytes)
+        location: Optional[str] = response.headers.get("Location")
+        if response.status_code not in REDIRECT_STATUSES or not location:
+            return response
+        response.close()  # Releases the connection for the next request
+        url = urljoin(url, location)
+        if _get_origin(url) != origin:
+            headers = {}
+    raise RequestError(f"Too many redirects, last to {url}")
+
+
+def _get_origin(url: str) -> tuple[str, Optional[str], Optional[int]]:
+    parts = urlsplit(url)
+    return parts.scheme, parts.hostname, parts.port
+
+
+def _send_stdlib(
+    url: str, headers: dict[str, str], timeout: float, max_bytes: Optional[int]
+) -> Response:
+    """
+    Send one GET request with `http.client`, reusing a connection to the host.
+
+    The connection is released once the body is read, or closed if the
+    response is closed before.
+
+    Requests going through a proxy configured in the environment are sent
+    with `urllib.request` instead, without connection reuse.
+    """
+    parts = urlsplit(url)
+    scheme: str = parts.scheme
+    host: str = parts.hostname or ""
+    port: int = parts.port or (443 if scheme == "https" else 80)
+    headers = {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip", **headers}
+
+    if scheme in getproxies() and not proxy_bypass(host):
+        try:
+            proxied = urlopen(Request(url, headers=headers), timeout=timeout)
+        except HTTPError as e:
+            proxied = e  # Error statuses are responses too
+        except (HTTPException, OSError) as e:
+            raise RequestError(f"Request to {url} failed: {e}") from e
+        return Response(
+            proxied.status,
+            proxied.headers,
+            _iter_body(proxied.read, proxied.headers.get("Content-Encoding"), url),
+            url,
+            max_bytes,
+            proxied.close,
+        )
+
+    path: str = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+
+    for attempt in range(2):
+        connection, reused = _get_connection(scheme, host, port, timeout)
+        try:
+            connection.request("GET", path, headers=headers)
+            reply = connection.getresponse()
+        except (HTTPException, OSError) as e:
+            connection.close()
+            if reused and attempt == 0:
+                continue  # The server closed the idle connection, retry once
+            raise RequestError(f"Request to {url} failed: {e}") from e
+
+        def on_close(
+            connection: HTTPConnection = connection, reply: HTTPResponse = reply
+        ) -> None:
+            # Drain a short unread body (e.g. of an error status) to keep the
+            # connection, a longer one is not worth waiting for
+            if reply.length is not None and reply.length <= CHUNK_SIZE:
+                try:
+                    reply.read()
+                except (HTTPException, OSError):
+                    pass
+            if reply.isclosed() and not reply.will_close:
+                _release_connection(scheme, host, port, connection)
+            else:
+                connection.close()
+
+        return Response(
+            reply.status,
+            reply.headers,
+            _iter_body(reply.read, reply.headers.get("Content-Encoding"), url),
+            url,
+            max_bytes,
+            on_close,
+        )
+    raise AssertionError("unreachable")
+
+
+def _open(
+    url: str,
+    headers: Optional[dict[str, str]],
+    timeout: float,
+    max_bytes: Optional[int],
+) -> Response:
+    """Send a GET request, returning the response before its body is read."""
+    session = _get_session()
+    if session is None:
+        return _open_stdlib(url, headers or {}, timeout, max_bytes)
+
+    requests = sys.modules["requests"]
+    try:
+        reply = session.get(url, headers=headers, timeout=timeout, stream=True)
+    except requests.exceptions.RequestException as e:
+        raise RequestError(f"Request to {url} failed: {e}") from e
+
+    def iter_body() -> Iterator[bytes]:
+        try:
+            yield from reply.iter_content(CHUNK_SIZE)
+        except requests.exceptions.RequestException as e:
+            raise RequestError(f"Reading the response from {url} failed: {e}") from e
+
+    def on_close() -> None:
+        # Drain a short unread body to keep the connection, as with the stdlib
+        remaining: Optional[int] = getattr(reply.raw, "length_remaining", None)
+        if remaining is not None and remaining <= CHUNK_SIZE:
+            drain_conn: Optional[Callable[[], None]] = getattr(
+                reply.raw, "drain_conn", None
+            )
+            if drain_conn is not None:
+                drain_conn()  # Ignores connection errors
+        reply.close()
+
+    return Response(
+        reply.status_code, reply.headers, iter_body(), url, max_bytes, on_close
+    )
+
+
+def get(
+    url: str,
+    headers: Optional[dict[str, str]] = None,
+    timeout: float = 10.0,
+    max_bytes: Optional[int] = None,
+) -> Response:
+    """
+    Send a GET request and read the whole body.
+
+    Args:
+        url (str): The URL to request.
+        headers (dict[str, str], optional): Extra request headers.
+        timeout (float): The connection and read timeout in seconds.
+        max_bytes (int, optional): The largest body size accepted, in bytes.
+
+    Returns:
+        Response: The response, whatever its status code.
+
+    Raises:
+        RequestError: If the request could not be sent or answered.
+        ResponseTooLarge: If the body exceeds `max_bytes`.
+    """
+    response: Response = _open(url, headers, timeout, max_bytes)
+    try:
+        response.content
+    finally:
+        response.close()
+    return response
+
+
+@contextmanager
+def stream(
+    url: str,
+    headers: Optional[dict[str, str]] = None,
+    timeout: float = 10.0,
+    max_bytes: Optional[int] = None,
+) -> Iterator[Response]:
+    """
+    Send a GET request and read the body as it is consumed.
+
+    The response is closed on exit, even if its body was not fully read.
+
+    Args:
+        url (str): The URL to request.
+        headers (dict[str, str], optional): Extra request headers.
+        timeout (float): The connection and read timeout in seconds.
+        max_bytes (int, optional): The largest body size accepted, in bytes.
+            Reading more raises `ResponseTooLarge`.
+
+    Yields:
+        Response: The response, whatever its status code.
+
+    Raises:
+        RequestError: If the request could not be sent or answered.
+    """
+    response: Response = _open(url, headers, timeout, max_bytes)
+    try:
+        yield response
+    finally:
+        response.close()
@@ -1,17 +1,27 @@
 """Logging configuration."""
 
+import atexit
+import json
 import logging
+import signal
+import threading
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from core_helpers.binlog import BinaryLogHandler
+from core_helpers.profiling import profile_phase
+from core_helpers.redaction import Redactor
+from core_helpers.runtime_checks import runtime_checked
+from core_helpers.shutdown import register_shutdown_hook
+from core_helpers.sinks import (FanOutHandler, FileSink, Sink, StreamSink,
+                                SyslogSink)
+from core_helpers.xdg_paths import PathType, get_user_path
 
 if TYPE_CHECKING:
     from loguru import Logger
 
-try:
-    from typeguard import typechecked
-except ImportError:
-    # Fallback for type checking if typeguard is not installed
-    typechecked = lambda x: x
+# Per-module levels file looked up in the package's config directory
+LOG_LEVELS_FILE = "log_levels.json"
 
 
 class LoggerProxy:
@@ -21,10 +31,26 @@ class LoggerProxy:
     This class allows for a unified interface to access either standard logging
     or Loguru logging. It supports lazy initialization and caching of the
     logger instance.
+
+    The proxy is safe to share between threads, including on free-threaded
+    Python builds. Configuration changes are serialized by a lock and publish
+    new immutable state with a single attribute assignment, so logging and
+    level checks never take a lock.
     """
 
     def __init__(self) -> None:
         self._logger: logging.Logger | Logger | None = None
+        self._package: str = ""
+        # Module levels, keyed by name relative to the package ("" for the
+        # package itself), and the effective level of each module resolved
+        # from them. Replaced as a whole so readers always see a matching pair.
+        self._level_state: tuple[dict[str, int], dict[str, int]] = ({}, {})
+        self._redactor: Optional[Redactor] = None
+        # Sinks added to Loguru, flushed with the logger
+        self._loguru_sinks: list[Sink] = []
+        self._flush_at_exit: bool = False
+        # Serializes setup_logger and the level changes
+        self._lock = threading.RLock()
 
     def is_initialized(self) -> bool:
         """
@@ -35,7 +61,8 @@ class LoggerProxy:
         """
         return self._logger is not None
 
-    @typechecked
+    @profile_phase("logger.setup_logger")
+    @runtime_checked
     def setup_logger(
         self,
         package: str,
@@ -44,6 +71,10 @@ class LoggerProxy:
         verbose: bool = False,
         use_loguru: bool = False,
         cache: bool = True,
+        binary: bool = False,
+        redact: bool | Redactor = False,
+        sinks: Optional[list[Sink]] = None,
+        syslog: bool | SyslogSink = False,
     ) -> None:
         """
         Set up a configured logger instance using either `logging` or `loguru`.
@@ -55,16 +86,69 @@ class LoggerProxy:
             verbose (bool): Whether to enable verbose logging.
             use_loguru (bool): Whether to use `loguru` instead of the standard `logging` module.
             cache (bool): Whether to use the cached logger instance.
+            binary (bool): Whether to write the log file in the compact binary
+                format (standard `logging` only). Decode it with
+                `python -m core_helpers decode`.
+            redact (bool | Redactor): Whether to redact tokens, passwords and
+                emails from the records, or the `Redactor` to apply.
+            sinks (list[Sink], optional): Additional destinations of the
+                records, e.g. ``FileSink("errors.log", level="ERROR")``.
+            syslog (bool | SyslogSink): Whether to send the records to the
+                local journal or syslog daemon instead of the log file, or the
+                `SyslogSink` to use. The log file is only written while the
+                daemon socket is unavailable.
+
+        Raises:
+            ValueError: If the binary format is requested with `loguru` or
+                `syslog`.
         """
-        if use_loguru:
-            # Use Loguru for logging
-            self._set_loguru_logger(log_file, debug, verbose)
-        else:
-            # Use standard logging
-            self._set_logging_logger(package, log_file, debug, verbose, cache)
+        if binary and use_loguru:
+            raise ValueError(
+                "The binary log format requires the standard logging module."
+            )
+        if binary and syslog:
+            raise ValueError("The binary log format cannot be sent to syslog.")
+
+        with self._lock:
+            self._package = package
+            self._level_state = ({"": logging.DEBUG if debug else logging.INFO}, {})
+            if redact is True:
+                redact = Redactor()
+            self._redactor = redact or None
+            # Records are sent to the daemon instead of the log file
+            syslog_sink: Optional[SyslogSink] = (
+                SyslogSink(ident=package) if syslog is True else syslog or None
+            )
+            if syslog_sink is not None and syslog_sink.fallback is None:
+                syslog_sink.fallback = Path(log_file)
+            if use_loguru:
+                # Use Loguru for logging
+                self._set_loguru_logger(
+                    log_file, debug, verbose, sinks or [], syslog_sink
+                )
+            else:
+                # Use standard logging
+                self._set_logging_logger(
+                    package,
+                    log_file,
+                    debug,
+                    verbose,
+                    cache,
+                    binary,
+                    sinks or [],
+                    syslog_sink,
+                )
+
+            # Make sure buffered records are written when the session exits
+            register_shutdown_hook(self.flush, "logger", final=True)
 
     def _set_loguru_logger(
-        self, log_file: str | Path, debug: bool, verbose: bool
+        self,
+        log_file: str | Path,
+        debug: bool,
+        verbose: bool,
+        sinks: list[Sink],
+        syslog: Optional[SyslogSink] = None,
     ) -> None:
         """
         Set up and return a configured Loguru logger instance.
@@ -73,6 +157,9 @@ class LoggerProxy:
             log_file (str | Path): The path to the log file.
             debug (bool): Whether to enable debug-level logging.
             verbose (bool): Whether to enable verbose logging.
+            sinks (list[Sink]): Additional destinations of the records.
+            syslog (SyslogSink, optional): The daemon receiving the records
+                instead of the log file.
         """
         try:
             from loguru import logger as loguru_logger
@@ -83,21 +170,86 @@ class LoggerProxy:
 
         # Loguru configuration
         loguru_logger.remove()  # Remove default configuration
-        loguru_log_level: str = "DEBUG" if debug else "INFO"
+        # Sinks accept DEBUG so module levels can be lowered at runtime, the
+        # filter applies the effective level of each module
+        loguru_log_level: str = "DEBUG"
 
-        # Configure Loguru to log to file
-        loguru_logger.add(
-            log_file, level=loguru_log_level, format="{time} {level} {message}"
-        )
+        if syslog is not None:
+            # The daemon records the time and the level itself
+            loguru_logger.add(
+                self._get_loguru_writer(syslog),
+                level=loguru_log_level,
+                format="{message}",
+                filter=self._get_loguru_sink_filter(syslog),
+            )
+        else:
+            # Configure Loguru to log to file
+            loguru_logger.add(
+                log_file,
+                level=loguru_log_level,
+                format="{time} {level} {message}",
+                filter=self._loguru_filter,
+            )
 
         if verbose:
             # Configure Loguru to log to console
             loguru_logger.add(
-                lambda msg: print(msg, end=""), level=loguru_log_level, colorize=True
+                lambda msg: print(msg, end=""),
+                level=loguru_log_level,
+                colorize=True,
+                filter=self._loguru_filter,
             )
 
+        for sink in sinks:
+            loguru_logger.add(
+                self._get_loguru_writer(sink),
+                level=sink.level,
+                format="{time} {level} {message}",
+                filter=self._get_loguru_sink_filter(sink),
+            )
+
+        # Records are redacted once, before being dispatched to the sinks
+        loguru_logger.configure(patcher=self._loguru_patcher)
+        self._loguru_sinks = [*sinks, syslog] if syslog else sinks
+        if not self._flush_at_exit:
+            # Unlike logging.shutdown, Loguru does not flush the sinks at exit,
+            # so records batched by a sink would be lost without exit_session
+            atexit.register(self.flush)
+            self._flush_at_exit = True
+
         self._logger = loguru_logger
 
+    def _get_loguru_writer(self, sink: Sink) -> Callable[[str], None]:
+        """
+        Adapt a sink to a Loguru sink function.
+
+        Args:
+            sink (Sink): The sink.
+
+        Returns:
+            Callable[[str], None]: The function writing Loguru messages to it.
+        """
+        if sink.binary:
+            return lambda message: sink.write(
+                str(message).encode("utf-8", "backslashreplace"),
+                message.record["level"].no,
+            )
+        return lambda message: sink.write(str(message), message.record["level"].no)
+
+    def _get_loguru_sink_filter(self, sink: Sink) -> Callable[[dict[str, Any]], bool]:
+        """
+        Build the Loguru filter applying the upper level bound of a sink.
+
+        Args:
+            sink (Sink): The sink.
+
+        Returns:
+            Callable[[dict[str, Any]], bool]: The filter.
+        """
+        return lambda record: (
+            record["level"].no <= sink.max_level and self._loguru_filter(record)
+        )
+
     def _set_logging_logger(
         self,
         package: str,
@@ -105,6 +257,9 @@ class LoggerProxy:
         debug: bool,
         verbose: bool,
         cache: bool,
+        binary: bool = False,
+        sinks: Optional[list[Sink]] = None,
+        syslog: Optional[SyslogSink] = None,
     ) -> None:
         """
         Set up and return a configured standard logging logger instance.
@@ -115,20 +270,33 @@ class LoggerProxy:
             debug (bool): Whether to enable debug-level logging.
             verbose (bool): Whether to enable verbose logging.
             cache (bool): Whether to use the cached logger instance.
+            binary (bool): Whether to write the log file in the binary format.
+            sinks (list[Sink], optional): Additional destinations of the
+                records.
+            syslog (SyslogSink, optional): The daemon receiving the records
+                instead of the log file.
         """
         # Standard logging configuration
         logger: logging.Logger = logging.getLogger(name=package)
         logger.propagate = False  # Prevent propagation to root logger
 
-        if logger.hasHandlers() and not cache:
-            # Remove existing handlers
-            logger.handlers.clear()
-
-        if not logger.hasHandlers():  # Prevent adding handlers multiple times
-            # Define log handlers
-            log_handlers = [logging.FileHandler(log_file, encoding="utf-8")]
+        # Reuse the existing handlers when caching, otherwise replace them
+        if not cache or not logger.hasHandlers():
+            # Define log handlers. The text destinations share one handler,
+            # so each record is formatted once whatever their number.
+            log_handlers: list[logging.Handler] = []
+            text_sinks: list[Sink] = []
+            if syslog is not None:
+                text_sinks.append(syslog)
+            elif binary:
+                log_handlers.append(BinaryLogHandler(log_file))
+            else:
+                text_sinks.append(FileSink(log_file))
             if verbose:
-                log_handlers.append(logging.StreamHandler())
+                text_sinks.append(StreamSink())
+            text_sinks.extend(sinks or [])
+            if text_sinks:
+                log_handlers.append(FanOutHandler(text_sinks))
 
             # Set the log level and message format
             log_level: int = logging.DEBUG if debug else logging.INFO
@@ -143,14 +311,216 @@ class LoggerProxy:
             # Set the log level
             logger.setLevel(log_level)
 
-            # Add handlers to the logger
+            # The handlers accept every level so that the child loggers can be
+            # more verbose than the package logger
             for handler in log_handlers:
                 handler.setFormatter(formatter)
-                handler.setLevel(log_level)
-                logger.addHandler(handler)
+
+            self._set_redactor(log_handlers)
+            # Swap the handler list at once: records logged concurrently by
+            # other threads go either to the old handlers or to the new ones
+            logger.handlers = log_handlers
+        else:
+            self._set_redactor(logger.handlers)
 
         self._logger = logger
 
+    def _set_redactor(self, handlers: list[logging.Handler]) -> None:
+        """
+        Replace the redaction filter of the handlers with the current one.
+
+        Handler filters only see the records enabled by the level of the logger
+        that created them, and the redactor skips records it already processed
+        for another handler.
+
+        Args:
+            handlers (list[logging.Handler]): The handlers.
+        """
+        for handler in handlers:
+            for log_filter in handler.filters[:]:
+                if isinstance(log_filter, Redactor):
+                    handler.removeFilter(log_filter)
+            if self._redactor:
+                handler.addFilter(self._redactor)
+
+    def get_child(self, name: str) -> "logging.Logger | Logger":
+        """
+        Get the logger of a module of the package.
+
+        Child loggers send their records to the package logger handlers, but
+        have their own level, see `set_level` and `reload_levels`.
+
+        Args:
+            name (str): The module name, either relative to the package or
+                fully qualified (e.g. `__name__`).
+
+        Returns:
+            logging.Logger | Logger: The child logger.
+
+        Raises:
+            RuntimeError: If the logger has not been initialized.
+        """
+        logger = self._logger
+        if logger is None:
+            raise RuntimeError("logging.Logger accessed before initialization")
+        name = name.removeprefix(f"{self._package}.")
+        if isinstance(logger, logging.Logger):
+            return logger.getChild(name)
+        return logger.bind(module=name)
+
+    def set_level(self, name: str, level: int | str) -> None:
+        """
+        Set the level of a module without re-creating the handlers.
+
+        Args:
+            name (str): The module name relative to the package, "" for the
+                package logger itself.
+            level (int | str): The level, e.g. `logging.DEBUG` or "DEBUG".
+        """
+        with self._lock:
+            self._apply_levels({**self._level_state[0], name: _to_level(level)})
+
+    def reload_levels(self, config_file: Optional[str | Path] = None) -> None:
+        """
+        Reload the module levels from a JSON config file.
+
+        The file maps module names to levels, e.g.
+        `{"": "INFO", "db": "DEBUG", "db.pool": "WARNING"}`. Modules missing
+        from the file inherit the level of their parent again.
+
+        Args:
+            config_file (str | Path, optional): The config file. Defaults to
+                `log_levels.json` in the package's config directory.
+
+        Raises:
+            ValueError: If the file is not valid JSON or holds unknown levels.
+        """
+        if config_file is None:
+            config_file = (
+                get_user_path(self._package, PathType.CONFIG) / LOG_LEVELS_FILE
+            )
+        try:
+            config: dict[str, Any] = json.loads(
+                Path(config_file).read_text(encoding="utf-8")
+            )
+        except FileNotFoundError:
+            return
+        if not isinstance(config, dict) or not all(
+            isinstance(level, (int, str)) for level in config.values()
+        ):
+            raise ValueError(f"Invalid log levels in {config_file}")
+
+        levels: dict[str, int] = {name: _to_level(lvl) for name, lvl in config.items()}
+        with self._lock:
+            levels.setdefault("", self._level_state[0].get("", logging.INFO))
+            self._apply_levels(levels)
+
+    def enable_level_reload(self, config_file: Optional[str | Path] = None) -> None:
+        """
+        Load the module levels now and reload them on SIGHUP.
+
+        Args:
+            config_file (str | Path, optional): The config file. Defaults to
+                `log_levels.json` in the package's config directory.
+        """
+        self.reload_levels(config_file)
+        if (
+            hasattr(signal, "SIGHUP")
+            and threading.current_thread() is threading.main_thread()
+        ):
+            signal.signal(
+                signal.SIGHUP, lambda *_: self._reload_levels_on_signal(config_file)
+            )
+
+    def _reload_levels_on_signal(self, config_file: Optional[str | Path]) -> None:
+        """
+        Reload the module levels from a signal handler.
+
+        The handler runs in whatever code the signal interrupted, so an invalid
+        file is logged and the current levels are kept instead of raising.
+
+        Args:
+            config_file (str | Path, optional): The config file.
+        """
+        try:
+            self.reload_levels(config_file)
+        except (OSError, ValueError) as e:
+            self.error(f"Keeping the current log levels, reloading failed: {e}")
+
+    def _apply_levels(self, levels: dict[str, int]) -> None:
+        """
+        Replace the module levels and update the existing loggers.
+
+        Must be called with the lock held.
+
+        Args:
+            levels (dict[str, int]): The new levels keyed by module name.
+        """
+        logger = self._logger
+        if isinstance(logger, logging.Logger):
+            for name in self._level_state[0].keys() - levels.keys():
+                logger.getChild(name).setLevel(logging.NOTSET)
+            for name, level in levels.items():
+                target = logger.getChild(name) if name else logger
+                # setLevel also clears the cached effective levels
+                target.setLevel(level)
+        self._level_state = (levels, {})
+
+    def _get_effective_level(self, name: str) -> int:
+        """
+        Resolve the level of a module from its closest configured ancestor.
+
+        Args:
+            name (str): The module name relative to the package.
+
+        Returns:
+            int: The effective level.
+        """
+        # A single read, the cache always belongs to these levels
+        levels, effective_levels = self._level_state
+        level: int | None = effective_levels.get(name)
+        if level is None:
+            parent: str = name
+            while parent and parent not in levels:
+                parent = parent.rpartition(".")[0]
+            level = effective_levels[name] = levels.get(parent, logging.INFO)
+        return level
+
+    def _loguru_filter(self, record: dict[str, Any]) -> bool:
+        """
+        Filter Loguru records with the effective level of their module.
+
+        Args:
+            record (dict[str, Any]): The Loguru record.
+
+        Returns:
+            bool: Whether the record is emitted.
+        """
+        module: str = record["extra"].get("module", "")
+        return record["level"].no >= self._get_effective_level(module)
+
+    def _loguru_patcher(self, record: dict[str, Any]) -> None:
+        """
+        Redact the message of Loguru records that pass their module level.
+
+        Args:
+            record (dict[str, Any]): The Loguru record.
+        """
+        if self._redactor and self._loguru_filter(record):
+            self._redactor.patch(record)
+
+    def flush(self) -> None:
+        """Write any buffered records of the underlying logger."""
+        logger = self._logger
+        if isinstance(logger, logging.Logger):
+            for handler in logger.handlers:
+                handler.flush()
+        elif logger is not None:
+            # Wait for the messages enqueued by Loguru sinks
+            logger.complete()
+            for sink in self._loguru_sinks:
+                sink.flush()
+
     def __getattr__(self, name: str):
         """
         Proxy attribute access to the underlying logger.
@@ -161,11 +531,33 @@ class LoggerProxy:
         Raises:
             RuntimeError: If the logger has not been initialized.
         """
-        if self._logger is None:
+        logger = self._logger
+        if logger is None:
             raise RuntimeError(
                 f"logging.Logger accessed before initialization: tried to use '{name}'"
             )
-        return getattr(self._logger, name)
+        return getattr(logger, name)
+
+
+def _to_level(level: int | str) -> int:
+    """
+    Convert a level name to its numeric value.
+
+    Args:
+        level (int | str): The level name or value.
+
+    Returns:
+        int: The numeric level.
+
+    Raises:
+        ValueError: If the level name is unknown.
+    """
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(level.upper())
+    if not isinstance(value, int):
+        raise ValueError(f"Unknown log level: {level}")
+    return value
 
 
 # Create a shared proxy
@@ -0,0 +1,270 @@
+"""
+Opt-in memory profiling with tracemalloc.
+
+Pass ``--memory-profile`` to a parser created by `setup_parser`, set the
+``CORE_HELPERS_MEMORY_PROFILE`` environment variable (to ``1`` or to the
+snapshot interval in seconds) or call `enable_memory_profiling` to trace
+allocations. A background thread snapshots the heap whenever it reaches a new
+peak, and a shutdown hook reports the top allocation sites and the peak RSS
+when `exit_session` is called: the report is written to the package's log
+directory and to the logger.
+"""
+
+import math
+import sys
+import threading
+import time
+import tracemalloc
+import warnings
+from os import getenv, getpid
+from pathlib import Path
+from typing import Optional
+
+from core_helpers.xdg_paths import PathType, get_user_path
+
+MEMORY_PROFILE_ENV_VAR = "CORE_HELPERS_MEMORY_PROFILE"
+
+# Seconds between two checks for a new peak
+DEFAULT_INTERVAL = 10.0
+# Number of allocation sites reported
+DEFAULT_TOP = 10
+
+_package: Optional[str] = None
+_top: int = DEFAULT_TOP
+_stop_event = threading.Event()
+_sampler: Optional[threading.Thread] = None
+# Snapshot taken when the traced memory was the highest, and its size
+_peak_snapshot: Optional[tracemalloc.Snapshot] = None
+_peak_size: int = 0
+_snapshot_lock = threading.Lock()
+
+# Allocations made by the profiler itself
+_FILTERS: list[tracemalloc.Filter] = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def _take_peak_snapshot() -> None:
+    """Snapshot the heap if the traced memory reached a new peak."""
+    global _peak_snapshot, _peak_size
+    with _snapshot_lock:
+        size: int = tracemalloc.get_traced_memory()[0]
+        if size > _peak_size:
+            _peak_snapshot = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+            _peak_size = size
+
+
+def _sample(interval: float) -> None:
+    """
+    Check for a new peak every `interval` seconds until profiling stops.
+
+    Args:
+        interval (float): Seconds between two checks.
+    """
+    while not _stop_event.wait(interval):
+        if tracemalloc.is_tracing():
+            _take_peak_snapshot()
+
+
+def enable_memory_profiling(
+    package: Optional[str] = None,
+    interval: float = DEFAULT_INTERVAL,
+    top: int = DEFAULT_TOP,
+    frames: int = 1,
+) -> None:
+    """
+    Start tracing allocations and register the exit report.
+
+    Args:
+        package (str, optional): The package whose log directory receives the
+            report. Defaults to the package of the logger, or "core_helpers".
+        interval (float): Seconds between two checks for a new peak. Defaults
+            to DEFAULT_INTERVAL.
+        top (int): Number of allocation sites reported. Defaults to
+            DEFAULT_TOP.
+        frames (int): Number of frames stored per allocation. Defaults to 1.
+
+    Raises:
+        ValueError: If the interval is not a positive number of seconds.
+    """
+    from core_helpers.shutdown import register_shutdown_hook
+
+    global _package, _top, _sampler
+    if not 0.0 < interval < math.inf:
+        raise ValueError(f"Interval must be a positive number, got {interval}")
+    _package = package or _package
+    _top = top
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+    if _sampler is None:
+        _stop_event.clear()
+        _sampler = threading.Thread(
+            target=_sample, args=(interval,), name="memory-profile", daemon=True
+        )
+        _sampler.start()
+    register_shutdown_hook(report_memory_profile, "memory")
+
+
+def disable_memory_profiling() -> None:
+    """Stop tracing allocations without reporting them."""
+    from core_helpers.shutdown import unregister_shutdown_hook
+
+    global _sampler, _peak_snapshot, _peak_size
+    _stop_event.set()
+    if _sampler is not None:
+        _sampler.join()
+        _sampler = None
+    tracemalloc.stop()
+    with _snapshot_lock:
+        _peak_snapshot = None
+        _peak_size = 0
+    unregister_shutdown_hook(report_memory_profile)
+
+
+def is_memory_profiling_enabled() -> bool:
+    """
+    Check if allocations are traced.
+
+    Returns:
+        bool: True if memory profiling is enabled, False otherwise.
+    """
+    return _sampler is not None
+
+
+def get_peak_rss() -> Optional[int]:
+    """
+    Get the peak resident set size of the process.
+
+    Returns:
+        int | None: The peak RSS in bytes, or None if the platform does not
+            report it.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None  # Windows
+    max_rss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _format_size(size: Optional[int]) -> str:
+    if size is None:
+        return "unavailable"
+    return f"{size / 1024 / 1024:.1f} MiB"
+
+
+def _format_top(snapshot: tracemalloc.Snapshot, top: int) -> list[str]:
+    """
+    Format the allocation sites holding the most memory in a snapshot.
+
+    Args:
+        snapshot (tracemalloc.Snapshot): The snapshot.
+        top (int): Number of sites.
+
+    Returns:
+        list[str]: One line per site.
+    """
+    lines: list[str] = []
+    for index, stat in enumerate(snapshot.statistics("lineno")[:top], 1):
+        frame: tracemalloc.Frame = stat.traceback[0]
+        lines.append(
+            f"  #{index}: {frame.filename}:{frame.lineno}: "
+            f"{stat.size / 1024:.1f} KiB in {stat.count} blocks"
+        )
+    return lines
+
+
+def get_memory_report() -> list[str]:
+    """
+    Build the memory report from the traced allocations.
+
+    Returns:
+        list[str]: The report lines: the peak RSS, the traced memory and the
+            top allocation sites at the peak and now.
+    """
+    _take_peak_snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    lines: list[str] = [
+        f"Peak RSS: {_format_size(get_peak_rss())}",
+        f"Traced memory: {_format_size(current)} (peak {_format_size(peak)})",
+    ]
+    with _snapshot_lock:
+        if _peak_snapshot is not None:
+            lines.append(
+                f"Top {_top} allocation sites at peak ({_format_size(_peak_size)}):"
+            )
+            lines.extend(_format_top(_peak_snapshot, _top))
+    snapshot: tracemalloc.Snapshot = tracemalloc.take_snapshot()
+    lines.append(f"Top {_top} allocation sites at exit:")
+    lines.extend(_format_top(snapshot.filter_traces(_FILTERS), _top))
+    return lines
+
+
+def report_memory_profile() -> Optional[Path]:
+    """
+    Write the memory report to the log directory and to the logger, then stop
+    tracing allocations.
+
+    Returns:
+        Path | None: The report file, or None if profiling is not enabled.
+    """
+    from core_helpers.logs import logger
+
+    if not tracemalloc.is_tracing():
+        return None
+
+    package: str = _package or logger._package or "core_helpers"
+    lines: list[str] = get_memory_report()
+    disable_memory_profiling()
+
+    report_path: Path = (
+        get_user_path(package, PathType.LOG)
+        / f"memory-{time.strftime('%Y%m%d-%H%M%S')}-{getpid()}.txt"
+    )
+    report_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    if logger.is_initialized():
+        memory_logger = logger.get_child("memory")
+        memory_logger.info(f"Memory profile written to {report_path}")
+        for line in lines:
+            memory_logger.info(line)
+    return report_path
+
+
+def _parse_interval(value: str) -> float:
+    """
+    Parse the snapshot interval of the environment variable.
+
+    It is read at import time, so an invalid interval falls back to
+    `DEFAULT_INTERVAL` with a warning instead of breaking the import of
+    core_helpers.
+
+    Args:
+        value (str): The environment variable value, e.g. "1" or "0.5".
+
+    Returns:
+        float: The interval in seconds.
+    """
+    if value.lower() in ("1", "true", "yes"):
+        return DEFAULT_INTERVAL
+    try:
+        interval: float = float(value)
+    except ValueError:
+        interval = math.nan
+    if not 0.0 < interval < math.inf:
+        warnings.warn(
+            f"Invalid interval in {MEMORY_PROFILE_ENV_VAR}: {value!r}, "
+            f"using {DEFAULT_INTERVAL}",
+            RuntimeWarning,
+        )
+        return DEFAULT_INTERVAL
+    return interval
+
+
+_env_value: str = getenv(MEMORY_PROFILE_ENV_VAR, "")
+if _env_value and _env_value.lower() not in ("0", "false", "no"):
+    enable_memory_profiling(interval=_parse_interval(_env_value))
@@ -0,0 +1,226 @@
+"""
+Opt-in startup-phase profiling.
+
+Set the ``CORE_HELPERS_PROFILE`` environment variable (or call
+`enable_profiling`) to record the wall time and the time spent importing
+modules during each core_helpers phase. The breakdown is reported by a
+shutdown hook when `exit_session` is called: printed to stderr, or written as
+JSON when the output is a path ending in ``.json``.
+"""
+
+import builtins
+import json
+import sys
+import threading
+from functools import wraps
+from os import getenv
+from pathlib import Path
+from time import perf_counter
+from types import TracebackType
+from typing import Any, Callable, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+PROFILE_ENV_VAR = "CORE_HELPERS_PROFILE"
+
+_enabled: bool = False
+_output: Optional[Path] = None
+# Phase name -> [calls, wall time, import time]
+_phases: dict[str, list[float]] = {}
+_phases_lock = threading.Lock()
+
+_original_import = builtins.__import__
+
+
+class _ImportState(threading.local):
+    """Per-thread import nesting depth and accumulated import time."""
+
+    depth: int = 0
+    time: float = 0.0
+
+
+_import_state = _ImportState()
+
+
+def _timed_import(*args: Any, **kwargs: Any) -> Any:
+    """
+    Replacement for `builtins.__import__` that accumulates import time.
+
+    Only the outermost import is timed so nested imports are not counted twice.
+    The time is accumulated per thread, so a phase only counts the imports made
+    by its own thread.
+    """
+    state: _ImportState = _import_state
+    if state.depth:
+        return _original_import(*args, **kwargs)
+    state.depth = 1
+    start: float = perf_counter()
+    try:
+        return _original_import(*args, **kwargs)
+    finally:
+        state.time += perf_counter() - start
+        state.depth = 0
+
+
+def enable_profiling(output: Optional[str | Path] = None) -> None:
+    """
+    Enable phase profiling for the rest of the process.
+
+    Args:
+        output (str | Path, optional): Where to write the report. A path ending
+            in ``.json`` produces a JSON file, anything else prints a table to
+            stderr. Defaults to None (print to stderr).
+    """
+    from core_helpers.shutdown import register_shutdown_hook
+
+    global _enabled, _output
+    _enabled = True
+    _output = Path(output) if output else None
+    builtins.__import__ = _timed_import
+    register_shutdown_hook(report_profile, "profiling")
+
+
+def disable_profiling() -> None:
+    """
+    Disable phase profiling and discard the recorded phases.
+
+    The original `builtins.__import__` is only restored if no other library
+    replaced the profiling hook in the meantime.
+    """
+    from core_helpers.shutdown import unregister_shutdown_hook
+
+    global _enabled, _output
+    _enabled = False
+    _output = None
+    _phases.clear()
+    if builtins.__import__ is _timed_import:
+        builtins.__import__ = _original_import
+    unregister_shutdown_hook(report_profile)
+
+
+def is_profiling_enabled() -> bool:
+    """
+    Check if phase profiling is enabled.
+
+    Returns:
+        bool: True if profiling is enabled, False otherwise.
+    """
+    return _enabled
+
+
+class profile_phase:
+    """
+    Record the wall time and import time spent inside a phase.
+
+    Use it as a context manager around a block, or as a decorator to record
+    every call of a function. When profiling is disabled, the decorated
+    function is called directly.
+
+    Args:
+        name (str): The name of the phase.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name: str = name
+        self._start: Optional[float] = None
+        self._import_start: float = 0.0
+
+    def __enter__(self) -> None:
+        if _enabled:
+            self._import_start = _import_state.time
+            self._start = perf_counter()
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        if self._start is None:
+            return
+        wall: float = perf_counter() - self._start
+        imports: float = _import_state.time - self._import_start
+        self._start = None
+        with _phases_lock:
+            stats: list[float] = _phases.setdefault(self.name, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += wall
+            stats[2] += imports
+
+    def __call__(self, func: F) -> F:
+        """
+        Record every call of `func` as this phase.
+
+        The wrapped function is looked up through ``__wrapped__`` on each call,
+        so `runtime_checks` can rebind it when the checks are toggled.
+
+        Args:
+            func (F): The function to decorate.
+
+        Returns:
+            F: The decorated function.
+        """
+        name: str = self.name
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _enabled:
+                return wrapper.__wrapped__(*args, **kwargs)
+            with profile_phase(name):
+                return wrapper.__wrapped__(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+
+def get_profile() -> list[dict[str, Any]]:
+    """
+    Return the recorded phases, slowest first.
+
+    Returns:
+        list[dict[str, Any]]: One entry per phase with its number of calls,
+            wall time and import time in milliseconds.
+    """
+    return [
+        {
+            "phase": name,
+            "calls": int(calls),
+            "wall_ms": round(wall * 1000, 3),
+            "import_ms": round(imports * 1000, 3),
+        }
+        for name, (calls, wall, imports) in sorted(
+            _phases.items(), key=lambda item: item[1][1], reverse=True
+        )
+    ]
+
+
+def report_profile() -> None:
+    """Print or write the recorded phase breakdown, if profiling is enabled."""
+    if not _enabled or not _phases:
+        return
+
+    profile: list[dict[str, Any]] = get_profile()
+    if _output and _output.suffix == ".json":
+        _output.write_text(json.dumps(profile, indent=2), encoding="utf-8")
+        return
+
+    from rich.console import Console
+    from rich.table import Table
+
+    table = Table(title="core_helpers startup profile")
+    table.add_column("Phase")
+    table.add_column("Calls", justify="right")
+    table.add_column("Wall (ms)", justify="right")
+    table.add_column("Import (ms)", justify="right")
+    for entry in profile:
+        table.add_row(
+            entry["phase"],
+            str(entry["calls"]),
+            f"{entry['wall_ms']:.3f}",
+            f"{entry['import_ms']:.3f}",
+        )
+    Console(file=sys.stderr).print(table)
+
+
+_env_value: Optional[str] = getenv(PROFILE_ENV_VAR)
+if _env_value and _env_value.lower() not in ("0", "false", "no"):
+    enable_profiling(None if _env_value.lower() in ("1", "true", "yes") else _env_value)
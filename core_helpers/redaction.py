@@ -0,0 +1,161 @@
+"""
+Secret redaction for log records.
+
+A `Redactor` compiles every pattern and literal into a single regular
+expression alternation, so each record is scanned once whatever the number of
+patterns. Python's regex engine tries every alternative at every position, so
+the patterns starting with a word boundary are grouped behind a single
+boundary check.
+
+Pass ``redact=True`` (or a configured `Redactor`) to `LoggerProxy.setup_logger`
+to scrub the records of both backends before they are written.
+"""
+
+import logging
+import re
+from typing import Any, Iterable, Optional
+
+# Tokens, passwords and emails redacted by default. The text matched by a
+# group named "key" is kept, so "password=hunter2" becomes "password=[REDACTED]".
+DEFAULT_REDACT_PATTERNS: tuple[str, ...] = (
+    # key=value and key: value pairs of secret settings. The keyword can be
+    # anywhere in the name (DB_PASSWORD, auth_token), so it is searched at
+    # every position, behind a cheap check of its first character.
+    r"(?=[PpSsTtAaCc])(?P<key>(?i:pass(?:word|wd)|pwd|secret|token|api[_-]?key|"
+    r"access[_-]?key|client[_-]?secret)[\w-]*[\"']?\s*[:=]\s*[\"']?)[^\s\"',;&]+",
+    # Authorization headers
+    r"\b(?i:bearer)\s+[A-Za-z0-9\-._~+/]+=*",
+    # GitHub, GitLab and Slack tokens
+    r"\b(?:gh[pousr]_[A-Za-z0-9]{36,}|glpat-[A-Za-z0-9\-_]{20,}|"
+    r"xox[abprs]-[A-Za-z0-9-]{10,})",
+    # AWS access key IDs
+    r"\bAKIA[0-9A-Z]{16}\b",
+    # JSON Web Tokens
+    r"\beyJ[A-Za-z0-9_-]+\.eyJ[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+",
+    # Email addresses
+    r"\b[\w.%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b",
+)
+
+REDACTED = "[REDACTED]"
+
+# Named groups and their backreferences, renamed per pattern
+_GROUP_NAME = re.compile(r"(?<!\\)\(\?P([<=])(\w+)")
+_KEY_GROUP = re.compile(r"_\d+_key")
+
+
+class Redactor(logging.Filter):
+    """
+    Replace secrets in log records.
+
+    Can be added to `logging` handlers as a filter. It always lets the record
+    through, and only rewrites its message when something was redacted.
+
+    Args:
+        patterns (Iterable[str]): Regular expressions of the text to redact.
+            Defaults to DEFAULT_REDACT_PATTERNS. A leading ``\\b`` applies to
+            the whole pattern, group top-level alternatives after it. The text
+            matched by a group named "key" is kept.
+        literals (Iterable[str]): Exact strings to redact, e.g. the secrets
+            loaded from the configuration.
+        replacement (str): The text replacing each match. Defaults to
+            "[REDACTED]".
+    """
+
+    def __init__(
+        self,
+        patterns: Iterable[str] = DEFAULT_REDACT_PATTERNS,
+        literals: Iterable[str] = (),
+        replacement: str = REDACTED,
+    ) -> None:
+        super().__init__()
+        self.replacement: str = replacement
+        # The patterns starting at a word boundary share a single boundary
+        # check, so the other alternatives are only tried at word starts
+        word_patterns: list[str] = []
+        alternatives: list[str] = []
+        for index, pattern in enumerate(patterns):
+            # Prefix the group names so several patterns can each have a
+            # "key" group
+            pattern = _GROUP_NAME.sub(rf"(?P\1_{index}_\2", pattern)
+            if pattern.startswith(r"\b"):
+                word_patterns.append(f"(?:{pattern[2:]})")
+            else:
+                alternatives.append(f"(?:{pattern})")
+        if word_patterns:
+            alternatives.insert(0, rf"\b(?:{'|'.join(word_patterns)})")
+        # Longest literals first, so a literal never hides a longer one
+        alternatives.extend(
+            re.escape(literal)
+            for literal in sorted(set(literals), key=len, reverse=True)
+            if literal
+        )
+        self._pattern: Optional[re.Pattern[str]] = (
+            re.compile("|".join(alternatives)) if alternatives else None
+        )
+        self._key_groups: list[str] = [
+            name
+            for name in (self._pattern.groupindex if self._pattern else ())
+            if _KEY_GROUP.fullmatch(name)
+        ]
+
+    def _replace(self, match: re.Match[str]) -> str:
+        for name in self._key_groups:
+            key: Optional[str] = match.group(name)
+            if key is not None:
+                return key + self.replacement
+        return self.replacement
+
+    def redact(self, text: str) -> str:
+        """
+        Redact the secrets in a text.
+
+        Args:
+            text (str): The text.
+
+        Returns:
+            str: The text with every match replaced.
+        """
+        if self._pattern is None:
+            return text
+        if self._key_groups:
+            return self._pattern.sub(self._replace, text)
+        return self._pattern.sub(self.replacement, text)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """
+        Redact the message and exception text of a `logging` record.
+
+        The record is only processed once even if several handlers use the
+        filter.
+
+        Args:
+            record (logging.LogRecord): The record.
+
+        Returns:
+            bool: Always True.
+        """
+        if getattr(record, "_redacted", False):
+            return True
+        record._redacted = True
+
+        message: str = record.getMessage()
+        redacted: str = self.redact(message)
+        if redacted != message:
+            record.msg, record.args = redacted, None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _FORMATTER.formatException(record.exc_info)
+        if record.exc_text:
+            record.exc_text = self.redact(record.exc_text)
+        return True
+
+    def patch(self, record: dict[str, Any]) -> None:
+        """
+        Redact the message of a Loguru record.
+
+        Args:
+            record (dict[str, Any]): The Loguru record.
+        """
+        record["message"] = self.redact(record["message"])
+
+
+_FORMATTER = logging.Formatter()
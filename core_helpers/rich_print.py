@@ -1,17 +1,26 @@
 """
-Rich error message printing.
+Rich error message printing and throttled progress reporting.
 
 Source: https://github.com/fastapi/typer/blob/master/typer/rich_utils.py
 """
 
+import queue
+import threading
+import time
 from gettext import gettext
 from os import getenv
-from typing import Literal, Optional
+from types import TracebackType
+from typing import TYPE_CHECKING, Literal, Optional
 
-from rich.console import Console
+from rich.console import Console, RenderableType
 from rich.panel import Panel
 from rich.theme import Theme
 
+from core_helpers.runtime_checks import runtime_checked
+
+if TYPE_CHECKING:
+    from rich.progress import Progress, TaskID
+
 
 ALIGN_ERRORS_PANEL: Literal["left", "center", "right"] = "left"
 _TERMINAL_WIDTH: str | None = getenv("TERMINAL_WIDTH")
@@ -28,8 +37,31 @@ FORCE_TERMINAL: None | Literal[True] = (
 # Fixed strings
 ERRORS_PANEL_TITLE: str = gettext("Error")
 
+# Messages waiting for the writer thread, None when printing directly. Each item
+# is either (stderr, renderable) or an Event set once the previous items are out.
+_output_queue: Optional[
+    "queue.SimpleQueue[tuple[bool, RenderableType] | threading.Event]"
+] = None
+_writer_thread: Optional[threading.Thread] = None
+
+# One console per stream, shared by every thread. Rich renders into a buffer
+# local to the calling thread and only holds the console lock while writing it
+# out, so concurrent prints do not contend while rendering.
+_consoles: dict[bool, Console] = {}
+_consoles_lock = threading.Lock()
+
 
 def _get_rich_console(stderr: bool = False) -> Console:
+    console: Optional[Console] = _consoles.get(stderr)
+    if console is None:
+        with _consoles_lock:
+            console = _consoles.get(stderr)
+            if console is None:
+                console = _consoles[stderr] = _create_rich_console(stderr)
+    return console
+
+
+def _create_rich_console(stderr: bool) -> Console:
     return Console(
         theme=Theme(
             {
@@ -57,17 +89,95 @@ def _print_message(message: str, color: str) -> None:
         message (str): The message to display.
         color (str): The color of the border.
     """
-    console: Console = _get_rich_console(stderr=True)
-    console.print(
-        Panel(
-            renderable=message,
-            border_style=color,
-            title=ERRORS_PANEL_TITLE,
-            title_align=ALIGN_ERRORS_PANEL,
-        )
+    panel = Panel(
+        renderable=message,
+        border_style=color,
+        title=ERRORS_PANEL_TITLE,
+        title_align=ALIGN_ERRORS_PANEL,
     )
+    output_queue = _output_queue
+    if output_queue is not None:
+        output_queue.put((True, panel))
+        return
+    _get_rich_console(stderr=True).print(panel)
+
+
+def _writer_loop(
+    output_queue: "queue.SimpleQueue[tuple[bool, RenderableType] | threading.Event]",
+) -> None:
+    """
+    Print the queued messages one at a time until a stop request.
+
+    Args:
+        output_queue (queue.SimpleQueue): The queue to consume.
+    """
+    while True:
+        item = output_queue.get()
+        if isinstance(item, threading.Event):
+            item.set()
+            if output_queue is not _output_queue:
+                return  # Threaded output was disabled
+            continue
+        stderr, renderable = item
+        try:
+            _get_rich_console(stderr=stderr).print(renderable)
+        except Exception:
+            pass  # A broken stream must not kill the writer
+
+
+def enable_threaded_output() -> None:
+    """
+    Print messages from a single writer thread.
+
+    The `print_*_message` functions then only enqueue their panel and return
+    immediately, while the writer prints one whole message at a time, so
+    messages from concurrent threads never interleave. Pending messages are
+    written by a shutdown hook when the session exits.
+    """
+    from core_helpers.shutdown import register_shutdown_hook
+
+    global _output_queue, _writer_thread
+    if _output_queue is not None:
+        return
+    _output_queue = queue.SimpleQueue()
+    _writer_thread = threading.Thread(
+        target=_writer_loop, args=(_output_queue,), name="rich-print", daemon=True
+    )
+    _writer_thread.start()
+    register_shutdown_hook(flush_output, "rich_print", final=True)
+
+
+def disable_threaded_output() -> None:
+    """Write the pending messages, stop the writer thread and print directly."""
+    global _output_queue, _writer_thread
+    output_queue, writer_thread = _output_queue, _writer_thread
+    if output_queue is None or writer_thread is None:
+        return
+    _output_queue = _writer_thread = None
+    done = threading.Event()
+    output_queue.put(done)
+    writer_thread.join()
+
+
+def flush_output(timeout: Optional[float] = None) -> bool:
+    """
+    Wait until the messages queued so far have been written.
+
+    Args:
+        timeout (float, optional): Seconds to wait. Defaults to None (no limit).
+
+    Returns:
+        bool: True if every queued message was written, False on timeout.
+    """
+    output_queue = _output_queue
+    if output_queue is None:
+        return True
+    done = threading.Event()
+    output_queue.put(done)
+    return done.wait(timeout)
 
 
+@runtime_checked
 def print_error_message(error_message: str) -> None:
     """
     Print an error message in red text.
@@ -78,6 +188,7 @@ def print_error_message(error_message: str) -> None:
     _print_message(message=error_message, color="red")
 
 
+@runtime_checked
 def print_warning_message(warning_message: str) -> None:
     """
     Print a warning message in yellow text.
@@ -88,6 +199,7 @@ def print_warning_message(warning_message: str) -> None:
     _print_message(message=warning_message, color="yellow")
 
 
+@runtime_checked
 def print_info_message(info_message: str) -> None:
     """
     Print an info message in blue text.
@@ -96,3 +208,126 @@ def print_info_message(info_message: str) -> None:
         info_message (str): The info message to display.
     """
     _print_message(message=info_message, color="blue")
+
+
+class ThrottledProgress:
+    """
+    Progress reporter whose rendering cost does not depend on the update rate.
+
+    Workers call `advance`, which only increments a counter owned by the calling
+    thread, so many threads can report progress without contending on a lock.
+    A background thread sums the counters and redraws a Rich progress bar at
+    most `fps` times per second. When the output is not a terminal, a single
+    plain line is printed every `interval` seconds instead.
+
+    Example:
+        with ThrottledProgress(total=len(items), description="Processing") as progress:
+            for item in items:
+                process(item)
+                progress.advance()
+
+    Args:
+        total (float | None): The total amount of work, None if unknown.
+        description (str): The description shown next to the progress.
+        fps (float): The maximum number of redraws per second on a terminal.
+        interval (float): Seconds between lines when the output is not a terminal.
+        stderr (bool): Whether to render on stderr instead of stdout.
+    """
+
+    def __init__(
+        self,
+        total: Optional[float] = None,
+        description: str = "Working...",
+        fps: float = 10,
+        interval: float = 5,
+        stderr: bool = True,
+    ) -> None:
+        self.total: Optional[float] = total
+        self.description: str = description
+        self.console: Console = _get_rich_console(stderr=stderr)
+        self._period: float = 1 / fps if self.console.is_terminal else interval
+        self._cells: list[list[float]] = []
+        self._cells_lock = threading.Lock()
+        self._local = threading.local()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._progress: Optional["Progress"] = None
+        self._task: Optional["TaskID"] = None
+        self._start_time: float = 0.0
+
+    @property
+    def completed(self) -> float:
+        """The amount of work completed by all threads."""
+        return sum(cell[0] for cell in self._cells)
+
+    def advance(self, amount: float = 1) -> None:
+        """
+        Record completed work. Safe to call from any thread.
+
+        Args:
+            amount (float): The amount of work completed. Defaults to 1.
+        """
+        try:
+            self._local.cell[0] += amount
+        except AttributeError:
+            # First update of this thread, register its counter
+            cell: list[float] = [amount]
+            with self._cells_lock:
+                self._cells.append(cell)
+            self._local.cell = cell
+
+    def start(self) -> None:
+        """Start rendering the progress in a background thread."""
+        self._start_time = time.monotonic()
+        if self.console.is_terminal:
+            # Imported lazily, rich.progress is slow to import
+            from rich.progress import Progress
+
+            self._progress = Progress(console=self.console, auto_refresh=False)
+            self._task = self._progress.add_task(self.description, total=self.total)
+            self._progress.start()
+        self._thread = threading.Thread(
+            target=self._render_loop, name="progress-render", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the render thread and draw the final state."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._render()
+        if self._progress is not None:
+            self._progress.stop()
+
+    def _render_loop(self) -> None:
+        while not self._stop.wait(self._period):
+            self._render()
+
+    def _render(self) -> None:
+        """Draw the current progress once."""
+        completed: float = self.completed
+        if self._progress is not None and self._task is not None:
+            self._progress.update(self._task, completed=completed)
+            self._progress.refresh()
+            return
+
+        elapsed: float = time.monotonic() - self._start_time
+        rate: float = completed / elapsed if elapsed > 0 else 0.0
+        line: str = f"{self.description} {completed:g}"
+        if self.total:
+            line += f"/{self.total:g} ({completed / self.total:.0%})"
+        line += f" [{rate:.1f}/s]"
+        self.console.print(line, markup=False, highlight=False)
+
+    def __enter__(self) -> "ThrottledProgress":
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.stop()
@@ -0,0 +1,153 @@
+"""
+Runtime type checking policy for the public API.
+
+Runtime checks are disabled by default: the public functions are left
+untouched, so they cost nothing in production. Set the
+``CORE_HELPERS_RUNTIME_CHECKS`` environment variable or call
+`enable_runtime_checks` to wrap them with typeguard's `typechecked` during
+development and test runs (requires ``core-helpers[runtime-checks]``).
+"""
+
+import sys
+import warnings
+from importlib.util import find_spec
+from inspect import isfunction
+from os import getenv
+from typing import Any, Callable, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+RUNTIME_CHECKS_ENV_VAR = "CORE_HELPERS_RUNTIME_CHECKS"
+
+# Original function -> function currently bound in its module or class
+_functions: dict[Callable[..., Any], Callable[..., Any]] = {}
+
+
+def _enabled_by_env() -> bool:
+    """
+    Whether the environment enables the runtime checks.
+
+    A missing typeguard only disables them with a warning, so setting the
+    environment variable never breaks importing core_helpers.
+    """
+    if getenv(RUNTIME_CHECKS_ENV_VAR, "").lower() not in ("1", "true", "yes"):
+        return False
+    if find_spec("typeguard") is None:
+        warnings.warn(
+            f"{RUNTIME_CHECKS_ENV_VAR} is set but typeguard is not installed, "
+            "runtime checks stay disabled. Please install it with "
+            "'core-helpers[runtime-checks]'.",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+        return False
+    return True
+
+
+_enabled: bool = _enabled_by_env()
+
+
+def _get_typechecked() -> Callable[[F], F]:
+    """
+    Import typeguard's `typechecked` decorator.
+
+    Raises:
+        ImportError: If typeguard is not installed.
+    """
+    try:
+        from typeguard import typechecked
+    except ImportError:
+        raise ImportError(
+            "Typeguard is not installed. Please install it with "
+            "'core-helpers[runtime-checks]'."
+        )
+    return typechecked
+
+
+def runtime_checked(func: F) -> F:
+    """
+    Register a public function for runtime type checking.
+
+    The function is returned unchanged unless runtime checks are enabled.
+
+    Args:
+        func (F): The function to register.
+
+    Returns:
+        F: The function, wrapped with `typechecked` if checks are enabled.
+    """
+    _functions[func] = _get_typechecked()(func) if _enabled else func
+    return _functions[func]  # type: ignore[return-value]
+
+
+def _rebind(current: Callable[..., Any], new: Callable[..., Any]) -> None:
+    """
+    Replace every reference to `current` held by core_helpers modules and
+    classes with `new`, including the ``__wrapped__`` reference of the
+    functions decorating it (e.g. with `profile_phase`).
+
+    Args:
+        current (Callable[..., Any]): The function currently bound.
+        new (Callable[..., Any]): The function to bind instead.
+    """
+    owners: list[Any] = []
+    for name, module in list(sys.modules.items()):
+        if name == "core_helpers" or name.startswith("core_helpers."):
+            owners.append(module)
+            owners.extend(
+                value for value in vars(module).values() if isinstance(value, type)
+            )
+
+    for owner in owners:
+        for attr, value in list(vars(owner).items()):
+            if value is current:
+                setattr(owner, attr, new)
+            elif isfunction(value) and getattr(value, "__wrapped__", None) is current:
+                value.__wrapped__ = new
+
+
+def _set_runtime_checks(enabled: bool) -> None:
+    """
+    Bind the checked or the original version of every registered function.
+
+    Args:
+        enabled (bool): Whether to bind the checked versions.
+    """
+    global _enabled
+    typechecked = _get_typechecked() if enabled else None
+    for func, current in _functions.items():
+        if (current is not func) == enabled:
+            continue  # Already in the requested state
+        new: Callable[..., Any] = typechecked(func) if typechecked else func
+        _rebind(current, new)
+        _functions[func] = new
+    _enabled = enabled
+
+
+def enable_runtime_checks() -> None:
+    """
+    Wrap every public function with typeguard's `typechecked`.
+
+    Names imported from core_helpers before this call keep referring to the
+    unchecked functions, so enable the checks before importing them or use the
+    ``CORE_HELPERS_RUNTIME_CHECKS`` environment variable.
+
+    Raises:
+        ImportError: If typeguard is not installed.
+    """
+    _set_runtime_checks(True)
+
+
+def disable_runtime_checks() -> None:
+    """Restore the unchecked public functions."""
+    _set_runtime_checks(False)
+
+
+def runtime_checks_enabled() -> bool:
+    """
+    Check if runtime type checking is enabled.
+
+    Returns:
+        bool: True if the public functions are type checked, False otherwise.
+    """
+    return _enabled
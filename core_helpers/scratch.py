@@ -0,0 +1,197 @@
+"""
+Scratch space for intermediate files, kept in RAM when possible.
+
+`ScratchSpace` hands out temporary files, directories and memory-mapped
+buffers removed when they are closed. They are created in the package's
+runtime directory (`PathType.RUNTIME`) when it is on a RAM-backed filesystem
+(tmpfs, as ``/run/user/<uid>`` on most Linux systems) with enough free space,
+and in the package's cache directory otherwise:
+
+    scratch = ScratchSpace("my_package")
+    with scratch.temporary_file(size=len(data)) as tmp_file:
+        tmp_file.write(data)
+    with scratch.buffer(64 * 1024 * 1024) as buffer:
+        buffer[:4] = b"data"
+"""
+
+import mmap
+import re
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Iterator, Optional
+
+from core_helpers.xdg_paths import PathType, get_user_path
+
+# Filesystems storing their files in memory
+RAM_FILESYSTEMS: frozenset[str] = frozenset({"tmpfs", "ramfs"})
+# Fraction of the RAM-backed filesystem left free after an allocation
+DEFAULT_RESERVE = 0.25
+
+_MOUNTS_FILE = Path("/proc/self/mounts")
+# Octal escapes of the special characters of mount points, e.g. "\040"
+_MOUNT_ESCAPE = re.compile(r"\\([0-7]{3})")
+
+
+def get_filesystem_type(path: str | Path) -> Optional[str]:
+    """
+    Get the type of the filesystem holding a path, from the mount table.
+
+    Args:
+        path (str | Path): The path.
+
+    Returns:
+        str | None: The filesystem type (e.g. "tmpfs" or "ext4"), or None if
+            the platform has no mount table.
+    """
+    try:
+        mounts: str = _MOUNTS_FILE.read_text(encoding="utf-8")
+    except OSError:
+        return None  # Not Linux
+
+    resolved: str = str(Path(path).resolve())
+    mount_point: str = ""
+    fs_type: Optional[str] = None
+    for line in mounts.splitlines():
+        fields: list[str] = line.split()
+        if len(fields) < 3:
+            continue
+        point: str = _MOUNT_ESCAPE.sub(lambda m: chr(int(m.group(1), 8)), fields[1])
+        # The deepest mount point wins, and the last mount on a point hides
+        # the previous ones
+        if (resolved == point or resolved.startswith(point.rstrip("/") + "/")) and len(
+            point
+        ) >= len(mount_point):
+            mount_point, fs_type = point, fields[2]
+    return fs_type
+
+
+class ScratchSpace:
+    """
+    Temporary files, directories and buffers of a package, in RAM when
+    possible.
+
+    The directories are only created when the scratch space is first used.
+
+    Args:
+        package (str): The name of the package or project.
+        name (str): The name of the scratch directory. Defaults to "scratch".
+        reserve (float): Fraction of the RAM-backed filesystem that must stay
+            free after an allocation, larger allocations go to the cache
+            directory. Defaults to DEFAULT_RESERVE.
+    """
+
+    def __init__(
+        self, package: str, name: str = "scratch", reserve: float = DEFAULT_RESERVE
+    ) -> None:
+        self.package: str = package
+        self.name: str = name
+        self.reserve: float = reserve
+        self._ram_directory: Optional[Path] = None
+        self._ram_checked: bool = False
+        self._disk_directory: Optional[Path] = None
+
+    @property
+    def ram_directory(self) -> Optional[Path]:
+        """The scratch directory in RAM, None if there is none."""
+        if not self._ram_checked:
+            self._ram_checked = True
+            try:
+                runtime: Path = get_user_path(self.package, PathType.RUNTIME)
+                if get_filesystem_type(runtime) in RAM_FILESYSTEMS:
+                    directory: Path = runtime / self.name
+                    directory.mkdir(mode=0o700, exist_ok=True)
+                    self._ram_directory = directory
+            except OSError:
+                pass  # No usable runtime directory
+        return self._ram_directory
+
+    @property
+    def disk_directory(self) -> Path:
+        """The scratch directory in the cache directory."""
+        if self._disk_directory is None:
+            directory: Path = get_user_path(self.package, PathType.CACHE) / self.name
+            directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            self._disk_directory = directory
+        return self._disk_directory
+
+    def get_directory(self, size: int = 0) -> Path:
+        """
+        Choose the directory of a new allocation.
+
+        Args:
+            size (int): The expected size of the allocation in bytes.
+
+        Returns:
+            Path: The RAM-backed directory if it has room for `size` bytes
+                while keeping `reserve` of it free, else the disk directory.
+        """
+        directory: Optional[Path] = self.ram_directory
+        if directory is not None:
+            usage = shutil.disk_usage(directory)
+            if usage.free - size >= usage.total * self.reserve:
+                return directory
+        return self.disk_directory
+
+    def temporary_file(
+        self,
+        size: int = 0,
+        mode: str = "w+b",
+        suffix: Optional[str] = None,
+        prefix: Optional[str] = None,
+    ) -> IO[Any]:
+        """
+        Create a named temporary file, removed when it is closed.
+
+        Args:
+            size (int): The expected size of the file in bytes, used to choose
+                its location. Defaults to 0.
+            mode (str): The mode of the file. Defaults to "w+b".
+            suffix (str, optional): The suffix of the file name.
+            prefix (str, optional): The prefix of the file name.
+
+        Returns:
+            IO[Any]: The open file, also usable as a context manager. Its path
+                is in its `name` attribute.
+        """
+        return tempfile.NamedTemporaryFile(
+            mode, suffix=suffix, prefix=prefix, dir=self.get_directory(size)
+        )
+
+    @contextmanager
+    def temporary_directory(self, size: int = 0) -> Iterator[Path]:
+        """
+        Create a temporary directory, removed with its content on exit.
+
+        Args:
+            size (int): The expected size of its content in bytes, used to
+                choose its location. Defaults to 0.
+
+        Yields:
+            Path: The directory.
+        """
+        with tempfile.TemporaryDirectory(dir=self.get_directory(size)) as directory:
+            yield Path(directory)
+
+    @contextmanager
+    def buffer(self, size: int) -> Iterator[mmap.mmap]:
+        """
+        Create a zero-filled memory-mapped buffer backed by an anonymous
+        temporary file, released on exit.
+
+        Args:
+            size (int): The size of the buffer in bytes.
+
+        Yields:
+            mmap.mmap: The writable buffer.
+
+        Raises:
+            ValueError: If the size is not positive.
+        """
+        if size <= 0:
+            raise ValueError(f"Buffer size must be positive, got {size}")
+        with tempfile.TemporaryFile(dir=self.get_directory(size)) as backing_file:
+            backing_file.truncate(size)
+            with mmap.mmap(backing_file.fileno(), size) as buffer:
+                yield buffer
@@ -0,0 +1,151 @@
+"""
+Shutdown hooks run by `exit_session`.
+
+core_helpers subsystems and user code register callables that flush or join
+their pending work. `run_shutdown_hooks` runs all of them in parallel and waits
+for them under a single total deadline, so exiting is both lossless and fast.
+The final hooks, which write out the logs and messages, run after the others so
+that what those produced (reports, warnings) is written too.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from core_helpers.rich_print import flush_output, print_warning_message
+
+# Total time given to all the shutdown hooks to finish
+SHUTDOWN_TIMEOUT = 5.0
+# Share of the total time kept for the final hooks
+FINAL_HOOKS_SHARE = 0.2
+
+_hooks: list[tuple[str, Callable[[], Any]]] = []
+# Hooks of `_hooks` run after the others
+_final_hooks: set[Callable[[], Any]] = set()
+_hooks_lock = threading.Lock()
+
+
+def register_shutdown_hook(
+    func: Callable[[], Any], name: Optional[str] = None, final: bool = False
+) -> Callable[[], Any]:
+    """
+    Register a callable to run when the session exits.
+
+    Registering the same callable twice has no effect. Can be used as a
+    decorator.
+
+    Args:
+        func (Callable[[], Any]): The callable to run, without arguments.
+        name (str, optional): Name used in warnings. Defaults to the callable's
+            qualified name.
+        final (bool): Whether the hook writes out the output of the others
+            (e.g. flushes the logs) and must run after them. Defaults to False.
+
+    Returns:
+        Callable[[], Any]: The callable itself.
+    """
+    with _hooks_lock:
+        if all(hook != func for _, hook in _hooks):
+            _hooks.append((name or getattr(func, "__qualname__", repr(func)), func))
+            if final:
+                _final_hooks.add(func)
+    return func
+
+
+def unregister_shutdown_hook(func: Callable[[], Any]) -> None:
+    """
+    Remove a previously registered shutdown hook.
+
+    Args:
+        func (Callable[[], Any]): The callable to remove.
+    """
+    with _hooks_lock:
+        _hooks[:] = [(name, hook) for name, hook in _hooks if hook != func]
+        _final_hooks.discard(func)
+
+
+def run_shutdown_hooks(timeout: float = SHUTDOWN_TIMEOUT) -> list[str]:
+    """
+    Run every registered hook in parallel and wait for them to finish.
+
+    The final hooks run once the others are done, or once the others used
+    their share of the deadline (all but `FINAL_HOOKS_SHARE` of it), so they
+    also write out the warnings about the other hooks.
+
+    The hooks are removed from the registry, so they run at most once. Hooks
+    still running when the deadline expires are abandoned (they run in daemon
+    threads and do not delay interpreter teardown).
+
+    Args:
+        timeout (float): Total seconds to wait for all hooks.
+
+    Returns:
+        list[str]: The names of the hooks that failed or did not finish in time.
+    """
+    with _hooks_lock:
+        hooks: list[tuple[str, Callable[[], Any]]] = _hooks[:]
+        final_hooks: set[Callable[[], Any]] = _final_hooks.copy()
+        _hooks.clear()
+        _final_hooks.clear()
+
+    failed: list[str] = []
+    start: float = time.monotonic()
+    _run_hooks(
+        [(name, hook) for name, hook in hooks if hook not in final_hooks],
+        start + timeout * (1 - FINAL_HOOKS_SHARE),
+        timeout,
+        failed,
+    )
+    producers_failed: int = len(failed)
+    _run_hooks(
+        [(name, hook) for name, hook in hooks if hook in final_hooks],
+        start + timeout,
+        timeout,
+        failed,
+    )
+    if len(failed) > producers_failed:
+        # The warnings about the final hooks may be queued after their flush
+        flush_output(max(start + timeout - time.monotonic(), 0))
+    return failed
+
+
+def _run_hooks(
+    hooks: list[tuple[str, Callable[[], Any]]],
+    deadline: float,
+    timeout: float,
+    failed: list[str],
+) -> None:
+    """
+    Run hooks in parallel and wait for them until the deadline.
+
+    Args:
+        hooks (list[tuple[str, Callable[[], Any]]]): The names and hooks.
+        deadline (float): The `time.monotonic` time after which they are
+            abandoned.
+        timeout (float): The total timeout, mentioned in the warnings.
+        failed (list[str]): Receives the names of the hooks that failed or did
+            not finish in time.
+    """
+
+    def run(name: str, hook: Callable[[], Any]) -> None:
+        try:
+            hook()
+        except Exception as e:
+            failed.append(name)
+            print_warning_message(f"Shutdown hook '{name}' failed: {e}")
+
+    threads: list[tuple[str, threading.Thread]] = []
+    for name, hook in hooks:
+        thread = threading.Thread(
+            target=run, args=(name, hook), name=f"shutdown-{name}", daemon=True
+        )
+        thread.start()
+        threads.append((name, thread))
+
+    for name, thread in threads:
+        thread.join(max(deadline - time.monotonic(), 0))
+        if thread.is_alive():
+            failed.append(name)
+            print_warning_message(
+                f"Shutdown hook '{name}' did not finish within {timeout} seconds."
+            )
@@ -0,0 +1,499 @@
+"""
+Fan-out of log records to several sinks.
+
+A `FanOutHandler` routes each record to the sinks accepting its level, e.g.
+every record to the main log file and to the console, and the errors to a
+separate file:
+
+    FanOutHandler([
+        FileSink("app.log"),
+        StreamSink(level="WARNING"),
+        FileSink("errors.log", level="ERROR"),
+    ])
+
+Each record is formatted once per distinct formatter and encoded once for all
+the file sinks, instead of once per handler when attaching one handler per
+destination. Pass the sinks to `LoggerProxy.setup_logger` to add them to the
+main log file.
+
+A `SyslogSink` sends the records to the local journal or syslog daemon over
+its Unix datagram socket, without blocking the caller.
+"""
+
+import errno
+import logging
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from enum import Enum
+from pathlib import Path
+from typing import BinaryIO, Iterable, Optional, TextIO
+
+# Highest level accepted by a sink without an upper bound
+MAX_LEVEL = sys.maxsize
+
+_FORMATTER = logging.Formatter()
+# The journal and syslog record their own timestamp and priority
+_MESSAGE_FORMATTER = logging.Formatter("%(message)s")
+
+
+class Sink:
+    """
+    A destination of the records of a `FanOutHandler`.
+
+    Subclasses implement `write`, receiving the formatted record followed by a
+    newline, as bytes if `binary` is True and as a string otherwise, and its
+    level.
+
+    Args:
+        level (int | str): The lowest level written. Defaults to NOTSET.
+        max_level (int | str | None): The highest level written, None for no
+            upper bound. Defaults to None.
+        formatter (logging.Formatter, optional): The formatter of the records.
+            Defaults to the formatter of the handler.
+    """
+
+    binary: bool = False
+
+    def __init__(
+        self,
+        level: int | str = logging.NOTSET,
+        max_level: Optional[int | str] = None,
+        formatter: Optional[logging.Formatter] = None,
+    ) -> None:
+        from core_helpers.logs import _to_level
+
+        self.level: int = _to_level(level)
+        self.max_level: int = MAX_LEVEL if max_level is None else _to_level(max_level)
+        self.formatter: Optional[logging.Formatter] = formatter
+
+    def write(self, message: str | bytes, levelno: int) -> None:
+        """
+        Write a formatted record.
+
+        Args:
+            message (str | bytes): The record, ending with a newline.
+            levelno (int): The level of the record.
+        """
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """Write any buffered records."""
+
+    def close(self) -> None:
+        """Release the resources of the sink."""
+
+
+class FileSink(Sink):
+    """
+    Append the records to a file, encoded in UTF-8.
+
+    Args:
+        filename (str | Path): The path to the log file.
+        level (int | str): The lowest level written. Defaults to NOTSET.
+        max_level (int | str | None): The highest level written, None for no
+            upper bound. Defaults to None.
+        formatter (logging.Formatter, optional): The formatter of the records.
+            Defaults to the formatter of the handler.
+    """
+
+    binary = True
+
+    def __init__(
+        self,
+        filename: str | Path,
+        level: int | str = logging.NOTSET,
+        max_level: Optional[int | str] = None,
+        formatter: Optional[logging.Formatter] = None,
+    ) -> None:
+        super().__init__(level, max_level, formatter)
+        self.filename: Path = Path(filename)
+        self._file: BinaryIO = open(self.filename, "ab")
+
+    def write(self, message: str | bytes, levelno: int) -> None:
+        self._file.write(message)  # type: ignore[arg-type]
+        self._file.flush()
+
+    def flush(self) -> None:
+        if not self._file.closed:
+            self._file.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+
+class StreamSink(Sink):
+    """
+    Write the records to a text stream.
+
+    Args:
+        stream (TextIO, optional): The stream. Defaults to `sys.stderr`.
+        level (int | str): The lowest level written. Defaults to NOTSET.
+        max_level (int | str | None): The highest level written, None for no
+            upper bound. Defaults to None.
+        formatter (logging.Formatter, optional): The formatter of the records.
+            Defaults to the formatter of the handler.
+    """
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        level: int | str = logging.NOTSET,
+        max_level: Optional[int | str] = None,
+        formatter: Optional[logging.Formatter] = None,
+    ) -> None:
+        super().__init__(level, max_level, formatter)
+        self.stream: TextIO = stream or sys.stderr
+
+    def write(self, message: str | bytes, levelno: int) -> None:
+        self.stream.write(message)  # type: ignore[arg-type]
+        self.stream.flush()
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+class SyslogProtocol(Enum):
+    """The message format of a `SyslogSink` socket."""
+
+    # RFC 3164 messages, as read from /dev/log by syslog daemons
+    SYSLOG = "syslog"
+    # The native protocol of systemd-journald
+    JOURNAL = "journal"
+
+
+JOURNAL_SOCKET = "/run/systemd/journal/socket"
+SYSLOG_SOCKETS: tuple[str, ...] = ("/dev/log", "/var/run/syslog")
+
+# User-level messages
+LOG_USER = 1
+# Number of records sent together
+DEFAULT_BATCH_SIZE = 32
+# Seconds a record waits at most for the rest of its batch
+DEFAULT_MAX_LATENCY = 1.0
+# Number of records kept while the daemon is not reading, newer ones are dropped
+DEFAULT_MAX_PENDING = 1024
+# Seconds between two attempts to reconnect to an unavailable socket
+RECONNECT_INTERVAL = 5.0
+
+# Syslog severity of the logging levels, highest level first
+_SEVERITIES: tuple[tuple[int, int], ...] = (
+    (logging.CRITICAL, 2),
+    (logging.ERROR, 3),
+    (logging.WARNING, 4),
+    (logging.INFO, 6),
+)
+_MONTHS: list[str] = "Jan Feb Mar Apr May Jun Jul Aug Sep Oct Nov Dec".split()
+_LENGTH = struct.Struct("<Q")
+
+
+def _get_severity(levelno: int) -> int:
+    for level, severity in _SEVERITIES:
+        if levelno >= level:
+            return severity
+    return 7  # Debug
+
+
+class SyslogSink(Sink):
+    """
+    Send the records to the local journal or syslog daemon.
+
+    Records are queued and sent together when `batch_size` of them are
+    pending, when a record reaches `flush_level`, when the oldest pending
+    record is `max_latency` seconds old and when the sink is flushed.
+    Sends never block: while the daemon is not reading, up to `max_pending`
+    records are kept for the next attempt and newer ones are dropped and
+    counted in `dropped`. While the socket is unavailable, the records are
+    appended to the `fallback` file instead.
+
+    Args:
+        address (str | Path, optional): The path of the socket. Defaults to
+            the journal socket if it exists, else to the syslog socket.
+        protocol (SyslogProtocol, optional): The message format. Defaults to
+            JOURNAL for the journal socket and SYSLOG otherwise.
+        ident (str, optional): The program name attached to the records.
+            Defaults to the name of the running script.
+        facility (int): The syslog facility. Defaults to LOG_USER.
+        level (int | str): The lowest level written. Defaults to NOTSET.
+        max_level (int | str | None): The highest level written, None for no
+            upper bound. Defaults to None.
+        formatter (logging.Formatter, optional): The formatter of the records.
+            Defaults to the message alone.
+        batch_size (int): Number of records sent together. Defaults to
+            DEFAULT_BATCH_SIZE.
+        flush_level (int): Records at or above this level are sent at once,
+            with the pending ones. Defaults to ERROR.
+        max_latency (float): Seconds a record waits at most before being
+            sent, checked on each write and by a timer. Defaults to
+            DEFAULT_MAX_LATENCY.
+        max_pending (int): Number of records kept while the daemon is busy.
+            Defaults to DEFAULT_MAX_PENDING.
+        fallback (str | Path, optional): The file receiving the records while
+            the socket is unavailable, None to drop them.
+    """
+
+    def __init__(
+        self,
+        address: Optional[str | Path] = None,
+        protocol: Optional[SyslogProtocol] = None,
+        ident: Optional[str] = None,
+        facility: int = LOG_USER,
+        level: int | str = logging.NOTSET,
+        max_level: Optional[int | str] = None,
+        formatter: Optional[logging.Formatter] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_level: int = logging.ERROR,
+        max_latency: float = DEFAULT_MAX_LATENCY,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        fallback: Optional[str | Path] = None,
+    ) -> None:
+        super().__init__(level, max_level, formatter or _MESSAGE_FORMATTER)
+        if address is None:
+            address = next(
+                (
+                    path
+                    for path in (JOURNAL_SOCKET, *SYSLOG_SOCKETS)
+                    if os.path.exists(path)
+                ),
+                SYSLOG_SOCKETS[0],
+            )
+        self.address: str = str(address)
+        self.protocol: SyslogProtocol = protocol or (
+            SyslogProtocol.JOURNAL
+            if self.address == JOURNAL_SOCKET
+            else SyslogProtocol.SYSLOG
+        )
+        self.ident: str = ident or Path(sys.argv[0]).name or "python"
+        self.facility: int = facility
+        self.batch_size: int = batch_size
+        self.flush_level: int = flush_level
+        self.max_latency: float = max_latency
+        self.max_pending: int = max_pending
+        self.fallback: Optional[Path] = Path(fallback) if fallback else None
+        # Number of records lost because the daemon was busy or the socket
+        # unavailable without fallback
+        self.dropped: int = 0
+        # Creation time, level and message of the records not sent yet
+        self._pending: deque[tuple[float, int, str]] = deque()
+        # Sends the pending records once they are too old, while armed
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._socket: Optional[socket.socket] = None
+        self._next_connect: float = 0.0
+        self._fallback_sink: Optional[FileSink] = None
+        self._connect()
+
+    def _connect(self) -> Optional[socket.socket]:
+        """
+        Connect to the socket, at most once every `RECONNECT_INTERVAL`.
+
+        Returns:
+            socket.socket | None: The connected socket, or None if it is
+                unavailable.
+        """
+        if not hasattr(socket, "AF_UNIX") or time.monotonic() < self._next_connect:
+            return None
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            sock.setblocking(False)
+            sock.connect(self.address)
+        except OSError:
+            sock.close()
+            self._next_connect = time.monotonic() + RECONNECT_INTERVAL
+            return None
+        self._socket = sock
+        return sock
+
+    def _encode(self, created: float, levelno: int, message: str) -> bytes:
+        """
+        Build the datagram of a record.
+
+        Args:
+            created (float): The creation time of the record.
+            levelno (int): The level of the record.
+            message (str): The formatted record.
+
+        Returns:
+            bytes: The datagram in the format of the protocol.
+        """
+        severity: int = _get_severity(levelno)
+        if self.protocol is SyslogProtocol.JOURNAL:
+            fields: tuple[tuple[bytes, str], ...] = (
+                (b"MESSAGE", message),
+                (b"PRIORITY", str(severity)),
+                (b"SYSLOG_FACILITY", str(self.facility)),
+                (b"SYSLOG_IDENTIFIER", self.ident),
+                (b"SYSLOG_PID", str(os.getpid())),
+            )
+            parts: list[bytes] = []
+            for name, value in fields:
+                data: bytes = value.encode("utf-8", "backslashreplace")
+                if b"\n" in data:
+                    # Multi-line values are sent with their length
+                    parts.append(name + b"\n" + _LENGTH.pack(len(data)) + data + b"\n")
+                else:
+                    parts.append(name + b"=" + data + b"\n")
+            return b"".join(parts)
+
+        timestamp: time.struct_time = time.localtime(created)
+        header: str = (
+            f"<{self.facility * 8 + severity}>{_MONTHS[timestamp.tm_mon - 1]} "
+            f"{timestamp.tm_mday:2d} {time.strftime('%H:%M:%S', timestamp)} "
+            f"{self.ident}[{os.getpid()}]: "
+        )
+        return (header + message).encode("utf-8", "backslashreplace")
+
+    def write(self, message: str | bytes, levelno: int) -> None:
+        if isinstance(message, bytes):
+            message = message.decode("utf-8", "backslashreplace")
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self._flush()  # Make room if the daemon caught up
+                if len(self._pending) >= self.max_pending:
+                    self.dropped += 1
+                    return
+            created: float = time.time()
+            self._pending.append((created, levelno, message.rstrip("\n")))
+            if (
+                len(self._pending) >= self.batch_size
+                or levelno >= self.flush_level
+                or created - self._pending[0][0] >= self.max_latency
+            ):
+                self._flush()
+            if self._pending and self._timer is None:
+                self._start_timer()
+
+    def _start_timer(self) -> None:
+        """Send the pending records in `max_latency` seconds, lock held."""
+        self._timer = threading.Timer(self.max_latency, self._flush_expired)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_expired(self) -> None:
+        """Send the records pending since the timer was started."""
+        with self._lock:
+            if self._timer is not threading.current_thread():
+                return  # Cancelled by close
+            self._timer = None
+            self._flush()
+            if self._pending:
+                self._start_timer()  # The daemon is busy, retry later
+
+    def flush(self) -> None:
+        """Send the pending records, or write them to the fallback file."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        """Send the pending records, with the lock held."""
+        if not self._pending:
+            return
+        sock: Optional[socket.socket] = self._socket or self._connect()
+        while sock is not None and self._pending:
+            try:
+                sock.send(self._encode(*self._pending[0]))
+            except BlockingIOError:
+                return  # The daemon is busy, retry on the next flush
+            except OSError as e:
+                if e.errno == errno.EMSGSIZE:
+                    self.dropped += 1  # Larger than the socket accepts
+                else:
+                    # The daemon went away, e.g. it is restarting
+                    sock.close()
+                    self._socket = sock = None
+                    self._next_connect = time.monotonic() + RECONNECT_INTERVAL
+                    break
+            self._pending.popleft()
+        if self._pending:
+            self._write_fallback()
+
+    def _write_fallback(self) -> None:
+        """Append the pending records to the fallback file, or drop them."""
+        if self.fallback is None:
+            self.dropped += len(self._pending)
+            self._pending.clear()
+            return
+        if self._fallback_sink is None:
+            self._fallback_sink = FileSink(self.fallback)
+        while self._pending:
+            created, levelno, message = self._pending.popleft()
+            line: str = (
+                f"[{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(created))}] "
+                f"{logging.getLevelName(levelno)}: {message}\n"
+            )
+            self._fallback_sink.write(line.encode("utf-8", "backslashreplace"), levelno)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._flush()
+            # Records the daemon did not accept in time are lost
+            self.dropped += len(self._pending)
+            self._pending.clear()
+            if self._socket is not None:
+                self._socket.close()
+                self._socket = None
+            if self._fallback_sink is not None:
+                self._fallback_sink.close()
+
+
+class FanOutHandler(logging.Handler):
+    """
+    Logging handler writing each record to the sinks accepting its level.
+
+    The handler level is the lowest level of its sinks, so the records that no
+    sink accepts are neither filtered nor formatted.
+
+    Args:
+        sinks (Iterable[Sink]): The sinks.
+    """
+
+    def __init__(self, sinks: Iterable[Sink]) -> None:
+        self.sinks: list[Sink] = list(sinks)
+        super().__init__(min((sink.level for sink in self.sinks), default=0))
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # Formatted text and encoded bytes of the record, per formatter
+        texts: dict[logging.Formatter, str] = {}
+        data: dict[logging.Formatter, bytes] = {}
+        levelno: int = record.levelno
+        for sink in self.sinks:
+            if not sink.level <= levelno <= sink.max_level:
+                continue
+            try:
+                formatter: logging.Formatter = (
+                    sink.formatter or self.formatter or _FORMATTER
+                )
+                text: Optional[str] = texts.get(formatter)
+                if text is None:
+                    text = texts[formatter] = formatter.format(record) + "\n"
+                if sink.binary:
+                    encoded: Optional[bytes] = data.get(formatter)
+                    if encoded is None:
+                        encoded = data[formatter] = text.encode(
+                            "utf-8", "backslashreplace"
+                        )
+                    sink.write(encoded, levelno)
+                else:
+                    sink.write(text, levelno)
+            except Exception:
+                # A failing sink does not prevent writing to the others
+                self.handleError(record)
+
+    def flush(self) -> None:
+        with self.lock:
+            for sink in self.sinks:
+                sink.flush()
+
+    def close(self) -> None:
+        with self.lock:
+            for sink in self.sinks:
+                sink.close()
+        super().close()
@@ -0,0 +1,451 @@
+"""
+Lightweight tracing spans.
+
+`span` measures the monotonic duration of a block or a function call, along
+with its nesting and attributes:
+
+    with span("db.query", table="users") as query:
+        rows = run_query()
+        query.set(rows=len(rows))
+
+    @span("parse")
+    def parse(data): ...
+
+Tracing is disabled by default and a disabled span costs a dictionary lookup
+and a flag check, so spans can stay in hot paths. Set the ``CORE_HELPERS_TRACING``
+environment variable (``log`` or ``histogram``, optionally followed by a sample
+rate such as ``histogram:0.1``) or call `enable_tracing` to record them:
+
+- In `SpanMode.LOG` mode, every finished span is emitted as one record of the
+  "tracing" child logger of `logger`.
+- In `SpanMode.HISTOGRAM` mode, durations are aggregated per span name and
+  reported by a shutdown hook when `exit_session` is called.
+"""
+
+import functools
+import logging
+import math
+import random
+import sys
+import threading
+import warnings
+from contextvars import ContextVar, Token
+from enum import Enum
+from os import getenv
+from time import perf_counter
+from typing import Any, Callable, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+TRACING_ENV_VAR = "CORE_HELPERS_TRACING"
+
+
+class SpanMode(Enum):
+    """How finished spans are recorded."""
+
+    LOG = "log"
+    HISTOGRAM = "histogram"
+
+
+_enabled: bool = False
+_mode: SpanMode = SpanMode.LOG
+_sample_rate: float = 1.0
+_level: int = logging.DEBUG
+
+# Innermost span of the current thread or task
+_current_span: ContextVar[Optional["Span"]] = ContextVar(
+    "core_helpers_span", default=None
+)
+
+# Span name -> span shared by the blocks using it while tracing is disabled
+_disabled_spans: dict[str, "Span"] = {}
+# Spans with dynamic names are not shared beyond this number
+MAX_DISABLED_SPANS = 1024
+
+# Span name -> duration histogram, one dict per thread so that recording a span
+# never contends with other threads. Reports merge the dicts of every thread.
+_thread_state = threading.local()
+_thread_histograms: list["_ThreadHistograms"] = []
+# Histograms of the threads that exited, merged so their dicts can be dropped
+_finished_histograms: dict[str, "_Histogram"] = {}
+_histograms_lock = threading.Lock()
+
+
+class _Histogram:
+    """Durations of the spans sharing a name, in power-of-two buckets."""
+
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.total: float = 0.0
+        self.min: float = math.inf
+        self.max: float = 0.0
+        # Exponent e -> number of durations below 2**e microseconds
+        self.buckets: dict[int, int] = {}
+
+    def add(self, duration: float) -> None:
+        self.count += 1
+        self.total += duration
+        self.min = min(self.min, duration)
+        self.max = max(self.max, duration)
+        exponent: int = max(math.frexp(duration * 1e6)[1], 0)
+        self.buckets[exponent] = self.buckets.get(exponent, 0) + 1
+
+    def merge(self, other: "_Histogram") -> None:
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        for exponent, count in list(other.buckets.items()):
+            self.buckets[exponent] = self.buckets.get(exponent, 0) + count
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Estimate a percentile from the bucket bounds.
+
+        Args:
+            fraction (float): The percentile, between 0 and 1.
+
+        Returns:
+            float: The upper bound of the bucket holding the percentile, in
+                seconds, capped by the largest duration.
+        """
+        rank: float = fraction * self.count
+        seen: int = 0
+        for exponent in sorted(self.buckets):
+            seen += self.buckets[exponent]
+            if seen >= rank:
+                return min(2**exponent / 1e6, self.max)
+        return self.max
+
+
+class _ThreadHistograms:
+    """The span histograms recorded by one thread."""
+
+    __slots__ = ("thread", "histograms")
+
+    def __init__(self) -> None:
+        self.thread: threading.Thread = threading.current_thread()
+        self.histograms: dict[str, _Histogram] = {}
+
+
+def _merge_histograms(
+    target: dict[str, _Histogram], source: dict[str, _Histogram]
+) -> None:
+    """
+    Add the histograms of `source` to those of `target`.
+
+    Args:
+        target (dict[str, _Histogram]): The histograms updated.
+        source (dict[str, _Histogram]): The histograms added.
+    """
+    for name, histogram in list(source.items()):
+        if histogram.count:  # Skip histograms being created
+            target.setdefault(name, _Histogram()).merge(histogram)
+
+
+def _retire_finished_threads() -> None:
+    """
+    Merge the histograms of the exited threads into `_finished_histograms` and
+    stop tracking them, so the list only grows with the running threads. Must
+    be called with `_histograms_lock` held.
+    """
+    alive: list[_ThreadHistograms] = []
+    for recorded in _thread_histograms:
+        if recorded.thread.is_alive():
+            alive.append(recorded)
+        else:
+            _merge_histograms(_finished_histograms, recorded.histograms)
+    _thread_histograms[:] = alive
+
+
+class Span:
+    """
+    A timed block, created by `span`.
+
+    Args:
+        name (str): The name of the span.
+        attributes (dict[str, Any]): Attributes recorded with the span.
+    """
+
+    __slots__ = ("name", "attributes", "path", "duration", "_start", "_token")
+
+    def __init__(self, name: str, attributes: dict[str, Any]) -> None:
+        self.name: str = name
+        self.attributes: dict[str, Any] = attributes
+        # Names of the enclosing spans and this one, joined with "/"
+        self.path: str = name
+        # Duration in seconds, None until the span is finished
+        self.duration: Optional[float] = None
+        self._start: Optional[float] = None
+        self._token: Optional[Token] = None
+
+    def set(self, **attributes: Any) -> None:
+        """Add attributes to the span. Ignored while tracing is disabled."""
+        if _enabled:
+            self.attributes.update(attributes)
+
+    def __enter__(self) -> "Span":
+        if not _enabled:
+            return self
+
+        parent: Optional[Span] = _current_span.get()
+        if parent is None:
+            sampled: bool = _sample_rate >= 1.0 or random.random() < _sample_rate
+        else:
+            # Children follow the sampling decision of their root span
+            sampled = parent._start is not None
+            self.path = f"{parent.path}/{self.name}"
+        self._token = _current_span.set(self)
+        if sampled:
+            self._start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self._token is None:
+            return
+        _current_span.reset(self._token)
+        self._token = None
+        if self._start is None:
+            return
+        self.duration = perf_counter() - self._start
+        self._start = None
+        _record(self)
+
+    def __call__(self, func: F) -> F:
+        """Use the span as a decorator, timing every call of `func`."""
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _enabled:
+                return func(*args, **kwargs)
+            with Span(self.name, dict(self.attributes)):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+
+def span(name: str, **attributes: Any) -> Span:
+    """
+    Create a span, to be used as a context manager or a decorator.
+
+    Args:
+        name (str): The name of the span.
+        **attributes (Any): Attributes recorded with the span.
+
+    Returns:
+        Span: The span.
+    """
+    if not _enabled and not attributes:
+        # Disabled spans have no state, share them to save an allocation
+        disabled: Optional[Span] = _disabled_spans.get(name)
+        if disabled is None:
+            disabled = Span(name, {})
+            if len(_disabled_spans) < MAX_DISABLED_SPANS:
+                _disabled_spans[name] = disabled
+        return disabled
+    return Span(name, attributes)
+
+
+def _record(finished: Span) -> None:
+    """
+    Log or aggregate a finished span.
+
+    Args:
+        finished (Span): The span.
+    """
+    if _mode is SpanMode.HISTOGRAM:
+        histograms: Optional[dict[str, _Histogram]] = getattr(
+            _thread_state, "histograms", None
+        )
+        if histograms is None:
+            recorded = _ThreadHistograms()
+            histograms = _thread_state.histograms = recorded.histograms
+            with _histograms_lock:
+                _retire_finished_threads()
+                _thread_histograms.append(recorded)
+        histogram: Optional[_Histogram] = histograms.get(finished.name)
+        if histogram is None:
+            histogram = histograms[finished.name] = _Histogram()
+        histogram.add(finished.duration or 0.0)
+        return
+
+    attributes: str = "".join(
+        f" {key}={value!r}" for key, value in finished.attributes.items()
+    )
+    _log(
+        "span %s: %.3f ms%s",
+        finished.path,
+        (finished.duration or 0.0) * 1000,
+        attributes,
+    )
+
+
+def _log(msg: str, *args: Any) -> None:
+    """
+    Emit a record through the "tracing" child logger of `logger`.
+
+    Records are dropped if the logger has not been initialized.
+
+    Args:
+        msg (str): The %-style format string.
+        *args (Any): The format arguments.
+    """
+    from core_helpers.logs import logger
+
+    if not logger.is_initialized():
+        return
+    child = logger.get_child("tracing")
+    if isinstance(child, logging.Logger):
+        child.log(_level, msg, *args)
+    else:
+        child.log(logging.getLevelName(_level), msg % args)
+
+
+def enable_tracing(
+    mode: SpanMode = SpanMode.LOG,
+    sample_rate: float = 1.0,
+    level: int | str = logging.DEBUG,
+) -> None:
+    """
+    Start recording spans.
+
+    Args:
+        mode (SpanMode): Log every span, or aggregate them into histograms.
+            Defaults to SpanMode.LOG.
+        sample_rate (float): Fraction of the root spans recorded, with their
+            children. Defaults to 1.0.
+        level (int | str): Level of the span and histogram records. Defaults
+            to DEBUG.
+
+    Raises:
+        ValueError: If the sample rate is not between 0 and 1.
+    """
+    from core_helpers.logs import _to_level
+    from core_helpers.shutdown import register_shutdown_hook
+
+    global _enabled, _mode, _sample_rate, _level
+    if not 0.0 <= sample_rate <= 1.0:
+        raise ValueError(f"Sample rate must be between 0 and 1, got {sample_rate}")
+    _mode = mode
+    _sample_rate = sample_rate
+    _level = _to_level(level)
+    _enabled = True
+    _disabled_spans.clear()
+    if mode is SpanMode.HISTOGRAM:
+        register_shutdown_hook(report_spans, "tracing")
+
+
+def disable_tracing() -> None:
+    """Stop recording spans and discard the histograms."""
+    from core_helpers.shutdown import unregister_shutdown_hook
+
+    global _enabled
+    _enabled = False
+    with _histograms_lock:
+        _finished_histograms.clear()
+        for recorded in _thread_histograms:
+            recorded.histograms.clear()
+    unregister_shutdown_hook(report_spans)
+
+
+def is_tracing_enabled() -> bool:
+    """
+    Check if spans are recorded.
+
+    Returns:
+        bool: True if tracing is enabled, False otherwise.
+    """
+    return _enabled
+
+
+def get_span_stats() -> list[dict[str, Any]]:
+    """
+    Return the aggregated span durations, slowest total first.
+
+    Returns:
+        list[dict[str, Any]]: One entry per span name with its number of
+            calls and its total, mean, min, p50, p99 and max durations in
+            milliseconds.
+    """
+    merged: dict[str, _Histogram] = {}
+    with _histograms_lock:
+        _retire_finished_threads()
+        _merge_histograms(merged, _finished_histograms)
+        for recorded in _thread_histograms:
+            _merge_histograms(merged, recorded.histograms)
+
+    return [
+        {
+            "span": name,
+            "calls": histogram.count,
+            "total_ms": round(histogram.total * 1000, 3),
+            "mean_ms": round(histogram.total / histogram.count * 1000, 3),
+            "min_ms": round(histogram.min * 1000, 3),
+            "p50_ms": round(histogram.percentile(0.5) * 1000, 3),
+            "p99_ms": round(histogram.percentile(0.99) * 1000, 3),
+            "max_ms": round(histogram.max * 1000, 3),
+        }
+        for name, histogram in sorted(
+            merged.items(), key=lambda item: item[1].total, reverse=True
+        )
+    ]
+
+
+def report_spans() -> None:
+    """
+    Emit one record per span name with its aggregated durations.
+
+    The report is printed to stderr if the logger has not been initialized.
+    """
+    from core_helpers.logs import logger
+
+    stats: list[dict[str, Any]] = get_span_stats()
+    for entry in stats:
+        msg: str = (
+            "span %s: %d calls, total %.3f ms, mean %.3f ms, min %.3f ms, "
+            "p50 %.3f ms, p99 %.3f ms, max %.3f ms"
+        )
+        args: tuple = tuple(entry.values())
+        if logger.is_initialized():
+            _log(msg, *args)
+        else:
+            print(msg % args, file=sys.stderr)
+
+
+def _parse_sample_rate(value: str) -> float:
+    """
+    Parse the sample rate of the environment variable.
+
+    It is read at import time, so an invalid rate falls back to 1.0 with a
+    warning instead of breaking the import of core_helpers.
+
+    Args:
+        value (str): The rate following the mode, e.g. "0.1".
+
+    Returns:
+        float: The sample rate, 1.0 if it is missing or invalid.
+    """
+    if not value:
+        return 1.0
+    try:
+        rate: float = float(value)
+    except ValueError:
+        rate = math.nan
+    if not 0.0 <= rate <= 1.0:
+        warnings.warn(
+            f"Invalid sample rate in {TRACING_ENV_VAR}: {value!r}, using 1.0",
+            RuntimeWarning,
+        )
+        return 1.0
+    return rate
+
+
+_env_value: str = getenv(TRACING_ENV_VAR, "")
+if _env_value and _env_value.lower() not in ("0", "false", "no"):
+    _env_mode, _, _env_rate = _env_value.partition(":")
+    enable_tracing(
+        SpanMode.HISTOGRAM if _env_mode.lower() == "histogram" else SpanMode.LOG,
+        _parse_sample_rate(_env_rate),
+    )
@@ -1,12 +1,85 @@
+import hashlib
+import json
+import os
 import re
-from typing import Optional
-from urllib.parse import urlparse
-
-import requests
-from packaging.version import InvalidVersion, Version
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, TypeVar
+from urllib.parse import quote, urlparse
+
+from packaging.version import Version
 from rich import print
 
+from core_helpers import http_client
+from core_helpers.cache import DiskCache
+from core_helpers.http_client import RequestError, Response
+from core_helpers.profiling import profile_phase
+from core_helpers.runtime_checks import runtime_checked
+from core_helpers.versions import get_latest_version, parse_version
+from core_helpers.xdg_paths import PathType, get_user_path
+
+T = TypeVar("T")
+
 MAX_TIMEOUT = 10
+# Largest API response read, larger responses fail the check
+MAX_RESPONSE_SIZE = 4 * 1024 * 1024
+
+# API base URL of each supported platform, keyed by the repository host
+API_BASES: dict[str, str] = {
+    "github.com": "https://api.github.com/repos",
+    "gitlab.com": "https://gitlab.com/api/v4/projects",
+    "gitee.com": "https://gitee.com/api/v5/repos",
+    "codeberg.org": "https://codeberg.org/api/v1/repos",
+    "gitea.com": "https://gitea.com/api/v1/repos",
+    "gitea.angry.im": "https://gitea.angry.im/api/v1/repos",
+    "git.cryto.net": "https://git.cryto.net/api/v1/repos",
+}
+
+# Environment variable holding an API token, the header used to send it and
+# the header value format, keyed by the repository host
+API_TOKENS: dict[str, tuple[str, str, str]] = {
+    "github.com": ("GITHUB_TOKEN", "Authorization", "Bearer {}"),
+    "gitlab.com": ("GITLAB_TOKEN", "PRIVATE-TOKEN", "{}"),
+    "codeberg.org": ("CODEBERG_TOKEN", "Authorization", "token {}"),
+    "gitea.com": ("GITEA_TOKEN", "Authorization", "token {}"),
+}
+
+# File shared by all local processes to track the remaining API budget
+RATE_LIMIT_FILE = "rate_limits.json"
+# Longest time to wait for a rate limit reset instead of skipping the check
+RATE_LIMIT_MAX_WAIT = 2.0
+# Age after which a rate limit lock left behind by a crashed process is ignored
+RATE_LIMIT_LOCK_STALE = 2.0
+
+# Seconds during which a successful update-check result is reused
+SINGLE_FLIGHT_TTL = 60
+# Longest time to wait for another process performing the same check
+SINGLE_FLIGHT_WAIT = 5.0
+# Age after which a lock left behind by a crashed process is ignored
+SINGLE_FLIGHT_STALE = 3 * MAX_TIMEOUT
+
+# Seconds to wait for the latest release before also requesting the tags
+TAG_LOOKUP_DELAY = 0.25
+# Seconds during which a repository without releases gets both lookups at once
+NO_RELEASES_TTL = 7 * 24 * 3600
+
+# Release tags and names considered as versions
+_RELEASE_VERSION = re.compile(r".*v?\d+\.\d+\.\d+")
+
+
+# Serializes the budget updates of the threads of this process
+_rate_limit_lock = threading.Lock()
+
+
+class RateLimitExceeded(RequestError):
+    """Raised when a request is skipped because the API budget is exhausted."""
+
 
 """
 # TODO: Try to use semver library to compare versions
@@ -20,75 +93,367 @@ if semver.compare(latest_version, VERSION) > 0:
 """
 
 
-def _get_latest_release_version(repo_url: str, is_gitlab: bool = False) -> str | None:
+def _get_rate_limit_path() -> Path:
     """
-    Retrieve the latest release version from the repository.
+    Return the path of the file holding the shared API rate limit budget.
+
+    Returns:
+        Path: The path to the rate limit file.
+    """
+    return get_user_path("core_helpers", PathType.CACHE) / RATE_LIMIT_FILE
 
-    Args:
-        repo_url (str): The URL of the repository releases.
-        is_gitlab (bool): Whether the repository is hosted on GitLab.
+
+def _load_rate_limits() -> dict[str, dict[str, float]]:
+    """
+    Load the rate limit budget of every API host.
 
     Returns:
-        str | None: The name of the latest release version if found, else None.
+        dict[str, dict[str, float]]: The remaining requests and the reset time
+            (as a UNIX timestamp) keyed by API host.
     """
     try:
-        if is_gitlab:
-            # Adjust the URL for GitLab's permalink for the latest release
-            repo_url = repo_url.replace(
-                "/releases/latest", "/releases/permalink/latest"
-            )
+        return json.loads(_get_rate_limit_path().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
 
-        response: requests.Response = requests.get(repo_url, timeout=MAX_TIMEOUT)
-        response.raise_for_status()
 
-        tag_name = response.json().get("tag_name")
-        name = response.json().get("name")
-        # Check if the tag_name is a valid version
-        if tag_name and re.match(r".*v?\d+\.\d+\.\d+", tag_name):
-            return tag_name
-        elif name and re.match(r".*v?\d+\.\d+\.\d+", name):
-            return name
-        return None
-    except requests.exceptions.RequestException:
-        return None
+def _write_json_atomic(path: Path, data: object) -> None:
+    """
+    Atomically replace a JSON file so concurrent readers never see a partially
+    written file.
+
+    Args:
+        path (Path): The file to write.
+        data (object): The JSON-serializable data.
+    """
+    try:
+        with tempfile.NamedTemporaryFile(
+            "w", dir=path.parent, suffix=".tmp", delete=False, encoding="utf-8"
+        ) as tmp_file:
+            json.dump(data, tmp_file)
+        os.replace(tmp_file.name, path)
+    except OSError:
+        # The shared state is only an optimization, never fail the update check
+        pass
+
+
+def _save_rate_limits(limits: dict[str, dict[str, float]]) -> None:
+    """
+    Save the rate limit budget of every API host.
+
+    Args:
+        limits (dict[str, dict[str, float]]): The budget keyed by API host.
+    """
+    try:
+        path: Path = _get_rate_limit_path()
+    except OSError:
+        return  # The cache directory is unusable, keep the budget in memory only
+    _write_json_atomic(path, limits)
+
+
+@contextmanager
+def _lock_rate_limits() -> Iterator[None]:
+    """
+    Serialize the updates of the shared rate limit budget, between the threads
+    of this process and between the local processes.
+
+    The processes take a lock file next to the budget file, the atomic
+    replace of the budget file alone does not prevent lost updates.
+    """
+    try:
+        lock_path: Optional[Path] = _get_rate_limit_path().with_suffix(".lock")
+    except OSError:
+        lock_path = None  # The cache directory is unusable
+    with _rate_limit_lock:
+        fd: Optional[int] = None
+        while fd is None and lock_path is not None:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    lock_age: float = time.time() - lock_path.stat().st_mtime
+                except FileNotFoundError:
+                    continue  # The lock was released meanwhile
+                if lock_age > RATE_LIMIT_LOCK_STALE:
+                    lock_path.unlink(missing_ok=True)
+                    continue
+                time.sleep(0.001)
+            except OSError:
+                # The cache directory is not writable, and neither is the
+                # budget, only serialize the threads
+                break
+        try:
+            yield
+        finally:
+            if fd is not None and lock_path is not None:
+                os.close(fd)
+                lock_path.unlink(missing_ok=True)
+
+
+def _get_rate_limit_wait(url: str) -> float:
+    """
+    Get the number of seconds to wait before the API host of `url` accepts
+    requests again.
+
+    Args:
+        url (str): The URL about to be requested.
+
+    Returns:
+        float: The seconds until the budget resets, 0 if requests are allowed.
+    """
+    entry: dict[str, float] | None = _load_rate_limits().get(urlparse(url).netloc)
+    if not entry or entry["remaining"] > 0:
+        return 0.0
+    return max(entry["reset"] - time.time(), 0.0)
 
 
-def _parse_version_tag(tag_name: str) -> Version:
+def _reserve_request(url: str) -> None:
     """
-    Parse a version tag, stripping any leading non-numeric characters like 'v'.
+    Take one request from the shared budget of the API host of `url`.
 
     Args:
-        tag_name (str): The name of the tag (e.g., 'v5.5.1').
+        url (str): The URL about to be requested.
+
+    Raises:
+        RateLimitExceeded: If the budget will not reset within
+            `RATE_LIMIT_MAX_WAIT` seconds.
+    """
+    api_host: str = urlparse(url).netloc
+    with _lock_rate_limits():
+        limits: dict[str, dict[str, float]] = _load_rate_limits()
+        entry: dict[str, float] | None = limits.get(api_host)
+        if not entry or entry["reset"] <= time.time():
+            return
+
+        if entry["remaining"] > 0:
+            entry["remaining"] -= 1
+            _save_rate_limits(limits)
+            return
+
+    wait: float = entry["reset"] - time.time()
+    if wait > RATE_LIMIT_MAX_WAIT:
+        raise RateLimitExceeded(f"Rate limit of {api_host} exhausted")
+    # Back off until the budget resets
+    time.sleep(wait)
+
+
+def _parse_retry_after(value: str) -> float:
+    """
+    Parse a `Retry-After` header given either in seconds or as an HTTP date.
+
+    Args:
+        value (str): The header value.
 
     Returns:
-        Version: Parsed Version object.
+        float: The UNIX timestamp after which requests are allowed again.
     """
-    if not tag_name:
-        return Version("0.0.0")
-    # Remove any prefix like 'v' or 'release-'
-    version_str = re.sub(r"^[^\d]*", "", tag_name)
+    if value.isdigit():
+        return time.time() + int(value)
     try:
-        return Version(version_str)
-    except InvalidVersion:
-        return Version("0.0.0")
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return time.time() + MAX_TIMEOUT
+
+
+def _update_rate_limit(url: str, response: Response) -> None:
+    """
+    Record the rate limit headers of a response in the shared budget.
+
+    Both the `X-RateLimit-*` (GitHub, Gitea) and `RateLimit-*` (GitLab) headers
+    are understood, as well as `Retry-After` on rejected requests.
+
+    Args:
+        url (str): The requested URL.
+        response (Response): The response received.
+    """
+    headers = response.headers
+    remaining: str | None = headers.get(
+        "X-RateLimit-Remaining", headers.get("RateLimit-Remaining")
+    )
+    reset: str | None = headers.get("X-RateLimit-Reset", headers.get("RateLimit-Reset"))
+    retry_after: str | None = headers.get("Retry-After")
+
+    entry: dict[str, float]
+    if retry_after and response.status_code in (403, 429):
+        entry = {"remaining": 0, "reset": _parse_retry_after(retry_after)}
+    elif remaining is not None and reset is not None:
+        try:
+            reset_time = float(reset)
+            entry = {"remaining": int(remaining), "reset": reset_time}
+        except ValueError:
+            return
+        if reset_time < 1e9:
+            # Some platforms send the seconds left instead of a timestamp
+            entry["reset"] = time.time() + reset_time
+    else:
+        return
+
+    api_host: str = urlparse(url).netloc
+    with _lock_rate_limits():
+        limits: dict[str, dict[str, float]] = _load_rate_limits()
+        previous: dict[str, float] | None = limits.get(api_host)
+        if previous and abs(previous["reset"] - entry["reset"]) < 1:
+            # Concurrent responses of the same window may be recorded out of
+            # order, the budget can only decrease within a window
+            entry["remaining"] = min(entry["remaining"], previous["remaining"])
+        limits[api_host] = entry
+        _save_rate_limits(limits)
 
 
-def _get_latest_tag(tags: list[dict[str, str]]) -> str:
+def _get_auth_headers(url: str) -> dict[str, str]:
     """
-    Get the latest version tag from a list of tags.
+    Build the authentication headers for `url` from the platform's token
+    environment variable, if set.
 
     Args:
-        tags (list[dict[str, str]]): List of tags retrieved from the repository.
+        url (str): The URL about to be requested.
 
     Returns:
-        str: The name of the latest version tag.
+        dict[str, str]: The headers to send with the request.
+    """
+    for host, api_base in API_BASES.items():
+        if url.startswith(api_base) and host in API_TOKENS:
+            env_var, header, value = API_TOKENS[host]
+            token: str | None = os.getenv(env_var)
+            if token:
+                return {header: value.format(token)}
+    return {}
+
+
+@contextmanager
+def _http_get(url: str) -> Iterator[Response]:
+    """
+    Send a GET request honoring the shared API rate limit budget.
+
+    The body is streamed and limited to `MAX_RESPONSE_SIZE` bytes, the
+    response is closed on exit.
+
+    Args:
+        url (str): The URL to request.
+
+    Yields:
+        Response: The successful response, before its body is read.
+
+    Raises:
+        RequestError: If the request fails, is skipped because the rate
+            limit is exhausted, or its response is too large.
+    """
+    _reserve_request(url)
+    with http_client.stream(
+        url,
+        headers=_get_auth_headers(url),
+        timeout=MAX_TIMEOUT,
+        max_bytes=MAX_RESPONSE_SIZE,
+    ) as response:
+        _update_rate_limit(url, response)
+        response.raise_for_status()
+        yield response
+
+
+def _single_flight(
+    key: str, fetch: Callable[[], Optional[str]]
+) -> tuple[bool, Optional[str]]:
     """
-    # Parse all version tags and sort them
-    parsed_tags = [(_parse_version_tag(tag["name"]), tag["name"]) for tag in tags]
-    sorted_tags = sorted(parsed_tags, key=lambda x: x[0])
+    Run `fetch` in a single process per host for all concurrent callers using
+    the same `key`.
 
-    # Return the name of the latest tag
-    return sorted_tags[-1][1]  # The last tag in the sorted list is the latest
+    The first caller takes a lock file in the cache directory, runs `fetch` and
+    publishes its result in a `DiskCache`. Other callers wait up to
+    `SINGLE_FLIGHT_WAIT` seconds for that result instead of fetching it again.
+    A successful result is reused for `SINGLE_FLIGHT_TTL` seconds, a failed
+    one (None) is only kept for the callers already waiting on it.
+
+    Args:
+        key (str): Identifies the work being deduplicated.
+        fetch (Callable[[], Optional[str]]): The function doing the work.
+
+    Returns:
+        tuple[bool, Optional[str]]: Whether a result is available (False if
+            the wait timed out) and the result itself.
+    """
+    cache = DiskCache("core_helpers", "updates")
+    digest: str = hashlib.sha256(key.encode()).hexdigest()[:16]
+
+    result = cache.get(key)
+    if result is not None and result["version"] is not None:
+        return True, result["version"]
+
+    for _ in range(2):
+        try:
+            lock_path: Path = cache.directory / f"{digest}.lock"
+            fd: int = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                lock_age: float = time.time() - lock_path.stat().st_mtime
+            except FileNotFoundError:
+                continue  # The lock was released meanwhile
+            if lock_age > SINGLE_FLIGHT_STALE:
+                lock_path.unlink(missing_ok=True)
+                continue
+            break
+        except OSError:
+            # The cache directory is not writable, do the work ourselves
+            return True, fetch()
+
+        os.close(fd)
+        try:
+            version: Optional[str] = fetch()
+            cache.set(
+                key,
+                {"version": version},
+                SINGLE_FLIGHT_TTL if version is not None else SINGLE_FLIGHT_WAIT,
+            )
+            return True, version
+        finally:
+            lock_path.unlink(missing_ok=True)
+
+    # Another process is performing the check, wait for its result
+    deadline: float = time.monotonic() + SINGLE_FLIGHT_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        result = cache.get(key)
+        if result is not None:
+            return True, result["version"]
+    return False, None
+
+
+def _get_latest_release_version(repo_url: str, is_gitlab: bool = False) -> str | None:
+    """
+    Retrieve the latest release version from the repository.
+
+    Args:
+        repo_url (str): The URL of the repository releases.
+        is_gitlab (bool): Whether the repository is hosted on GitLab.
+
+    Returns:
+        str | None: The name of the latest release version if found, else None.
+    """
+    try:
+        if is_gitlab:
+            # Adjust the URL for GitLab's permalink for the latest release
+            repo_url = repo_url.replace(
+                "/releases/latest", "/releases/permalink/latest"
+            )
+
+        # Only read the release up to its tag and name, the assets and
+        # release notes following them can be large
+        release: dict[str, Any] = {}
+        with _http_get(repo_url) as response:
+            for key, value in response.iter_json_items():
+                if key in ("tag_name", "name"):
+                    release[key] = value
+                    if len(release) == 2:
+                        break
+        tag_name = release.get("tag_name")
+        name = release.get("name")
+        # Check if the tag_name is a valid version
+        if tag_name and _RELEASE_VERSION.match(tag_name):
+            return tag_name
+        elif name and _RELEASE_VERSION.match(name):
+            return name
+        return None
+    except RequestError:
+        return None
 
 
 def _get_latest_tag_version(repo_url: str) -> str | None:
@@ -102,37 +467,31 @@ def _get_latest_tag_version(repo_url: str) -> str | None:
         str | None: The name of the latest tag if found, else None.
     """
     try:
-        response: requests.Response = requests.get(repo_url, timeout=MAX_TIMEOUT)
-        response.raise_for_status()
-        tags = response.json()
-        if tags:
-            return _get_latest_tag(tags)
-        return None
-    except requests.exceptions.RequestException:
+        # Decode the tags one at a time, only their names are kept
+        with _http_get(repo_url) as response:
+            return get_latest_version(
+                tag["name"]
+                for _, tag in response.iter_json_items()
+                if isinstance(tag, dict) and isinstance(tag.get("name"), str)
+            )
+    except RequestError:
         return None
 
 
-def _get_gitlab_project_id(api_url: str, gitlab_url: str) -> str | None:
+def _get_gitlab_project_id(gitlab_url: str) -> str:
     """
-    Retrieve the GitLab project ID based on the given URL.
+    Build the GitLab project ID based on the given URL.
+
+    The GitLab API accepts the URL-encoded project path wherever a numeric
+    project ID is expected, so no request is needed to resolve it.
 
     Args:
-        api_url (str): The base URL of the GitLab API.
         gitlab_url (str): The URL of the GitLab project.
 
     Returns:
-        int | None: The project ID if found, else None.
+        str: The URL-encoded project path.
     """
-    gitlab_project_path: str = gitlab_url.split("https://gitlab.com/")[1].replace(
-        "/", "%2F"
-    )
-    request_url: str = f"{api_url}/{gitlab_project_path}"
-    try:
-        response: requests.Response = requests.get(request_url, timeout=MAX_TIMEOUT)
-        response.raise_for_status()
-        return response.json().get("id")
-    except requests.exceptions.RequestException:
-        return None
+    return quote(gitlab_url.split("https://gitlab.com/")[1], safe="")
 
 
 def _is_newer_version(local_version: str, remote_version: str) -> bool:
@@ -146,14 +505,13 @@ def _is_newer_version(local_version: str, remote_version: str) -> bool:
     Returns:
         bool: True if the remote version is newer, False otherwise.
     """
-    try:
-        local_ver = Version(local_version)
-        remote_ver = Version(remote_version)
-        return remote_ver > local_ver
-    except InvalidVersion as e:
+    local_ver: Optional[Version] = parse_version(local_version)
+    remote_ver: Optional[Version] = parse_version(remote_version)
+    if local_ver is None or remote_ver is None:
         # The project version is not PEP 440 compliant
         # Compare the versions lexicographically
         return remote_version > local_version
+    return remote_ver > local_ver
 
 
 def _get_api_base_and_project_id(git_url: str) -> tuple[str, str, bool]:
@@ -167,26 +525,23 @@ def _get_api_base_and_project_id(git_url: str) -> tuple[str, str, bool]:
         tuple[str, str, bool]: The API base URL, project ID, and whether the repository is GitLab.
     """
     api_base: str = ""
-    project_id: str | None = ""
+    project_id: str = ""
     is_gitlab = False
 
     host: str | None = urlparse(git_url).hostname
     match host:
         case "github.com":
-            api_base = "https://api.github.com/repos"
+            api_base = API_BASES[host]
             project_id = git_url.split("https://github.com/")[1]
         case "gitlab.com":
             is_gitlab = True
-            api_base = "https://gitlab.com/api/v4/projects"
-            project_id = _get_gitlab_project_id(api_base, git_url)
-            if not project_id:
-                print("[red]ERROR[/]: Could not retrieve the GitLab project ID.")
-                return "", "", False
+            api_base = API_BASES[host]
+            project_id = _get_gitlab_project_id(git_url)
         case "gitee.com":
-            api_base = "https://gitee.com/api/v5/repos"
+            api_base = API_BASES[host]
             project_id = git_url.split("https://gitee.com/")[1]
         case "codeberg.org" | "gitea.com" | "gitea.angry.im" | "git.cryto.net":
-            api_base = f"https://{host}/api/v1/repos"
+            api_base = API_BASES[host]
             project_id = git_url.split(f"https://{host}/")[1]
         case _:
             print("[red]ERROR[/]: Unsupported platform.")
@@ -195,6 +550,86 @@ def _get_api_base_and_project_id(git_url: str) -> tuple[str, str, bool]:
     return api_base, project_id, is_gitlab
 
 
+def _run_in_background(func: Callable[..., T], *args: Any) -> "Future[T]":
+    """
+    Call a function in a daemon thread.
+
+    Unlike executor threads, daemon threads never delay the interpreter exit
+    when their result is no longer needed.
+
+    Args:
+        func (Callable[..., T]): The function to call.
+        *args (Any): The arguments to pass.
+
+    Returns:
+        Future[T]: The future result of the call.
+    """
+    future: Future[T] = Future()
+
+    def run() -> None:
+        try:
+            future.set_result(func(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="check-updates", daemon=True).start()
+    return future
+
+
+def _get_latest_version(git_url: str) -> Optional[str]:
+    """
+    Retrieve the latest release, or the latest tag if there are no releases.
+
+    Args:
+        git_url (str): The URL of the Git repository.
+
+    Returns:
+        Optional[str]: The latest version if found, else None.
+    """
+    api_base, project_id, is_gitlab = _get_api_base_and_project_id(git_url)
+    if not project_id:
+        return None
+
+    release_url: str = f"{api_base}/{project_id}/releases/latest"
+    tag_url: str = f"{api_base}/{project_id}/tags"
+
+    # Repositories found without releases are remembered so that their tags
+    # are requested along with the release instead of after it
+    cache = DiskCache("core_helpers", "updates")
+    no_releases_key: str = f"no-releases:{git_url}"
+
+    # Otherwise hedge the release lookup: the tags are only requested once it
+    # answers without a release, or concurrently if it is slow to answer. A
+    # fast API then costs a single request of the rate limit budget per check.
+    release: Future[Optional[str]] = _run_in_background(
+        _get_latest_release_version, release_url, is_gitlab
+    )
+    tag: Optional[Future[Optional[str]]] = None
+    if cache.get(no_releases_key):
+        tag = _run_in_background(_get_latest_tag_version, tag_url)
+    else:
+        try:
+            release.result(timeout=TAG_LOOKUP_DELAY)
+        except FutureTimeoutError:
+            tag = _run_in_background(_get_latest_tag_version, tag_url)
+
+    latest_version: Optional[str] = release.result()
+    if latest_version is not None:
+        if tag is not None:
+            cache.delete(no_releases_key)  # The repository has a release now
+        return latest_version
+
+    # Use the latest tag if no release found
+    latest_version = (
+        tag.result() if tag is not None else _get_latest_tag_version(tag_url)
+    )
+    if latest_version is not None:
+        cache.set(no_releases_key, True, NO_RELEASES_TTL)
+    return latest_version
+
+
+@profile_phase("check_updates")
+@runtime_checked
 def check_updates(git_url: str, current_version: str) -> None:
     """
     Check if there is a newer version of the script available in the Git repository.
@@ -214,16 +649,26 @@ def check_updates(git_url: str, current_version: str) -> None:
     """
     # Remove trailing slashes and '.git' from the URL
     git_url = git_url.rstrip("/").removesuffix(".git")
-    api_base, project_id, is_gitlab = _get_api_base_and_project_id(git_url)
-    if not project_id:
+
+    platform_api: str | None = API_BASES.get(urlparse(git_url).hostname or "")
+    if platform_api is None:
+        print("[red]ERROR[/]: Unsupported platform.")
         return
 
-    release_url: str = f"{api_base}/{project_id}/releases/latest"
-    tag_url: str = f"{api_base}/{project_id}/tags"
+    # Skip the check without any request if the API budget is exhausted
+    if _get_rate_limit_wait(platform_api) > RATE_LIMIT_MAX_WAIT:
+        print(
+            "[yellow]WARNING[/]: Skipping the update check, "
+            "the API rate limit is exhausted."
+        )
+        return
 
-    latest_version: Optional[str] = _get_latest_release_version(release_url, is_gitlab)
-    if latest_version is None:  # Try to get the latest tag if no release found
-        latest_version = _get_latest_tag_version(tag_url)
+    # Only one local process queries the API, the others reuse its result
+    completed, latest_version = _single_flight(
+        git_url, lambda: _get_latest_version(git_url)
+    )
+    if not completed:
+        return
 
     if latest_version and _is_newer_version(current_version, latest_version):
         print(
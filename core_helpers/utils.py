@@ -1,6 +1,6 @@
-import os
 import random
 import re
+import shutil
 import sys
 from pathlib import Path
 from typing import NoReturn, Optional
@@ -8,8 +8,15 @@ from typing import NoReturn, Optional
 import pyfiglet  # type: ignore
 from rich import print
 
+from core_helpers.cache import DiskCache
 from core_helpers.consts import EXIT_FAILURE
+from core_helpers.profiling import profile_phase
 from core_helpers.rich_print import print_error_message
+from core_helpers.runtime_checks import runtime_checked
+from core_helpers.shutdown import SHUTDOWN_TIMEOUT, run_shutdown_hooks
+
+# Rendered banners, loading a figlet font is slower than reading them back
+_banner_cache = DiskCache("core_helpers", "banners", max_size=1024 * 1024)
 
 
 def _strip_rich_tags(text: str) -> str:
@@ -36,6 +43,25 @@ def _get_random_font() -> str:
     return random.choice(fonts)
 
 
+@_banner_cache.memoize()
+def _render_title(title: str, font: Optional[str], width: int) -> str:
+    """
+    Render a title with pyfiglet.
+
+    Args:
+        title (str): The text to render.
+        font (str, optional): The figlet font.
+        width (int): The width to center the title in.
+
+    Returns:
+        str: The rendered title.
+    """
+    figlet = pyfiglet.Figlet(font=font, justify="center", width=width)
+    return figlet.renderText(title)
+
+
+@profile_phase("print_welcome")
+@runtime_checked
 def print_welcome(
     package: str,
     version: str,
@@ -56,7 +82,7 @@ def print_welcome(
         random_font (bool, optional): Whether to use a random font. Defaults to False.
     """
     # Get terminal width
-    width: int = os.get_terminal_size().columns
+    width: int = shutil.get_terminal_size().columns
 
     if random_font:
         font = _get_random_font()
@@ -68,8 +94,7 @@ def print_welcome(
     desc = f"[blue]{desc}[/] - {version}"
 
     # Render and print title using pyfiglet
-    figlet = pyfiglet.Figlet(font=font, justify="center", width=width)
-    print(f"""[green]{figlet.renderText(title)}[/]""")
+    print(f"""[green]{_render_title(title, font, width)}[/]""")
 
     # Calculate visible lengths and center accordingly
     visible_desc: str = _strip_rich_tags(desc)
@@ -81,12 +106,19 @@ def print_welcome(
     print()
 
 
-def exit_session(exit_value: int, log_path: str | Path) -> NoReturn:
+@runtime_checked
+def exit_session(
+    exit_value: int, log_path: str | Path, timeout: float = SHUTDOWN_TIMEOUT
+) -> NoReturn:
     """
-    Exit the program with the given exit value.
+    Run the registered shutdown hooks and exit the program with the given exit
+    value.
 
     Args:
         exit_value (int): The POSIX exit value to exit with.
+        log_path (str | Path): The log file mentioned in the error message.
+        timeout (float, optional): Total seconds given to the shutdown hooks.
+            Defaults to SHUTDOWN_TIMEOUT.
     """
     # Check if the exit_value is a valid POSIX exit value
     if not 0 <= exit_value <= 255:
@@ -98,5 +130,8 @@ def exit_session(exit_value: int, log_path: str | Path) -> NoReturn:
             f"Check the logs at [green]'{log_path}'[/] for more information."
         )
 
+    # Flush and join pending work under a single deadline
+    run_shutdown_hooks(timeout)
+
     # Exit the program with the given exit value
     sys.exit(exit_value)
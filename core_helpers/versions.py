@@ -0,0 +1,81 @@
+"""
+Ranking of version tags.
+
+Tags are parsed as PEP 440 versions once a leading non-numeric prefix such as
+"v" or "release-" is stripped. The parsed versions are memoized, so a
+long-running process checking the same repositories again reuses them.
+
+Tags that are not versions once stripped (e.g. "latest" or "2024-01-01") are
+ignored when ranking, and pre-releases and post-releases are only selected
+according to the policy passed to `get_latest_version`.
+"""
+
+import functools
+import re
+from typing import Iterable, Optional
+
+from packaging.version import InvalidVersion, Version
+
+# Number of parsed tags kept in memory
+VERSION_CACHE_SIZE = 4096
+
+_PREFIX = re.compile(r"^[^\d]*")
+
+
+@functools.lru_cache(maxsize=VERSION_CACHE_SIZE)
+def parse_version(tag: str) -> Optional[Version]:
+    """
+    Parse a version tag, stripping any leading non-numeric characters like 'v'.
+
+    Args:
+        tag (str): The name of the tag (e.g., 'v5.5.1').
+
+    Returns:
+        Version | None: The parsed version, or None if the tag is not a PEP
+            440 version.
+    """
+    try:
+        return Version(_PREFIX.sub("", tag, count=1))
+    except InvalidVersion:
+        return None
+
+
+def get_latest_version(
+    tags: Iterable[str], prereleases: bool = False, postreleases: bool = True
+) -> Optional[str]:
+    """
+    Select the highest version among tags, in a single pass.
+
+    Pre-releases (including development releases) and post-releases excluded
+    by the policy are only selected if no other tag is a version, like
+    pip does for pre-releases. Of several tags with the same version, the
+    first one is selected.
+
+    Args:
+        tags (Iterable[str]): The tag names.
+        prereleases (bool): Whether pre-releases can be selected over final
+            releases. Defaults to False.
+        postreleases (bool): Whether post-releases can be selected over their
+            final release. Defaults to True.
+
+    Returns:
+        str | None: The tag of the highest version, or None if no tag is a
+            version.
+    """
+    best: Optional[tuple[Version, str]] = None
+    # Highest version excluded by the policy, used if no other tag qualifies
+    fallback: Optional[tuple[Version, str]] = None
+    for tag in tags:
+        version: Optional[Version] = parse_version(tag)
+        if version is None:
+            continue
+        if (version.is_prerelease and not prereleases) or (
+            version.is_postrelease and not postreleases
+        ):
+            if fallback is None or version > fallback[0]:
+                fallback = (version, tag)
+        elif best is None or version > best[0]:
+            best = (version, tag)
+
+    selected: Optional[tuple[Version, str]] = best or fallback
+    return selected[1] if selected else None
@@ -11,6 +11,9 @@ from platformdirs import (site_cache_path, site_config_path, site_data_path,
                           user_log_path, user_music_path, user_pictures_path,
                           user_runtime_path, user_state_path, user_videos_path)
 
+from core_helpers.profiling import profile_phase
+from core_helpers.runtime_checks import runtime_checked
+
 
 # Enum for path types
 class PathType(Enum):
@@ -56,6 +59,8 @@ HOME_DIRS: dict[PathType, Callable] = {
 }
 
 
+@profile_phase("get_user_path")
+@runtime_checked
 def get_user_path(package: str, path_type: PathType) -> Path:
     """
     Return the requested path for the specified path type (e.g., 'cache', 'config', 'data', 'log').
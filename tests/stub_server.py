@@ -0,0 +1,169 @@
+"""
+Local HTTP server that imitates the GitHub, GitLab and Gitea APIs.
+
+Every request is answered after a configurable delay so `check_updates` can be
+tested and benchmarked without touching the network. Connections are kept alive
+and bodies are gzipped for clients accepting it, like the real APIs.
+"""
+
+import gzip
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, Optional
+from unittest import mock
+
+from core_helpers import updates
+
+# Platform name -> (host used in the repository URL, API prefix on the stub)
+PLATFORMS: dict[str, tuple[str, str]] = {
+    "github": ("github.com", "/github/repos"),
+    "gitlab": ("gitlab.com", "/gitlab/api/v4/projects"),
+    "gitea": ("codeberg.org", "/gitea/api/v1/repos"),
+}
+
+# Sample repository URL for each platform
+REPO_URLS: dict[str, str] = {
+    name: f"https://{host}/owner/project" for name, (host, _) in PLATFORMS.items()
+}
+
+RELEASE = {"tag_name": "v2.0.0", "name": "Release 2.0.0"}
+TAGS = [{"name": f"v1.{minor}.{patch}"} for minor in range(10) for patch in range(10)]
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Answer release and tag requests with canned JSON."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, avoid the delayed ACK stall
+    disable_nagle_algorithm = True
+    server: "StubServer"
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.lock:
+            self.server.connection_count += 1
+
+    def do_GET(self) -> None:
+        time.sleep(self.server.delay)
+        if self.server.rendezvous is not None:
+            try:
+                self.server.rendezvous.wait()
+            except threading.BrokenBarrierError:
+                pass  # The other requests never came, answer anyway
+        with self.server.lock:
+            self.server.request_count += 1
+            self.server.last_headers = dict(self.headers)
+            if self.server.rate_limit is not None:
+                if self.server.rate_limit == 0:
+                    self._send(403, {"message": "API rate limit exceeded"})
+                    return
+                self.server.rate_limit -= 1
+
+        location: Optional[str] = self.server.redirects.get(self.path)
+        if location is not None:
+            self.send_response(301)
+            self.send_header("Location", location)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+            return
+
+        if re.search(r"/releases/(permalink/)?latest$", self.path):
+            if not self.server.releases:
+                self._send(404, {"message": "Not Found"})
+                return
+            self._send(200, RELEASE)
+        elif self.path.endswith("/tags"):
+            self._send(200, TAGS)
+        else:
+            self._send(404, {"message": "Not Found"})
+
+    def _send(self, status: int, payload: object) -> None:
+        body: bytes = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        if self.server.rate_limit is not None:
+            self.send_header("X-RateLimit-Remaining", str(self.server.rate_limit))
+            self.send_header("X-RateLimit-Reset", str(int(time.time()) + 3600))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    Threaded stub API server.
+
+    Args:
+        delay (float): Seconds to wait before answering each request.
+        releases (bool): Whether the repositories have releases. When False,
+            `check_updates` has to fall back to the tags endpoint.
+        rate_limit (int | None): Number of requests allowed before answering
+            403 like an exhausted GitHub API. None disables rate limiting.
+
+    Set `rendezvous` to a `threading.Barrier` to hold every request until
+    the barrier's number of requests are being processed at the same time, and
+    add a path to `redirects` to answer it with a 301 to the given location.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self, delay: float = 0.0, releases: bool = True, rate_limit: int | None = None
+    ) -> None:
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.delay: float = delay
+        self.releases: bool = releases
+        self.rate_limit: int | None = rate_limit
+        self.request_count: int = 0
+        # Headers of the last request received
+        self.last_headers: dict[str, str] = {}
+        self.connection_count: int = 0
+        self.rendezvous: Optional[threading.Barrier] = None
+        self.redirects: dict[str, str] = {}
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+@contextmanager
+def stub_api(
+    delay: float = 0.0, releases: bool = True, rate_limit: int | None = None
+) -> Iterator[StubServer]:
+    """
+    Run a stub server and point the update checker at it.
+
+    Args:
+        delay (float): Seconds to wait before answering each request.
+        releases (bool): Whether the repositories have releases.
+        rate_limit (int | None): Number of requests allowed by the server.
+
+    Yields:
+        StubServer: The running server.
+    """
+    server = StubServer(delay, releases, rate_limit)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    api_bases: dict[str, str] = {
+        host: server.base_url + prefix for host, prefix in PLATFORMS.values()
+    }
+    try:
+        with mock.patch.dict(updates.API_BASES, api_bases):
+            yield server
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,172 @@
+import logging
+import re
+import subprocess
+import sys
+from decimal import Decimal
+from http import HTTPStatus
+from pathlib import Path, PurePosixPath
+
+import pytest
+
+from core_helpers.__main__ import main
+from core_helpers.binlog import (_FRAME_HEADER, FRAME_RECORD, MAGIC,
+                                 MAX_INTERNED_STRINGS, BinaryLogHandler,
+                                 decode_file)
+from core_helpers.logs import LoggerProxy
+
+PACKAGE = "MyBinaryApp"
+LINE_PATTERN = re.compile(r"^\[\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3}\] (\w+): (.*)$")
+
+
+@pytest.fixture
+def binary_log_file(tmp_path: Path) -> Path:
+    return tmp_path / "app.binlog"
+
+
+def _decode(path: Path, tmp_path: Path) -> list[tuple[str, str]]:
+    output: Path = tmp_path / "decoded.log"
+    decode_file(path, output)
+    lines: list[tuple[str, str]] = []
+    for line in output.read_text(encoding="utf-8").splitlines():
+        match = LINE_PATTERN.match(line)
+        if match:
+            lines.append((match.group(1), match.group(2)))
+    return lines
+
+
+def test_binary_round_trip(binary_log_file: Path, tmp_path: Path) -> None:
+    logger: LoggerProxy = LoggerProxy()
+    logger.setup_logger(PACKAGE, binary_log_file, cache=False, binary=True)
+
+    for i in range(3):
+        logger.info("Processed item %d of %s in %.1f s", i, "batch", 0.5)
+    logger.warning("Value is %r", None)
+    logger.error("Mapping %(key)s", {"key": "value"})
+    logger.info("Literal with 100% and no arguments")
+    logger.flush()
+
+    assert _decode(binary_log_file, tmp_path) == [
+        ("INFO", "Processed item 0 of batch in 0.5 s"),
+        ("INFO", "Processed item 1 of batch in 0.5 s"),
+        ("INFO", "Processed item 2 of batch in 0.5 s"),
+        ("WARNING", "Value is None"),
+        ("ERROR", "Mapping value"),
+        ("INFO", "Literal with 100% and no arguments"),
+    ]
+
+
+def test_object_arguments(binary_log_file: Path, tmp_path: Path) -> None:
+    handler = BinaryLogHandler(binary_log_file)
+    records: list[logging.LogRecord] = [
+        logging.LogRecord("x", logging.INFO, "", 0, msg, args, None)
+        for msg, args in [
+            ("price %.2f", (Decimal("1.5"),)),
+            ("obj %r", (PurePosixPath("/x"),)),
+            ("level %s", (HTTPStatus.OK,)),
+            ("big %d", (2**64,)),
+        ]
+    ]
+    for record in records:
+        handler.emit(record)
+    handler.close()
+
+    assert [msg for _, msg in _decode(binary_log_file, tmp_path)] == [
+        record.getMessage() for record in records
+    ]
+    assert b"price %.2f" not in binary_log_file.read_bytes()
+
+
+def test_format_strings_stored_once(binary_log_file: Path) -> None:
+    handler = BinaryLogHandler(binary_log_file)
+    record = logging.LogRecord("x", logging.INFO, "", 0, "Format %d", (1,), None)
+    for _ in range(10):
+        handler.emit(record)
+    handler.close()
+
+    assert binary_log_file.read_bytes().count(b"Format %d") == 1
+
+
+def test_appending_sessions(binary_log_file: Path, tmp_path: Path) -> None:
+    for session in range(2):
+        handler = BinaryLogHandler(binary_log_file)
+        message = f"Session {session} %s"
+        handler.emit(
+            logging.LogRecord("x", logging.INFO, "", 0, message, ("ok",), None)
+        )
+        handler.close()
+
+    assert _decode(binary_log_file, tmp_path) == [
+        ("INFO", "Session 0 ok"),
+        ("INFO", "Session 1 ok"),
+    ]
+
+
+def test_dictionary_limit(
+    binary_log_file: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr("core_helpers.binlog.MAX_INTERNED_STRINGS", 1)
+    handler = BinaryLogHandler(binary_log_file)
+    for i in range(3):
+        handler.emit(
+            logging.LogRecord("x", logging.INFO, "", 0, f"Message {i}", None, None)
+        )
+    handler.close()
+
+    assert [msg for _, msg in _decode(binary_log_file, tmp_path)] == [
+        "Message 0",
+        "Message 1",
+        "Message 2",
+    ]
+    assert MAX_INTERNED_STRINGS > 1
+
+
+def test_binary_requires_standard_logging(binary_log_file: Path) -> None:
+    logger: LoggerProxy = LoggerProxy()
+    with pytest.raises(ValueError):
+        logger.setup_logger(
+            PACKAGE, binary_log_file, use_loguru=True, cache=False, binary=True
+        )
+
+
+def test_decode_command(
+    binary_log_file: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    handler = BinaryLogHandler(binary_log_file)
+    handler.emit(
+        logging.LogRecord("x", logging.ERROR, "", 0, "Failed %s", ("x",), None)
+    )
+    handler.close()
+
+    assert main(["decode", str(binary_log_file)]) == 0
+    assert capsys.readouterr().out.rstrip().endswith("ERROR: Failed x")
+
+
+def test_decode_command_invalid_file(tmp_path: Path) -> None:
+    text_file: Path = tmp_path / "app.log"
+    text_file.write_text("not binary")
+
+    assert main(["decode", str(text_file)]) == 1
+
+
+def test_decode_command_corrupted_record(
+    binary_log_file: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    binary_log_file.write_bytes(MAGIC + _FRAME_HEADER.pack(FRAME_RECORD, 3) + b"abc")
+
+    assert main(["decode", str(binary_log_file)]) == 1
+    assert capsys.readouterr().err.startswith("Error: Corrupted record frame")
+
+
+def test_decode_module(binary_log_file: Path) -> None:
+    handler = BinaryLogHandler(binary_log_file)
+    handler.emit(logging.LogRecord("x", logging.INFO, "", 0, "Started", (), None))
+    handler.close()
+
+    result = subprocess.run(
+        [sys.executable, "-m", "core_helpers", "decode", str(binary_log_file)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.rstrip().endswith("INFO: Started")
+    assert result.stderr == ""
@@ -0,0 +1,148 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from core_helpers.cache import CacheStats, DiskCache
+
+
+@pytest.fixture
+def cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> DiskCache:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    return DiskCache("test_package", max_size=4096)
+
+
+def test_get_set(cache: DiskCache) -> None:
+    assert cache.get("key") is None
+    assert cache.get("key", "default") == "default"
+
+    cache.set("key", {"value": [1, 2, 3]})
+
+    assert cache.get("key") == {"value": [1, 2, 3]}
+    assert cache.stats() == CacheStats(hits=1, misses=2, evictions=0)
+
+
+def test_directory(cache: DiskCache, tmp_path: Path) -> None:
+    cache.set("key", "value")
+
+    assert cache.directory.is_relative_to(tmp_path)
+    assert cache.directory.name == "cache"
+    assert [path.suffix for path in cache.directory.iterdir()] == [".cache"]
+
+
+def test_ttl(cache: DiskCache) -> None:
+    cache.set("expired", "value", ttl=0)
+    cache.set("fresh", "value", ttl=60)
+
+    assert cache.get("expired") is None
+    assert cache.get("fresh") == "value"
+
+
+def test_default_ttl(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    cache = DiskCache("test_package", default_ttl=0)
+    cache.set("key", "value")
+
+    assert cache.get("key") is None
+
+
+def test_delete_clear(cache: DiskCache) -> None:
+    cache.set("first", 1)
+    cache.set("second", 2)
+
+    cache.delete("first")
+    assert cache.get("first") is None
+    assert cache.get("second") == 2
+
+    cache.clear()
+    assert cache.get("second") is None
+
+
+def test_lru_eviction(cache: DiskCache) -> None:
+    value = b"x" * 1000
+    for i in range(3):
+        cache.set(f"key{i}", value)
+    # Make key0 the least recently used entry
+    past = time.time() - 60
+    for i in range(3):
+        os.utime(cache._get_path(f"key{i}"), (past + i, past + i))
+    assert cache.get("key0") == value
+
+    cache.set("key3", value)
+    cache.set("key4", value)
+
+    assert cache.get("key1") is None
+    assert cache.get("key0") == value
+    assert cache.get("key4") == value
+    assert cache.stats().evictions > 0
+    total = sum(path.stat().st_size for path in cache.directory.iterdir())
+    assert total <= cache.max_size
+
+
+def test_unusable_directory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a cache root that cannot be created only disables the cache."""
+    (tmp_path / "file").write_text("")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "file" / "cache"))
+    cache = DiskCache("test_package")
+    calls: list[int] = []
+
+    @cache.memoize()
+    def square(value: int) -> int:
+        calls.append(value)
+        return value * value
+
+    cache.set("key", "value")
+    assert cache.get("key", "default") == "default"
+    cache.delete("key")
+    cache.clear()
+    assert square(3) == square(3) == 9
+    assert calls == [3, 3]
+
+
+def test_corrupt_entry(cache: DiskCache) -> None:
+    cache.set("key", "value")
+    cache._get_path("key").write_bytes(b"not a pickle")
+
+    assert cache.get("key", "default") == "default"
+    assert not cache._get_path("key").exists()
+
+
+class Renamed:
+    pass
+
+
+def test_unloadable_entry(cache: DiskCache, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that an entry whose class no longer exists is dropped as a miss."""
+    cache.set("key", Renamed())
+    monkeypatch.delattr(sys.modules[__name__], "Renamed")
+
+    assert cache.get("key", "default") == "default"
+    assert not cache._get_path("key").exists()
+
+
+def test_memoize(cache: DiskCache) -> None:
+    calls: list[tuple[int, int]] = []
+
+    @cache.memoize()
+    def add(a: int, b: int = 0) -> int:
+        calls.append((a, b))
+        return a + b
+
+    assert add(1, b=2) == 3
+    assert add(1, b=2) == 3
+    assert add(2) == 2
+    assert calls == [(1, 2), (2, 0)]
+
+
+def test_memoize_none_result(cache: DiskCache) -> None:
+    calls: list[None] = []
+
+    @cache.memoize()
+    def nothing() -> None:
+        calls.append(None)
+
+    nothing()
+    nothing()
+    assert len(calls) == 1
@@ -1,9 +1,14 @@
+import sys
 from argparse import ArgumentParser, Namespace
+from importlib.metadata import EntryPoint
+from pathlib import Path
 from typing import Any
 
 import pytest
 
-from core_helpers.cli import setup_parser
+from core_helpers import cli
+from core_helpers.cache import DiskCache
+from core_helpers.cli import Subcommand, add_subcommands, setup_parser
 
 
 @pytest.fixture
@@ -57,3 +62,146 @@ def test_add_argument_invalid(
     parser, _ = parser_data
     with pytest.raises((TypeError, IndexError)):
         parser.add_argument(argument_name)
+
+
+@pytest.fixture
+def help_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> DiskCache:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    help_cache = DiskCache("core_helpers", "help")
+    monkeypatch.setattr(cli, "_help_cache", help_cache)
+    return help_cache
+
+
+def _print_help(parser: ArgumentParser, capsys: pytest.CaptureFixture[str]) -> str:
+    with pytest.raises(SystemExit):
+        parser.parse_args(["--help"])
+    return capsys.readouterr().out
+
+
+def test_help_cached(
+    parser_data: tuple[ArgumentParser, Any],
+    help_cache: DiskCache,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    parser, _ = parser_data
+
+    first: str = _print_help(parser, capsys)
+    second: str = _print_help(parser, capsys)
+
+    assert first == second == parser.format_help()
+    assert help_cache.stats().hits == 1
+
+
+def test_help_cache_invalidated(
+    parser_data: tuple[ArgumentParser, Any],
+    help_cache: DiskCache,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    parser, g_main = parser_data
+    _print_help(parser, capsys)
+
+    g_main.add_argument("--new-option", help="A new option.")
+
+    assert "--new-option" in _print_help(parser, capsys)
+    assert help_cache.stats().hits == 0
+
+
+def test_help_cache_version(
+    help_cache: DiskCache, capsys: pytest.CaptureFixture[str]
+) -> None:
+    _print_help(setup_parser("MyApp", "MyApp description", "1.0.0")[0], capsys)
+    _print_help(setup_parser("MyApp", "MyApp description", "2.0.0")[0], capsys)
+
+    assert help_cache.stats().hits == 0
+
+
+@pytest.fixture
+def command_modules(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> str:
+    package: Path = tmp_path / "lazy_commands"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "build.py").write_text(
+        "def add_arguments(parser):\n"
+        "    parser.add_argument('--target', default='all')\n"
+        "\n"
+        "def main(args):\n"
+        "    return f'build {args.target}'\n"
+    )
+    (package / "clean.py").write_text("def run(args):\n    return 'clean'\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for name in list(sys.modules):
+        if name.startswith("lazy_commands"):
+            monkeypatch.delitem(sys.modules, name)
+    return "lazy_commands"
+
+
+def test_lazy_subcommands(command_modules: str) -> None:
+    parser, _ = setup_parser(
+        "MyApp",
+        "MyApp description",
+        "1.0.0",
+        subcommands={
+            "build": Subcommand(f"{command_modules}.build", help="Build it."),
+            "clean": f"{command_modules}.clean:run",
+        },
+    )
+
+    help_message: str = parser.format_help()
+    assert "build" in help_message and "Build it." in help_message
+    assert "clean" in help_message  # Listed without help
+    assert f"{command_modules}.build" not in sys.modules
+
+    args: Namespace = parser.parse_args(["clean"])
+    assert args.command == "clean"
+    assert args.func(args) == "clean"
+    assert f"{command_modules}.build" not in sys.modules
+
+    args = parser.parse_args(["-v", "build", "--target", "docs"])
+    assert args.verbose
+    assert args.func(args) == "build docs"
+
+
+def test_lazy_subcommand_help(
+    command_modules: str, capsys: pytest.CaptureFixture[str]
+) -> None:
+    parser, _ = setup_parser(
+        "MyApp",
+        "MyApp description",
+        "1.0.0",
+        subcommands={"build": f"{command_modules}.build"},
+    )
+
+    with pytest.raises(SystemExit):
+        parser.parse_args(["build", "--help"])
+    assert "--target" in capsys.readouterr().out
+
+
+def test_entry_point_subcommands(
+    command_modules: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def fake_entry_points(group: str) -> list[EntryPoint]:
+        assert group == "myapp.commands"
+        return [EntryPoint("clean", f"{command_modules}.clean:run", group)]
+
+    monkeypatch.setattr(cli, "entry_points", fake_entry_points)
+    parser, _ = setup_parser(
+        "MyApp", "MyApp description", "1.0.0", entry_point_group="myapp.commands"
+    )
+
+    assert "clean" in parser.format_help()
+    args: Namespace = parser.parse_args(["clean"])
+    assert args.func(args) == "clean"
+
+
+def test_add_subcommands_twice(command_modules: str) -> None:
+    parser, _ = setup_parser(
+        "MyApp",
+        "MyApp description",
+        "1.0.0",
+        subcommands={"build": f"{command_modules}.build"},
+    )
+    add_subcommands(parser, {"clean": f"{command_modules}.clean:run"})
+
+    assert parser.parse_args(["clean"]).command == "clean"
+    with pytest.raises(SystemExit):
+        parser.parse_args(["unknown"])
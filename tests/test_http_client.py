@@ -0,0 +1,286 @@
+import json
+import socket
+import subprocess
+import sys
+import threading
+import tracemalloc
+from typing import Any, Iterator, Optional
+
+import pytest
+
+from core_helpers import http_client
+from core_helpers.http_client import (HTTPStatusError, InvalidJSONError,
+                                      RequestError, Response, ResponseTooLarge,
+                                      iter_json_items)
+from tests.stub_server import RELEASE, TAGS, StubServer
+
+
+@pytest.fixture
+def server(monkeypatch: pytest.MonkeyPatch) -> Iterator[StubServer]:
+    """Run a stub server reached with the stdlib backend."""
+    monkeypatch.setattr(http_client, "PREFER_REQUESTS", False)
+    for env_var in ("http_proxy", "HTTP_PROXY", "all_proxy", "ALL_PROXY"):
+        monkeypatch.delenv(env_var, raising=False)
+
+    stub = StubServer()
+    thread = threading.Thread(target=stub.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield stub
+    finally:
+        http_client.close_connections()
+        stub.shutdown()
+        stub.server_close()
+
+
+def test_get(server: StubServer) -> None:
+    response: Response = http_client.get(
+        server.base_url + "/github/repos/owner/project/releases/latest"
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers.get("Content-Encoding") == "gzip"
+    assert response.json() == RELEASE
+
+
+def test_connection_reuse(server: StubServer) -> None:
+    for _ in range(5):
+        response: Response = http_client.get(server.base_url + "/repos/a/b/tags")
+        assert response.json() == TAGS
+
+    assert server.request_count == 5
+    assert server.connection_count == 1
+
+
+def test_stale_connection_retried(server: StubServer) -> None:
+    url: str = server.base_url + "/repos/a/b/tags"
+    http_client.get(url)
+    # The server closes the idle connection, as it would after a timeout
+    for idle in http_client._connections.values():
+        for connection in idle:
+            if connection.sock is not None:
+                connection.sock.shutdown(socket.SHUT_RDWR)
+
+    assert http_client.get(url).status_code == 200
+
+
+def test_redirect_followed(server: StubServer) -> None:
+    """Test that a renamed repository is followed, like requests does."""
+    url: str = "/github/repos/owner/project/releases/latest"
+    server.redirects["/repos/old/releases/latest"] = url
+    server.redirects["/repos/older/releases/latest"] = "/repos/old/releases/latest"
+
+    response: Response = http_client.get(
+        server.base_url + "/repos/older/releases/latest"
+    )
+
+    assert response.status_code == 200
+    assert response.json() == RELEASE
+    assert response.url == server.base_url + url
+    assert server.connection_count == 1
+
+
+def test_redirect_to_other_host(server: StubServer) -> None:
+    """Test that the caller's headers are not sent to another host."""
+    other = StubServer()
+    thread = threading.Thread(target=other.serve_forever, daemon=True)
+    thread.start()
+    try:
+        server.redirects["/repos/a/b/tags"] = other.base_url + "/repos/c/d/tags"
+        response: Response = http_client.get(
+            server.base_url + "/repos/a/b/tags", headers={"Authorization": "secret"}
+        )
+
+        assert response.json() == TAGS
+        assert server.last_headers["Authorization"] == "secret"
+        assert "Authorization" not in other.last_headers
+    finally:
+        other.shutdown()
+        other.server_close()
+
+
+def test_redirect_loop(server: StubServer) -> None:
+    server.redirects["/loop"] = "/loop"
+
+    with pytest.raises(RequestError, match="Too many redirects"):
+        http_client.get(server.base_url + "/loop")
+    assert server.request_count == http_client.MAX_REDIRECTS + 1
+
+
+def test_status_error(server: StubServer) -> None:
+    response: Response = http_client.get(server.base_url + "/missing")
+
+    assert response.status_code == 404
+    with pytest.raises(HTTPStatusError) as error:
+        response.raise_for_status()
+    assert error.value.response is response
+
+
+def test_error_body_drained(server: StubServer) -> None:
+    with http_client.stream(server.base_url + "/missing") as response:
+        assert response.status_code == 404
+
+    # The unread error body was short, the connection is reused
+    assert http_client.get(server.base_url + "/repos/a/b/tags").status_code == 200
+    assert server.connection_count == 1
+
+
+def test_connection_error(server: StubServer) -> None:
+    server.shutdown()
+    server.server_close()
+
+    with pytest.raises(RequestError):
+        http_client.get(server.base_url + "/repos/a/b/tags", timeout=1)
+
+
+def test_invalid_json() -> None:
+    response = Response(200, {}, b"<html>")
+
+    with pytest.raises(InvalidJSONError):
+        response.json()
+    with pytest.raises(ValueError):
+        response.json()
+
+
+def _split(data: bytes, size: int) -> list[bytes]:
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1024])
+def test_iter_json_items(chunk_size: int) -> None:
+    document: dict[str, Any] = {
+        "id": 123456,
+        "ratio": -1.5e-3,
+        "tag_name": "v1.2.3",
+        "name": 'Caf\u00e9 \\ "release"',
+        "draft": False,
+        "notes": None,
+        "assets": [{"size": 10}, []],
+    }
+    data: bytes = json.dumps(document, ensure_ascii=False, indent=2).encode()
+
+    items: list[tuple[Optional[str], Any]] = list(
+        iter_json_items(_split(data, chunk_size))
+    )
+
+    assert dict(items) == document
+    assert list(iter_json_items(_split(b" [1, 22, {}] ", chunk_size))) == [
+        (None, 1),
+        (None, 22),
+        (None, {}),
+    ]
+    assert list(iter_json_items([b"[ ]"])) == list(iter_json_items([b"{}"])) == []
+
+
+@pytest.mark.parametrize("chunk_size", [1, 1024])
+@pytest.mark.parametrize(
+    "data, expected",
+    [
+        (b'{"a": 5}', [("a", 5)]),
+        (b"[1, 2]", [(None, 1), (None, 2)]),
+        (b'{"name":"x","id":12}', [("name", "x"), ("id", 12)]),
+        (b"[1.5e3]", [(None, 1500.0)]),
+    ],
+)
+def test_iter_json_items_ending_in_number(
+    data: bytes, expected: list[tuple[Optional[str], Any]], chunk_size: int
+) -> None:
+    assert list(iter_json_items(_split(data, chunk_size))) == expected
+
+
+@pytest.mark.parametrize("chunk_size", [1, 1024])
+@pytest.mark.parametrize(
+    "data",
+    [b"", b"1", b"[1,", b"[1,]", b"[1 2]", b'{"a" 1}', b"{1: 2}", b"[1] x", b"\xff"],
+)
+def test_iter_json_items_invalid(data: bytes, chunk_size: int) -> None:
+    with pytest.raises(InvalidJSONError):
+        list(iter_json_items(_split(data, chunk_size)))
+
+
+def test_iter_json_items_bounded_memory() -> None:
+    """Test that a large document is decoded in constant memory."""
+
+    def tags(count: int) -> Iterator[bytes]:
+        yield b"["
+        for index in range(count):
+            yield b'%s{"name": "v1.%d.0", "commit": {"sha": "%s"}}' % (
+                b"," if index else b"",
+                index,
+                b"0" * 40,
+            )
+        yield b"]"
+
+    tracemalloc.start()
+    try:
+        names: set[str] = {tag["name"] for _, tag in iter_json_items(tags(1))}
+        baseline: int = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+        longest: str = max(
+            (tag["name"] for _, tag in iter_json_items(tags(50_000))), key=len
+        )
+        peak: int = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert names == {"v1.0.0"} and longest == "v1.10000.0"
+    # The document is about 4 MB
+    assert peak - baseline < 512 * 1024
+
+
+def test_response_too_large() -> None:
+    response = Response(200, {}, iter([b"[1,", b"2,", b"3]"]), max_bytes=5)
+
+    with pytest.raises(ResponseTooLarge):
+        list(response.iter_json_items())
+    with pytest.raises(RequestError):
+        response.content  # Already read
+
+
+def test_response_closed_once() -> None:
+    closed: list[bool] = []
+    response = Response(
+        200, {}, iter([b"[1, 2]"]), on_close=lambda: closed.append(True)
+    )
+
+    assert response.content == b"[1, 2]"
+    assert response.json() == [1, 2]
+    response.close()
+    assert closed == [True]
+
+
+def test_stream(server: StubServer) -> None:
+    url: str = server.base_url + "/repos/a/b/tags"
+    with http_client.stream(url) as response:
+        assert response.headers.get("Content-Encoding") == "gzip"
+        items = list(response.iter_json_items())
+
+    assert [tag for _, tag in items] == TAGS
+    # The body was fully read, the connection is reused
+    assert http_client.get(url).json() == TAGS
+    assert server.connection_count == 1
+
+
+def test_stream_closed_early(server: StubServer) -> None:
+    url: str = server.base_url + "/repos/a/b/tags"
+    with http_client.stream(url) as response:
+        assert next(response.iter_json_items()) == (None, TAGS[0])
+
+    # A connection left with an unread body is not reused
+    assert http_client.get(url).json() == TAGS
+
+
+def test_stream_too_large(server: StubServer) -> None:
+    url: str = server.base_url + "/repos/a/b/tags"
+    with pytest.raises(ResponseTooLarge):
+        http_client.get(url, max_bytes=100)
+
+
+def test_import_does_not_load_requests() -> None:
+    """Test that requests is only imported when a request is sent."""
+    code: str = "import sys, core_helpers; print('requests' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
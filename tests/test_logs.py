@@ -1,16 +1,30 @@
 import logging
+import os
+import signal
+import threading
 from pathlib import Path
+from typing import Iterator
 
 import loguru
 import pytest
 from typeguard import TypeCheckError
 
+from core_helpers import shutdown
 from core_helpers.logs import LoggerProxy
+from core_helpers.runtime_checks import (disable_runtime_checks,
+                                         enable_runtime_checks)
 
 PACKAGE = "MyApp"
 LOG_FILE = Path(PACKAGE + ".log")
 
 
+@pytest.fixture
+def runtime_checks() -> Iterator[None]:
+    enable_runtime_checks()
+    yield
+    disable_runtime_checks()
+
+
 @pytest.fixture
 def temp_log_file(tmp_path: Path) -> Path:
     return tmp_path / "temp_test_log.log"
@@ -66,6 +80,7 @@ def test_setup_logger_no_cache(temp_log_file: Path) -> None:
     assert logger1 is not logger2  # Ensure cache=False forces a new instance
 
 
+@pytest.mark.usefixtures("runtime_checks")
 def test_setup_logger_invalid_PACKAGE_name(temp_log_file: Path) -> None:
     logger: LoggerProxy = LoggerProxy()
     with pytest.raises(TypeCheckError):
@@ -78,6 +93,7 @@ def test_setup_logger_invalid_PACKAGE_name(temp_log_file: Path) -> None:
         )
 
 
+@pytest.mark.usefixtures("runtime_checks")
 def test_setup_logger_invalid_log_file_type() -> None:
     logger: LoggerProxy = LoggerProxy()
     with pytest.raises(TypeCheckError):
@@ -90,6 +106,7 @@ def test_setup_logger_invalid_log_file_type() -> None:
         )
 
 
+@pytest.mark.usefixtures("runtime_checks")
 def test_setup_logger_invalid_debug_type(temp_log_file: Path) -> None:
     logger: LoggerProxy = LoggerProxy()
     with pytest.raises(TypeCheckError):
@@ -102,6 +119,7 @@ def test_setup_logger_invalid_debug_type(temp_log_file: Path) -> None:
         )
 
 
+@pytest.mark.usefixtures("runtime_checks")
 def test_setup_logger_invalid_use_loguru_type(temp_log_file: Path) -> None:
     logger: LoggerProxy = LoggerProxy()
     with pytest.raises(TypeCheckError):
@@ -114,6 +132,7 @@ def test_setup_logger_invalid_use_loguru_type(temp_log_file: Path) -> None:
         )
 
 
+@pytest.mark.usefixtures("runtime_checks")
 def test_setup_logger_invalid_cache_type(temp_log_file: Path) -> None:
     logger: LoggerProxy = LoggerProxy()
     with pytest.raises(TypeCheckError):
@@ -160,3 +179,151 @@ def test_setup_logger_loguru_reconfiguration(temp_log_file: Path) -> None:
         log_content: str = f.read()
         assert "First configuration" in log_content
         assert "Second configuration" in log_content
+
+
+def test_setup_logger_registers_shutdown_hook(temp_log_file: Path) -> None:
+    logger: LoggerProxy = LoggerProxy()
+    logger.setup_logger(
+        PACKAGE, temp_log_file, debug=False, use_loguru=False, cache=False
+    )
+
+    assert any(hook == logger.flush for _, hook in shutdown._hooks)
+
+
+def test_setup_logger_unchecked_by_default(temp_log_file: Path) -> None:
+    logger: LoggerProxy = LoggerProxy()
+    logger.setup_logger(
+        PACKAGE,
+        temp_log_file,
+        debug="not_a_bool",  # type: ignore
+        use_loguru=False,
+        cache=False,
+    )
+    assert logger.is_initialized()
+
+
+def test_child_logger_level(temp_log_file: Path) -> None:
+    logger: LoggerProxy = LoggerProxy()
+    logger.setup_logger(
+        PACKAGE, temp_log_file, debug=False, use_loguru=False, cache=False
+    )
+    logger.set_level("db", "DEBUG")
+
+    db_logger = logger.get_child(f"{PACKAGE}.db")
+    assert db_logger.name == f"{PACKAGE}.db"
+    db_logger.debug("Debug from db")
+    logger.get_child("db.pool").debug("Debug from db.pool")
+    logger.get_child("api").debug("Debug from api")
+    logger.debug("Debug from package")
+
+    log_content: str = temp_log_file.read_text()
+    assert "Debug from db" in log_content
+    assert "Debug from db.pool" in log_content
+    assert "Debug from api" not in log_content
+    assert "Debug from package" not in log_content
+
+
+def test_reload_levels(temp_log_file: Path, tmp_path: Path) -> None:
+    logger: LoggerProxy = LoggerProxy()
+    logger.setup_logger(
+        PACKAGE, temp_log_file, debug=False, use_loguru=False, cache=False
+    )
+    handlers = list(logger.handlers)
+    config_file: Path = tmp_path / "log_levels.json"
+
+    config_file.write_text('{"api": "DEBUG"}')
+    logger.reload_levels(config_file)
+    assert logger.get_child("api").isEnabledFor(logging.DEBUG)
+
+    config_file.write_text('{"": "WARNING"}')
+    logger.reload_levels(config_file)
+    assert not logger.get_child("api").isEnabledFor(logging.DEBUG)
+    assert not logger.isEnabledFor(logging.INFO)
+    assert logger.handlers == handlers  # Handlers are not re-created
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGHUP"), reason="SIGHUP not available")
+def test_reload_levels_on_sighup(temp_log_file: Path, tmp_path: Path) -> None:
+    logger: LoggerProxy = LoggerProxy()
+    logger.setup_logger(
+        PACKAGE, temp_log_file, debug=False, use_loguru=False, cache=False
+    )
+    config_file: Path = tmp_path / "log_levels.json"
+    previous_handler = signal.getsignal(signal.SIGHUP)
+    try:
+        logger.enable_level_reload(config_file)
+        config_file.write_text('{"worker": "DEBUG"}')
+        os.kill(os.getpid(), signal.SIGHUP)
+
+        assert logger.get_child("worker").isEnabledFor(logging.DEBUG)
+    finally:
+        signal.signal(signal.SIGHUP, previous_handler)
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGHUP"), reason="SIGHUP not available")
+@pytest.mark.parametrize("content", ["{not json", '{"worker": "LOUD"}', "[]"])
+def test_reload_levels_invalid_on_sighup(
+    temp_log_file: Path, tmp_path: Path, content: str
+) -> None:
+    logger: LoggerProxy = LoggerProxy()
+    logger.setup_logger(
+        PACKAGE, temp_log_file, debug=False, use_loguru=False, cache=False
+    )
+    config_file: Path = tmp_path / "log_levels.json"
+    config_file.write_text('{"worker": "DEBUG"}')
+    previous_handler = signal.getsignal(signal.SIGHUP)
+    try:
+        logger.enable_level_reload(config_file)
+        config_file.write_text(content)
+        os.kill(os.getpid(), signal.SIGHUP)
+
+        assert logger.get_child("worker").isEnabledFor(logging.DEBUG)
+        assert "reloading failed" in temp_log_file.read_text()
+    finally:
+        signal.signal(signal.SIGHUP, previous_handler)
+
+
+def test_child_logger_level_loguru(temp_log_file: Path) -> None:
+    logger: LoggerProxy = LoggerProxy()
+    logger.setup_logger(
+        PACKAGE, temp_log_file, debug=False, use_loguru=True, cache=False
+    )
+    logger.set_level("db", "DEBUG")
+
+    logger.get_child("db").debug("Debug from db")
+    logger.get_child("api").debug("Debug from api")
+
+    log_content: str = temp_log_file.read_text()
+    assert "Debug from db" in log_content
+    assert "Debug from api" not in log_content
+
+
+def test_concurrent_logging_and_setup(temp_log_file: Path, tmp_path: Path) -> None:
+    logger: LoggerProxy = LoggerProxy()
+    logger.setup_logger(PACKAGE, temp_log_file, use_loguru=False, cache=False)
+    errors: list[BaseException] = []
+    stop = threading.Event()
+
+    def log() -> None:
+        try:
+            while not stop.is_set():
+                logger.info("Record from %s", threading.current_thread().name)
+                logger.get_child("worker").debug("Debug record")
+        except BaseException as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=log) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for i in range(20):
+        logger.setup_logger(
+            PACKAGE, tmp_path / f"log{i}.log", use_loguru=False, cache=False
+        )
+        logger.set_level("worker", "DEBUG" if i % 2 else "INFO")
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    logger.info("Final record")
+    assert "Final record" in (tmp_path / "log19.log").read_text()
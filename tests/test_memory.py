@@ -0,0 +1,110 @@
+import tracemalloc
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from core_helpers import logs, shutdown
+from core_helpers.cli import setup_parser
+from core_helpers.logs import LoggerProxy
+from core_helpers.memory import (DEFAULT_INTERVAL, _parse_interval,
+                                 disable_memory_profiling,
+                                 enable_memory_profiling, get_memory_report,
+                                 get_peak_rss, is_memory_profiling_enabled,
+                                 report_memory_profile)
+
+
+@pytest.fixture(autouse=True)
+def reset_memory_profiling(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[None]:
+    monkeypatch.setenv("XDG_STATE_HOME", str(tmp_path / "state"))
+    monkeypatch.setattr(logs, "logger", LoggerProxy())
+    yield
+    if tracemalloc.is_tracing():
+        disable_memory_profiling()
+
+
+def test_enable_disable() -> None:
+    enable_memory_profiling("MyApp", interval=0.01)
+    assert is_memory_profiling_enabled()
+    assert tracemalloc.is_tracing()
+    assert any(name == "memory" for name, _ in shutdown._hooks)
+
+    disable_memory_profiling()
+    assert not is_memory_profiling_enabled()
+    assert not tracemalloc.is_tracing()
+    assert all(name != "memory" for name, _ in shutdown._hooks)
+
+
+def test_report(tmp_path: Path) -> None:
+    enable_memory_profiling("MyApp", interval=0.01, top=3)
+    data = [bytearray(1024) for _ in range(1000)]  # noqa: F841
+
+    report_path = report_memory_profile()
+
+    assert report_path is not None
+    assert report_path.is_relative_to(tmp_path)
+    report: str = report_path.read_text(encoding="utf-8")
+    assert "Peak RSS:" in report
+    assert "Top 3 allocation sites at peak" in report
+    assert "test_memory.py" in report
+    assert not tracemalloc.is_tracing()
+    assert report_memory_profile() is None
+
+
+def test_report_logged(tmp_path: Path) -> None:
+    proxy = LoggerProxy()
+    proxy.setup_logger("MyApp", tmp_path / "app.log", cache=False)
+    logs.logger = proxy
+    enable_memory_profiling(interval=0.01)
+
+    report_path = report_memory_profile()
+
+    assert report_path is not None
+    assert "MyApp" in report_path.parts
+    log: str = (tmp_path / "app.log").read_text(encoding="utf-8")
+    assert f"Memory profile written to {report_path}" in log
+    assert "Traced memory:" in log
+
+
+def test_memory_report_lines() -> None:
+    enable_memory_profiling("MyApp", interval=0.01, top=2)
+    lines: list[str] = get_memory_report()
+
+    assert lines[0].startswith("Peak RSS: ")
+    assert lines[1].startswith("Traced memory: ")
+    assert sum(line.startswith("  #") for line in lines) <= 4
+
+
+def test_peak_rss() -> None:
+    rss = get_peak_rss()
+    assert rss is None or rss > 1024 * 1024
+
+
+def test_parser_flag() -> None:
+    parser, _ = setup_parser("MyApp", "MyApp description", "1.0.0")
+
+    assert parser.parse_args([]).memory_profile is False
+    assert not is_memory_profiling_enabled()
+
+    assert parser.parse_args(["--memory-profile"]).memory_profile is True
+    assert is_memory_profiling_enabled()
+
+
+@pytest.mark.parametrize("interval", [0.0, -1.0, float("nan"), float("inf")])
+def test_invalid_interval(interval: float) -> None:
+    with pytest.raises(ValueError):
+        enable_memory_profiling(interval=interval)
+    assert not is_memory_profiling_enabled()
+
+
+@pytest.mark.parametrize(("value", "expected"), [("1", DEFAULT_INTERVAL), ("0.5", 0.5)])
+def test_env_interval(value: str, expected: float) -> None:
+    assert _parse_interval(value) == expected
+
+
+@pytest.mark.parametrize("value", ["on", "-1", "nan", "inf"])
+def test_env_invalid_interval(value: str) -> None:
+    with pytest.warns(RuntimeWarning):
+        assert _parse_interval(value) == DEFAULT_INTERVAL
@@ -0,0 +1,141 @@
+import builtins
+import json
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+from core_helpers import profiling
+from core_helpers.profiling import (disable_profiling, enable_profiling,
+                                    get_profile, profile_phase, report_profile)
+
+
+@pytest.fixture(autouse=True)
+def reset_profiling() -> Iterator[None]:
+    yield
+    disable_profiling()
+
+
+def test_profile_phase_disabled() -> None:
+    with profile_phase("disabled"):
+        pass
+    assert get_profile() == []
+
+
+def test_profile_phase_records_calls() -> None:
+    enable_profiling()
+    for _ in range(3):
+        with profile_phase("phase"):
+            import json  # noqa: F401
+
+    (entry,) = get_profile()
+    assert entry["phase"] == "phase"
+    assert entry["calls"] == 3
+    assert entry["wall_ms"] >= entry["import_ms"] >= 0
+
+
+def test_profile_phase_decorator() -> None:
+    @profile_phase("decorated")
+    def add(a: int, b: int) -> int:
+        return a + b
+
+    assert add(1, 2) == 3
+    assert get_profile() == []
+
+    enable_profiling()
+    assert add(1, 2) == 3
+    assert add(3, 4) == 7
+
+    (entry,) = get_profile()
+    assert entry["phase"] == "decorated"
+    assert entry["calls"] == 2
+    assert add.__name__ == "add"
+
+
+def test_profile_phase_decorator_exception() -> None:
+    enable_profiling()
+
+    @profile_phase("failing")
+    def fail() -> None:
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        fail()
+
+    assert get_profile()[0]["calls"] == 1
+
+
+def test_profile_phase_ignores_other_threads_imports(tmp_path: Path) -> None:
+    """Test that a phase does not count the imports made by other threads."""
+    (tmp_path / "slow_profiled_module.py").write_text(
+        "import time\ntime.sleep(0.2)\n", encoding="utf-8"
+    )
+    sys.path.insert(0, str(tmp_path))
+    enable_profiling()
+    try:
+        with profile_phase("phase"):
+            thread = threading.Thread(target=__import__, args=("slow_profiled_module",))
+            thread.start()
+            thread.join()
+    finally:
+        sys.path.remove(str(tmp_path))
+        sys.modules.pop("slow_profiled_module", None)
+
+    (entry,) = get_profile()
+    assert entry["wall_ms"] >= 200
+    assert entry["import_ms"] < 100
+
+
+def test_disable_profiling_keeps_foreign_import_hook() -> None:
+    """Test that disabling does not undo an import hook installed afterwards."""
+    enable_profiling()
+    profiled_import = builtins.__import__
+
+    def foreign_import(*args: Any, **kwargs: Any) -> Any:
+        return profiled_import(*args, **kwargs)
+
+    builtins.__import__ = foreign_import
+    try:
+        disable_profiling()
+        assert builtins.__import__ is foreign_import
+    finally:
+        builtins.__import__ = profiling._original_import
+
+
+def test_disable_profiling_restores_import() -> None:
+    enable_profiling()
+    disable_profiling()
+
+    assert builtins.__import__ is profiling._original_import
+
+
+def test_profile_sorted_by_wall_time() -> None:
+    enable_profiling()
+    profiling._phases["fast"] = [1, 0.001, 0.0]
+    profiling._phases["slow"] = [1, 0.5, 0.0]
+
+    assert [entry["phase"] for entry in get_profile()] == ["slow", "fast"]
+
+
+def test_report_profile_json(tmp_path: Path) -> None:
+    output: Path = tmp_path / "profile.json"
+    enable_profiling(output)
+    with profile_phase("phase"):
+        pass
+
+    report_profile()
+
+    data = json.loads(output.read_text(encoding="utf-8"))
+    assert data[0]["phase"] == "phase"
+
+
+def test_report_profile_table(capsys: pytest.CaptureFixture[str]) -> None:
+    enable_profiling()
+    with profile_phase("phase"):
+        pass
+
+    report_profile()
+
+    assert "phase" in capsys.readouterr().err
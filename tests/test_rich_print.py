@@ -0,0 +1,95 @@
+import threading
+import time
+from typing import Iterator
+
+import pytest
+
+from core_helpers import rich_print
+from core_helpers.rich_print import (ThrottledProgress, _get_rich_console,
+                                     disable_threaded_output,
+                                     enable_threaded_output, flush_output,
+                                     print_error_message,
+                                     print_warning_message)
+
+
+def test_console_is_cached() -> None:
+    assert _get_rich_console(stderr=True) is _get_rich_console(stderr=True)
+
+
+def test_print_error_message(capsys: pytest.CaptureFixture[str]) -> None:
+    print_error_message("Something failed")
+    assert "Something failed" in capsys.readouterr().err
+
+
+def test_progress_counts_from_many_threads(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    def work(progress: ThrottledProgress) -> None:
+        for _ in range(10_000):
+            progress.advance()
+
+    with ThrottledProgress(total=80_000, description="Items") as progress:
+        threads: list[threading.Thread] = [
+            threading.Thread(target=work, args=(progress,)) for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert progress.completed == 80_000
+    # The output is not a terminal, the final state is printed on one line
+    last_line: str = capsys.readouterr().err.splitlines()[-1]
+    assert last_line.startswith("Items 80000/80000 (100%)")
+
+
+def test_progress_redraw_is_throttled(capsys: pytest.CaptureFixture[str]) -> None:
+    with ThrottledProgress(description="Items", interval=0.05) as progress:
+        deadline: float = time.monotonic() + 0.3
+        while time.monotonic() < deadline:
+            progress.advance()
+
+    lines: list[str] = capsys.readouterr().err.splitlines()
+    assert 2 <= len(lines) <= 10
+
+
+@pytest.fixture
+def threaded_output() -> Iterator[None]:
+    enable_threaded_output()
+    yield
+    disable_threaded_output()
+
+
+@pytest.mark.usefixtures("threaded_output")
+def test_threaded_output_keeps_messages_whole(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    def work(worker: int) -> None:
+        for i in range(20):
+            print_warning_message(f"worker-{worker}-message-{i}")
+
+    threads: list[threading.Thread] = [
+        threading.Thread(target=work, args=(worker,)) for worker in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert flush_output(timeout=5)
+
+    lines: list[str] = capsys.readouterr().err.splitlines()
+    # Every panel is three lines: top border, message and bottom border
+    assert len(lines) == 4 * 20 * 3
+    for top, middle, bottom in zip(lines[::3], lines[1::3], lines[2::3]):
+        assert top.startswith("╭")
+        assert "message" in middle
+        assert bottom.startswith("╰")
+
+
+def test_disable_threaded_output(capsys: pytest.CaptureFixture[str]) -> None:
+    enable_threaded_output()
+    print_error_message("Queued message")
+    disable_threaded_output()
+
+    assert rich_print._output_queue is None
+    assert "Queued message" in capsys.readouterr().err
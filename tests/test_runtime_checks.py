@@ -0,0 +1,77 @@
+import os
+import subprocess
+import sys
+from typing import Iterator
+
+import pytest
+from typeguard import TypeCheckError
+
+import core_helpers
+from core_helpers import cli, runtime_checks
+from core_helpers.runtime_checks import (disable_runtime_checks,
+                                         enable_runtime_checks,
+                                         runtime_checks_enabled)
+from core_helpers.xdg_paths import PathType
+
+# The function registered by runtime_checked, behind the profile_phase wrapper
+ORIGINAL_SETUP_PARSER = cli.setup_parser.__wrapped__
+
+
+@pytest.fixture(autouse=True)
+def restore_runtime_checks() -> Iterator[None]:
+    yield
+    disable_runtime_checks()
+
+
+def test_disabled_by_default() -> None:
+    assert not runtime_checks_enabled()
+    # No typeguard wrapper is installed around the public functions
+    assert core_helpers.setup_parser.__wrapped__ is ORIGINAL_SETUP_PARSER
+    assert runtime_checks._functions[ORIGINAL_SETUP_PARSER] is ORIGINAL_SETUP_PARSER
+
+
+def test_enable_runtime_checks() -> None:
+    enable_runtime_checks()
+
+    assert runtime_checks_enabled()
+    assert core_helpers.setup_parser.__wrapped__ is not ORIGINAL_SETUP_PARSER
+    assert cli.setup_parser is core_helpers.setup_parser
+    with pytest.raises(TypeCheckError):
+        core_helpers.get_user_path(123, PathType.CACHE)  # type: ignore
+
+
+def test_disable_runtime_checks() -> None:
+    enable_runtime_checks()
+    disable_runtime_checks()
+
+    assert not runtime_checks_enabled()
+    assert core_helpers.setup_parser.__wrapped__ is ORIGINAL_SETUP_PARSER
+    assert cli.setup_parser.__wrapped__ is ORIGINAL_SETUP_PARSER
+
+
+def test_enable_twice() -> None:
+    enable_runtime_checks()
+    checked = core_helpers.setup_parser.__wrapped__
+    enable_runtime_checks()
+
+    assert core_helpers.setup_parser.__wrapped__ is checked
+
+
+def test_env_var_without_typeguard() -> None:
+    """Test that the environment variable only warns if typeguard is missing."""
+    code: str = (
+        "import sys; sys.modules['typeguard'] = None\n"
+        "import core_helpers\n"
+        "from core_helpers.runtime_checks import runtime_checks_enabled\n"
+        "print(runtime_checks_enabled())"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, runtime_checks.RUNTIME_CHECKS_ENV_VAR: "1"},
+    )
+
+    assert result.stdout.strip() == "False"
+    assert "typeguard is not installed" in result.stderr
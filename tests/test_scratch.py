@@ -0,0 +1,96 @@
+import os
+from pathlib import Path
+from typing import NamedTuple
+
+import pytest
+
+from core_helpers import scratch
+from core_helpers.scratch import ScratchSpace, get_filesystem_type
+
+SHM = Path("/dev/shm")
+requires_tmpfs = pytest.mark.skipif(
+    get_filesystem_type(SHM) != "tmpfs", reason="Requires a tmpfs /dev/shm"
+)
+
+
+class DiskUsage(NamedTuple):
+    total: int
+    used: int
+    free: int
+
+
+@pytest.fixture
+def ram_runtime(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Point the runtime directory at a tmpfs and the cache at a disk."""
+    runtime: Path = SHM / f"core-helpers-test-{os.getpid()}"
+    runtime.mkdir(mode=0o700, exist_ok=True)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(runtime))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    yield runtime
+    for path in sorted(runtime.rglob("*"), reverse=True):
+        path.rmdir() if path.is_dir() else path.unlink()
+    runtime.rmdir()
+
+
+def test_get_filesystem_type(tmp_path: Path) -> None:
+    if not Path("/proc/self/mounts").exists():
+        assert get_filesystem_type(tmp_path) is None
+    else:
+        assert get_filesystem_type("/proc/self") == "proc"
+
+
+@requires_tmpfs
+def test_ram_directory(ram_runtime: Path) -> None:
+    space = ScratchSpace("test_package")
+
+    assert space.get_directory() == ram_runtime / "test_package" / "scratch"
+    with space.temporary_file() as tmp_file:
+        tmp_file.write(b"data")
+        assert Path(tmp_file.name).parent == space.ram_directory
+    assert not Path(tmp_file.name).exists()
+
+
+@requires_tmpfs
+def test_fallback_when_full(
+    ram_runtime: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(
+        scratch.shutil, "disk_usage", lambda path: DiskUsage(1000, 700, 300)
+    )
+    space = ScratchSpace("test_package")
+
+    assert space.get_directory(size=10) == space.ram_directory
+    # The allocation would leave less than a quarter of the filesystem free
+    assert space.get_directory(size=100) == space.disk_directory
+    assert space.disk_directory.is_relative_to(tmp_path / "cache")
+
+
+def test_fallback_without_ram(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path / "runtime"))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setattr(scratch, "get_filesystem_type", lambda path: "ext4")
+    space = ScratchSpace("test_package")
+
+    assert space.ram_directory is None
+    with space.temporary_directory() as directory:
+        (directory / "file").write_text("data")
+        assert directory.parent == tmp_path / "cache" / "test_package" / "scratch"
+    assert not directory.exists()
+
+
+def test_buffer(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setattr(scratch, "get_filesystem_type", lambda path: None)
+    space = ScratchSpace("test_package")
+
+    with space.buffer(4096) as buffer:
+        assert len(buffer) == 4096
+        assert buffer[:4] == b"\0\0\0\0"
+        buffer[:4] = b"data"
+        assert buffer[:4] == b"data"
+    assert buffer.closed
+    assert list(space.disk_directory.iterdir()) == []
+
+    with pytest.raises(ValueError):
+        with space.buffer(0):
+            pass
@@ -0,0 +1,118 @@
+import threading
+import time
+from typing import Iterator
+
+import pytest
+
+from core_helpers import rich_print, shutdown
+from core_helpers.shutdown import (register_shutdown_hook, run_shutdown_hooks,
+                                   unregister_shutdown_hook)
+from core_helpers.utils import exit_session
+
+
+@pytest.fixture(autouse=True)
+def clear_hooks() -> Iterator[None]:
+    saved = shutdown._hooks[:], shutdown._final_hooks.copy()
+    shutdown._hooks.clear()
+    shutdown._final_hooks.clear()
+    yield
+    shutdown._hooks[:] = saved[0]
+    shutdown._final_hooks.clear()
+    shutdown._final_hooks.update(saved[1])
+
+
+def test_hooks_run_once() -> None:
+    calls: list[str] = []
+    register_shutdown_hook(lambda: calls.append("hook"))
+
+    assert run_shutdown_hooks() == []
+    assert run_shutdown_hooks() == []
+    assert calls == ["hook"]
+
+
+def test_register_twice() -> None:
+    calls: list[str] = []
+
+    def hook() -> None:
+        calls.append("hook")
+
+    register_shutdown_hook(hook)
+    register_shutdown_hook(hook)
+    run_shutdown_hooks()
+
+    assert calls == ["hook"]
+
+
+def test_unregister() -> None:
+    calls: list[str] = []
+
+    def hook() -> None:
+        calls.append("hook")
+
+    register_shutdown_hook(hook)
+    unregister_shutdown_hook(hook)
+    run_shutdown_hooks()
+
+    assert calls == []
+
+
+def test_hooks_run_in_parallel() -> None:
+    # The hooks only finish if all of them are running at the same time
+    barrier = threading.Barrier(3, timeout=1)
+    for _ in range(3):
+        register_shutdown_hook(lambda: barrier.wait())
+
+    assert run_shutdown_hooks(timeout=2) == []
+
+
+def test_total_deadline() -> None:
+    register_shutdown_hook(lambda: time.sleep(5), name="slow")
+    register_shutdown_hook(lambda: time.sleep(5), name="slower")
+
+    start: float = time.monotonic()
+    failed: list[str] = run_shutdown_hooks(timeout=0.2)
+
+    assert time.monotonic() - start < 1
+    assert failed == ["slow", "slower"]
+
+
+def test_final_hooks_run_last() -> None:
+    calls: list[str] = []
+    register_shutdown_hook(lambda: calls.append("flush"), name="flush", final=True)
+    register_shutdown_hook(lambda: (time.sleep(0.1), calls.append("report")))
+
+    assert run_shutdown_hooks() == []
+    assert calls == ["report", "flush"]
+
+
+def test_final_hooks_after_deadline(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that the timeout warnings are written in threaded output mode."""
+    rich_print.enable_threaded_output()
+    try:
+        register_shutdown_hook(lambda: time.sleep(5), name="slow")
+
+        assert run_shutdown_hooks(timeout=0.5) == ["slow"]
+        assert "Shutdown hook 'slow' did not finish" in capsys.readouterr().err
+    finally:
+        rich_print.disable_threaded_output()
+
+
+def test_failing_hook(capsys: pytest.CaptureFixture[str]) -> None:
+    def hook() -> None:
+        raise ValueError("boom")
+
+    register_shutdown_hook(hook, name="failing")
+
+    assert run_shutdown_hooks() == ["failing"]
+    assert "boom" in capsys.readouterr().err
+
+
+def test_exit_session_runs_hooks() -> None:
+    calls: list[str] = []
+    register_shutdown_hook(lambda: calls.append("hook"))
+
+    with pytest.raises(SystemExit) as exc_info:
+        exit_session(0, "app.log")
+
+    assert exc_info.value.code == 0
+    assert calls == ["hook"]
@@ -0,0 +1,365 @@
+import io
+import logging
+import os
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from core_helpers.logs import LoggerProxy
+from core_helpers.sinks import (FanOutHandler, FileSink, Sink, StreamSink,
+                                SyslogProtocol, SyslogSink)
+
+
+class CountingFormatter(logging.Formatter):
+    def __init__(self, fmt: str = "%(levelname)s %(message)s") -> None:
+        super().__init__(fmt)
+        self.calls: int = 0
+
+    def format(self, record: logging.LogRecord) -> str:
+        self.calls += 1
+        return super().format(record)
+
+
+class BrokenSink(Sink):
+    def write(self, message: str | bytes, levelno: int) -> None:
+        raise OSError("Broken sink")
+
+
+@pytest.fixture
+def daemon() -> Iterator[socket.socket]:
+    """A Unix datagram socket standing in for the journal or syslog daemon."""
+    # Socket paths are limited to about 100 characters
+    with tempfile.TemporaryDirectory() as directory:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(str(Path(directory) / "log"))
+        sock.settimeout(1)
+        yield sock
+        sock.close()
+
+
+def _receive_all(sock: socket.socket) -> list[bytes]:
+    datagrams: list[bytes] = []
+    sock.setblocking(False)
+    try:
+        while True:
+            datagrams.append(sock.recv(65536))
+    except BlockingIOError:
+        return datagrams
+
+
+def _make_logger(name: str, handler: logging.Handler) -> logging.Logger:
+    logger: logging.Logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.handlers = [handler]
+    return logger
+
+
+def test_format_once(tmp_path: Path) -> None:
+    formatter = CountingFormatter()
+    stream = io.StringIO()
+    handler = FanOutHandler(
+        [FileSink(tmp_path / "a.log"), FileSink(tmp_path / "b.log"), StreamSink(stream)]
+    )
+    handler.setFormatter(formatter)
+    logger: logging.Logger = _make_logger("test_format_once", handler)
+
+    logger.info("Record %d", 1)
+    handler.close()
+
+    assert formatter.calls == 1
+    assert (tmp_path / "a.log").read_text() == "INFO Record 1\n"
+    assert (tmp_path / "b.log").read_text() == "INFO Record 1\n"
+    assert stream.getvalue() == "INFO Record 1\n"
+
+
+def test_format_once_per_formatter(tmp_path: Path) -> None:
+    shared, other = CountingFormatter(), CountingFormatter("%(message)s")
+    handler = FanOutHandler(
+        [
+            FileSink(tmp_path / "a.log"),
+            FileSink(tmp_path / "b.log"),
+            FileSink(tmp_path / "c.log", formatter=other),
+        ]
+    )
+    handler.setFormatter(shared)
+    logger: logging.Logger = _make_logger("test_format_once_per_formatter", handler)
+
+    logger.warning("Record")
+    handler.close()
+
+    assert (shared.calls, other.calls) == (1, 1)
+    assert (tmp_path / "c.log").read_text() == "Record\n"
+
+
+def test_level_routing(tmp_path: Path) -> None:
+    handler = FanOutHandler(
+        [
+            FileSink(tmp_path / "app.log", level="INFO"),
+            FileSink(tmp_path / "debug.log", max_level=logging.DEBUG),
+            FileSink(tmp_path / "errors.log", level="ERROR"),
+        ]
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger: logging.Logger = _make_logger("test_level_routing", handler)
+
+    logger.debug("Debug")
+    logger.info("Info")
+    logger.error("Error")
+    handler.close()
+
+    assert (tmp_path / "app.log").read_text() == "Info\nError\n"
+    assert (tmp_path / "debug.log").read_text() == "Debug\n"
+    assert (tmp_path / "errors.log").read_text() == "Error\n"
+
+
+def test_handler_level() -> None:
+    handler = FanOutHandler([StreamSink(level="WARNING"), StreamSink(level="ERROR")])
+
+    assert handler.level == logging.WARNING
+
+
+def test_broken_sink(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(logging, "raiseExceptions", False)
+    handler = FanOutHandler([BrokenSink(), FileSink(tmp_path / "app.log")])
+    logger: logging.Logger = _make_logger("test_broken_sink", handler)
+
+    logger.info("Record")
+    handler.close()
+
+    assert (tmp_path / "app.log").read_text() == "Record\n"
+
+
+def test_setup_logger_sinks(tmp_path: Path) -> None:
+    logger = LoggerProxy()
+    logger.setup_logger(
+        "test_setup_logger_sinks",
+        tmp_path / "app.log",
+        cache=False,
+        redact=True,
+        sinks=[FileSink(tmp_path / "errors.log", level="ERROR")],
+    )
+
+    logger.info("Started")
+    logger.error("Failed with password=hunter2")
+    logger.flush()
+
+    app_log: str = (tmp_path / "app.log").read_text()
+    assert "Started" in app_log
+    assert "password=[REDACTED]" in app_log
+    errors_log: str = (tmp_path / "errors.log").read_text()
+    assert "Started" not in errors_log
+    assert "password=[REDACTED]" in errors_log
+    assert len(logger.handlers) == 1
+
+
+def test_setup_logger_sinks_loguru(tmp_path: Path) -> None:
+    logger = LoggerProxy()
+    logger.setup_logger(
+        "test_setup_logger_sinks_loguru",
+        tmp_path / "app.log",
+        use_loguru=True,
+        sinks=[
+            FileSink(tmp_path / "errors.log", level="ERROR"),
+            FileSink(tmp_path / "info.log", level="INFO", max_level="INFO"),
+        ],
+    )
+
+    logger.info("Started")
+    logger.error("Failed")
+    logger.remove()
+
+    errors_log: str = (tmp_path / "errors.log").read_text()
+    assert "Failed" in errors_log and "Started" not in errors_log
+    info_log: str = (tmp_path / "info.log").read_text()
+    assert "Started" in info_log and "Failed" not in info_log
+
+
+def test_syslog_sink(daemon: socket.socket) -> None:
+    sink = SyslogSink(daemon.getsockname(), ident="app", batch_size=2)
+    handler = FanOutHandler([sink])
+    logger: logging.Logger = _make_logger("test_syslog_sink", handler)
+
+    logger.info("First")
+    assert _receive_all(daemon) == []  # Waiting for the batch to fill
+    logger.warning("Second")
+    datagrams: list[bytes] = _receive_all(daemon)
+
+    assert sink.protocol is SyslogProtocol.SYSLOG
+    assert len(datagrams) == 2
+    assert datagrams[0].startswith(b"<14>")  # User facility, info severity
+    assert datagrams[0].endswith(b" app[%d]: First" % os.getpid())
+    assert datagrams[1].startswith(b"<12>")
+
+    logger.debug("Third")
+    assert _receive_all(daemon) == []
+    handler.flush()
+    assert _receive_all(daemon)[0].startswith(b"<15>")
+    handler.close()
+
+
+def test_syslog_sink_flush_level(daemon: socket.socket) -> None:
+    sink = SyslogSink(daemon.getsockname(), ident="app")
+    handler = FanOutHandler([sink])
+    logger: logging.Logger = _make_logger("test_syslog_sink_flush_level", handler)
+
+    logger.info("Started")
+    logger.error("Failed")
+
+    assert len(_receive_all(daemon)) == 2
+    handler.close()
+
+
+def test_syslog_sink_max_latency(daemon: socket.socket) -> None:
+    """Test that a lone record is sent by the timer, without a flush."""
+    sink = SyslogSink(daemon.getsockname(), ident="app", max_latency=0.05)
+
+    sink.write("Idle", logging.INFO)
+    assert _receive_all(daemon) == []
+
+    daemon.setblocking(True)
+    assert daemon.recv(65536).endswith(b"]: Idle")
+    sink.close()
+
+
+def test_syslog_sink_max_latency_on_write(daemon: socket.socket) -> None:
+    sink = SyslogSink(daemon.getsockname(), ident="app")
+    sink.write("Old", logging.INFO)
+    created, levelno, message = sink._pending[0]
+    sink._pending[0] = (created - sink.max_latency, levelno, message)
+
+    sink.write("New", logging.INFO)
+
+    assert len(_receive_all(daemon)) == 2
+    sink.close()
+
+
+def test_syslog_sink_close_cancels_timer(daemon: socket.socket) -> None:
+    sink = SyslogSink(daemon.getsockname(), ident="app", max_latency=0.05)
+    sink.write("Pending", logging.INFO)
+    sink.close()
+
+    assert len(_receive_all(daemon)) == 1
+    time.sleep(0.1)
+    assert sink._socket is None  # The timer did not reconnect
+
+
+def test_journal_sink(daemon: socket.socket) -> None:
+    sink = SyslogSink(
+        daemon.getsockname(), SyslogProtocol.JOURNAL, ident="app", batch_size=1
+    )
+    handler = FanOutHandler([sink])
+    logger: logging.Logger = _make_logger("test_journal_sink", handler)
+
+    logger.error("Line 1\nLine 2")
+    datagram: bytes = daemon.recv(65536)
+    handler.close()
+
+    message: bytes = b"Line 1\nLine 2"
+    assert datagram.startswith(
+        b"MESSAGE\n" + struct.pack("<Q", len(message)) + message + b"\n"
+    )
+    assert b"\nPRIORITY=3\n" in datagram
+    assert b"\nSYSLOG_IDENTIFIER=app\n" in datagram
+
+
+def test_syslog_sink_drops_when_busy(daemon: socket.socket) -> None:
+    sink = SyslogSink(daemon.getsockname(), batch_size=1, max_pending=4)
+    handler = FanOutHandler([sink])
+    logger: logging.Logger = _make_logger("test_syslog_sink_drops_when_busy", handler)
+
+    # Nobody reads the socket, its queue fills up and sends would block
+    for index in range(2000):
+        logger.info("Record %d", index)
+
+    received: int = len(_receive_all(daemon))
+    assert sink.dropped > 0
+    assert received + len(sink._pending) + sink.dropped == 2000
+    handler.close()
+
+
+def test_syslog_sink_fallback(tmp_path: Path) -> None:
+    sink = SyslogSink(tmp_path / "missing", fallback=tmp_path / "app.log")
+    handler = FanOutHandler([sink])
+    logger: logging.Logger = _make_logger("test_syslog_sink_fallback", handler)
+
+    logger.error("Failed")
+    handler.close()
+
+    assert (tmp_path / "app.log").read_text().endswith("] ERROR: Failed\n")
+    assert sink.dropped == 0
+
+
+def test_syslog_sink_without_fallback(tmp_path: Path) -> None:
+    sink = SyslogSink(tmp_path / "missing", batch_size=1)
+    handler = FanOutHandler([sink])
+    logger: logging.Logger = _make_logger("test_syslog_sink_without_fallback", handler)
+
+    logger.info("Lost")
+    handler.close()
+
+    assert sink.dropped == 1
+
+
+def test_setup_logger_syslog(daemon: socket.socket, tmp_path: Path) -> None:
+    logger = LoggerProxy()
+    logger.setup_logger(
+        "test_setup_logger_syslog",
+        tmp_path / "app.log",
+        cache=False,
+        syslog=SyslogSink(daemon.getsockname(), ident="app"),
+    )
+
+    logger.info("Started")
+    logger.flush()
+
+    datagrams: list[bytes] = _receive_all(daemon)
+    assert len(datagrams) == 1 and datagrams[0].endswith(b"]: Started")
+    assert not (tmp_path / "app.log").exists()
+
+    with pytest.raises(ValueError):
+        logger.setup_logger("test", tmp_path / "app.log", binary=True, syslog=True)
+
+
+def test_setup_logger_syslog_loguru(daemon: socket.socket, tmp_path: Path) -> None:
+    logger = LoggerProxy()
+    logger.setup_logger(
+        "test_setup_logger_syslog_loguru",
+        tmp_path / "app.log",
+        use_loguru=True,
+        syslog=SyslogSink(daemon.getsockname(), ident="app"),
+    )
+
+    logger.info("Started")
+    logger.flush()
+    logger.remove()
+
+    datagrams: list[bytes] = _receive_all(daemon)
+    assert len(datagrams) == 1 and datagrams[0].endswith(b"]: Started")
+
+
+def test_setup_logger_syslog_loguru_exit(daemon: socket.socket, tmp_path: Path) -> None:
+    """Test that batched records are sent when the program exits normally."""
+    code: str = (
+        "import sys\n"
+        "from core_helpers.logs import LoggerProxy\n"
+        "from core_helpers.sinks import SyslogSink\n"
+        "logger = LoggerProxy()\n"
+        "logger.setup_logger('app', sys.argv[2], use_loguru=True,\n"
+        "                    syslog=SyslogSink(sys.argv[1], max_latency=60))\n"
+        "logger.info('Exiting')\n"
+    )
+    subprocess.run(
+        [sys.executable, "-c", code, daemon.getsockname(), str(tmp_path / "app.log")],
+        check=True,
+    )
+
+    datagrams: list[bytes] = _receive_all(daemon)
+    assert len(datagrams) == 1 and datagrams[0].endswith(b"]: Exiting")
@@ -0,0 +1,176 @@
+import logging
+import threading
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from core_helpers import logs, shutdown, tracing
+from core_helpers.logs import LoggerProxy
+from core_helpers.tracing import (SpanMode, _parse_sample_rate,
+                                  disable_tracing, enable_tracing,
+                                  get_span_stats, report_spans, span)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+@pytest.fixture(autouse=True)
+def reset_tracing() -> Iterator[None]:
+    yield
+    disable_tracing()
+
+
+@pytest.fixture
+def handler(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> ListHandler:
+    proxy = LoggerProxy()
+    proxy.setup_logger("MyTracedApp", tmp_path / "app.log", debug=True, cache=False)
+    handler = ListHandler()
+    proxy._logger.addHandler(handler)
+    monkeypatch.setattr(logs, "logger", proxy)
+    return handler
+
+
+def test_span_disabled(handler: ListHandler) -> None:
+    with span("disabled") as disabled:
+        disabled.set(key="value")
+
+    assert disabled.duration is None
+    assert handler.records == []
+
+
+def test_span_log(handler: ListHandler) -> None:
+    enable_tracing()
+    with span("outer", kind="test"):
+        with span("inner") as inner:
+            inner.set(rows=3)
+
+    inner_record, outer_record = handler.records
+    assert inner_record.name == "MyTracedApp.tracing"
+    assert inner_record.levelno == logging.DEBUG
+    assert inner_record.getMessage().startswith("span outer/inner: ")
+    assert inner_record.getMessage().endswith(" ms rows=3")
+    assert outer_record.getMessage().startswith("span outer: ")
+    assert outer_record.getMessage().endswith(" ms kind='test'")
+    assert inner.duration is not None and inner.duration >= 0
+
+
+def test_span_decorator(handler: ListHandler) -> None:
+    @span("add")
+    def add(a: int, b: int) -> int:
+        return a + b
+
+    assert add(1, 2) == 3
+    assert handler.records == []
+
+    enable_tracing()
+    assert add(1, 2) == 3
+    (record,) = handler.records
+    assert record.getMessage().startswith("span add: ")
+
+
+def test_span_histogram(handler: ListHandler) -> None:
+    enable_tracing(SpanMode.HISTOGRAM)
+    for _ in range(10):
+        with span("loop"):
+            pass
+
+    assert handler.records == []
+    (entry,) = get_span_stats()
+    assert entry["span"] == "loop"
+    assert entry["calls"] == 10
+    assert entry["min_ms"] <= entry["p50_ms"] <= entry["p99_ms"] <= entry["max_ms"]
+
+    report_spans()
+    (record,) = handler.records
+    assert record.getMessage().startswith("span loop: 10 calls")
+
+
+def test_span_histogram_shutdown_hook() -> None:
+    enable_tracing(SpanMode.HISTOGRAM)
+    assert any(name == "tracing" for name, _ in shutdown._hooks)
+
+    disable_tracing()
+    assert all(name != "tracing" for name, _ in shutdown._hooks)
+
+
+def test_span_histogram_threads() -> None:
+    enable_tracing(SpanMode.HISTOGRAM)
+
+    def work() -> None:
+        for _ in range(100):
+            with span("work"):
+                pass
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    (entry,) = get_span_stats()
+    assert entry["calls"] == 400
+
+
+def test_span_histogram_finished_threads() -> None:
+    """Test that exited threads are merged and no longer tracked."""
+    enable_tracing(SpanMode.HISTOGRAM)
+
+    def work() -> None:
+        with span("work"):
+            pass
+
+    for _ in range(10):
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+
+    (entry,) = get_span_stats()
+    assert entry["calls"] == 10
+    assert all(recorded.thread.is_alive() for recorded in tracing._thread_histograms)
+    assert get_span_stats()[0]["calls"] == 10
+
+
+def test_span_sampling(handler: ListHandler) -> None:
+    enable_tracing(sample_rate=0.0)
+    with span("root"):
+        with span("child"):
+            pass
+    assert handler.records == []
+
+    enable_tracing(sample_rate=1.0)
+    with span("root"):
+        with span("child"):
+            pass
+    assert len(handler.records) == 2
+
+
+def test_span_log_level(handler: ListHandler) -> None:
+    enable_tracing(level="INFO")
+    with span("info"):
+        pass
+
+    (record,) = handler.records
+    assert record.levelno == logging.INFO
+
+
+def test_invalid_sample_rate() -> None:
+    with pytest.raises(ValueError):
+        enable_tracing(sample_rate=2.0)
+
+
+@pytest.mark.parametrize(("value", "expected"), [("", 1.0), ("0.25", 0.25)])
+def test_env_sample_rate(value: str, expected: float) -> None:
+    assert _parse_sample_rate(value) == expected
+
+
+@pytest.mark.parametrize("value", ["abc", "2", "nan"])
+def test_env_invalid_sample_rate(value: str) -> None:
+    with pytest.warns(RuntimeWarning):
+        assert _parse_sample_rate(value) == 1.0
@@ -1,8 +1,16 @@
-from _pytest.capture import CaptureResult
-import pytest
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
 
+import pytest
+from _pytest.capture import CaptureResult
 
+from core_helpers import http_client, updates
+from core_helpers.http_client import Response
 from core_helpers.updates import check_updates
+from tests.stub_server import REPO_URLS, stub_api
 
 # List of URLs to test
 URLS: list[str] = [
@@ -17,6 +25,12 @@ URLS: list[str] = [
 ]
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Keep the shared update-check state out of the user's cache directory."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+
 def run_check_updates_test(
     url: str,
     capsys: pytest.CaptureFixture[str],
@@ -76,3 +90,199 @@ def test_invalid_url(capsys: pytest.CaptureFixture[str]) -> None:
         expected_output="ERROR: Unsupported platform",
         error_expected=True,
     )
+
+
+@pytest.mark.parametrize("platform", REPO_URLS)
+@pytest.mark.parametrize("releases", [True, False])
+def test_check_updates_stub_api(
+    platform: str, releases: bool, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test the check_updates function against the local stub API."""
+    with stub_api(releases=releases):
+        check_updates(REPO_URLS[platform], "0.0.1")
+
+    captured: CaptureResult[str] = capsys.readouterr()
+    expected_version: str = "v2.0.0" if releases else "v1.9.9"
+    assert f"Newer version of the script available: {expected_version}" in captured.out
+
+
+def test_check_updates_rate_limit_exhausted(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that no request is sent once the shared API budget is exhausted."""
+    with stub_api(releases=False, rate_limit=2) as server:
+        check_updates(REPO_URLS["github"], "0.0.1")
+        assert server.request_count == 2
+
+        check_updates(REPO_URLS["github"], "0.0.1")
+        assert server.request_count == 2  # No request was sent
+
+    captured: CaptureResult[str] = capsys.readouterr()
+    assert "the API rate limit is exhausted" in captured.out
+
+
+def test_check_updates_retry_after() -> None:
+    """Test that a rejected request blocks the API host until Retry-After."""
+    response = Response(429, {"Retry-After": "120"}, b"")
+    updates._update_rate_limit("https://api.github.com/repos/a/b", response)
+
+    wait: float = updates._get_rate_limit_wait("https://api.github.com/repos/c/d")
+    assert 110 < wait <= 120
+    with pytest.raises(updates.RateLimitExceeded):
+        updates._reserve_request("https://api.github.com/repos/c/d")
+
+
+def test_reserve_request_across_processes() -> None:
+    """Test that concurrent processes never spend the same budget twice."""
+    url: str = "https://api.github.com/repos/a/b/tags"
+    updates._save_rate_limits(
+        {"api.github.com": {"remaining": 1000, "reset": time.time() + 3600}}
+    )
+    code: str = (
+        "from core_helpers import updates\n"
+        "for _ in range(25):\n"
+        f"    updates._reserve_request({url!r})\n"
+    )
+    processes: list[subprocess.Popen[bytes]] = [
+        subprocess.Popen([sys.executable, "-c", code]) for _ in range(4)
+    ]
+    for process in processes:
+        assert process.wait() == 0
+
+    assert updates._load_rate_limits()["api.github.com"]["remaining"] == 900
+
+
+def test_check_updates_unusable_cache(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that the check still runs if the shared state cannot be stored."""
+    (tmp_path / "file").write_text("")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "file" / "cache"))
+    with stub_api():
+        check_updates(REPO_URLS["github"], "0.0.1")
+
+    assert "v2.0.0" in capsys.readouterr().out
+
+
+def test_check_updates_renamed_repository(
+    capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that the stdlib backend follows the redirect of a renamed repository."""
+    monkeypatch.setattr(http_client, "PREFER_REQUESTS", False)
+    with stub_api() as server:
+        server.redirects["/github/repos/owner/renamed/releases/latest"] = (
+            "/github/repos/owner/project/releases/latest"
+        )
+        check_updates("https://github.com/owner/renamed", "0.0.1")
+
+    assert "v2.0.0" in capsys.readouterr().out
+
+
+def test_auth_headers(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that API tokens are read from the platform environment variable."""
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+    assert updates._get_auth_headers("https://api.github.com/repos/a/b") == {}
+
+    monkeypatch.setenv("GITHUB_TOKEN", "secret")
+    assert updates._get_auth_headers("https://api.github.com/repos/a/b") == {
+        "Authorization": "Bearer secret"
+    }
+
+
+def test_check_updates_single_flight(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that concurrent checks of the same repository share one fetch."""
+    # Without releases both lookups must finish, making the count deterministic
+    with stub_api(delay=0.2, releases=False) as server:
+        threads: list[threading.Thread] = [
+            threading.Thread(target=check_updates, args=(REPO_URLS["gitea"], "0.0.1"))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert server.request_count == 2  # One release and one tags request
+
+    captured: CaptureResult[str] = capsys.readouterr()
+    assert captured.out.count("Newer version of the script available: v1.9.9") == 8
+
+
+def test_check_updates_reuses_published_result() -> None:
+    """Test that a fresh published result is reused without any request."""
+    with stub_api(releases=False) as server:
+        check_updates(REPO_URLS["github"], "0.0.1")
+        check_updates(REPO_URLS["github"], "0.0.1")
+
+        assert server.request_count == 2
+
+
+def test_single_flight_reuses_only_successes() -> None:
+    """Test that a failed fetch is retried by the next caller."""
+    results: list[str | None] = [None, "v1.0.0", "v2.0.0"]
+    calls: list[str | None] = []
+
+    def fetch() -> str | None:
+        calls.append(results[len(calls)])
+        return calls[-1]
+
+    assert updates._single_flight("key", fetch) == (True, None)
+    assert updates._single_flight("key", fetch) == (True, "v1.0.0")
+    assert updates._single_flight("key", fetch) == (True, "v1.0.0")
+    assert calls == [None, "v1.0.0"]
+
+
+@pytest.mark.parametrize("platform", ["github", "gitlab"])
+def test_check_updates_slow_release_races_tags(
+    platform: str, capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that the tags are requested while a slow release lookup runs."""
+    monkeypatch.setattr(updates, "TAG_LOOKUP_DELAY", 0.01)
+    with stub_api(releases=False) as server:
+        # Neither lookup is answered until both are in flight
+        server.rendezvous = threading.Barrier(2, timeout=5)
+        check_updates(REPO_URLS[platform], "0.0.1")
+
+        assert not server.rendezvous.broken
+    assert "v1.9.9" in capsys.readouterr().out
+
+
+def test_check_updates_release_skips_tags(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that the tags are not requested when the release answers."""
+    with stub_api() as server:
+        check_updates(REPO_URLS["github"], "0.0.1")
+
+        assert server.request_count == 1
+    assert "v2.0.0" in capsys.readouterr().out
+
+
+def test_check_updates_remembers_no_releases(
+    capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a repository without releases gets both lookups at once."""
+    monkeypatch.setattr(updates, "SINGLE_FLIGHT_TTL", 0)
+    monkeypatch.setattr(updates, "TAG_LOOKUP_DELAY", 5.0)
+    with stub_api(releases=False) as server:
+        check_updates(REPO_URLS["github"], "0.0.1")
+
+        # Neither lookup is answered until both are in flight
+        server.rendezvous = threading.Barrier(2, timeout=5)
+        check_updates(REPO_URLS["github"], "0.0.1")
+
+        assert not server.rendezvous.broken
+        assert server.request_count == 4
+    assert capsys.readouterr().out.count("v1.9.9") == 2
+
+
+def test_check_updates_forgets_no_releases(
+    capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that the tags are no longer requested once a release is published."""
+    monkeypatch.setattr(updates, "SINGLE_FLIGHT_TTL", 0)
+    with stub_api(releases=False) as server:
+        check_updates(REPO_URLS["github"], "0.0.1")
+        server.releases = True
+        check_updates(REPO_URLS["github"], "0.0.1")
+        check_updates(REPO_URLS["github"], "0.0.1")
+
+        # Two lookups per check until the release is known, then one
+        assert server.request_count == 5
+    assert "v2.0.0" in capsys.readouterr().out
@@ -0,0 +1,24 @@
+import os
+import subprocess
+import sys
+
+
+def test_print_welcome_without_terminal() -> None:
+    """Test that print_welcome falls back to a default width without a TTY."""
+    code: str = (
+        "from core_helpers.utils import print_welcome\n"
+        "print_welcome('my_app', '1.0.0', 'An app', 'https://github.com/a/b')\n"
+    )
+    env: dict[str, str] = {
+        key: value for key, value in os.environ.items() if key != "COLUMNS"
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+    assert "https://github.com/a/b" in result.stdout
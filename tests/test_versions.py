@@ -0,0 +1,56 @@
+from packaging.version import Version
+
+from core_helpers import updates
+from core_helpers.versions import get_latest_version, parse_version
+
+
+def test_parse_version() -> None:
+    assert parse_version("v1.2.3") == Version("1.2.3")
+    assert parse_version("release-2.0") == Version("2.0")
+    assert parse_version("1.0rc1") == Version("1.0rc1")
+    assert parse_version("latest") is None
+    assert parse_version("2024-01-01") is None
+    assert parse_version("") is None
+
+
+def test_parse_version_memoized() -> None:
+    parse_version.cache_clear()
+    assert parse_version("v9.9.9") is parse_version("v9.9.9")
+    assert parse_version.cache_info().hits == 1
+
+
+def test_get_latest_version() -> None:
+    tags: list[str] = ["v1.9.0", "v1.10.0", "v1.2.0", "nightly"]
+    assert get_latest_version(tags) == "v1.10.0"
+    assert get_latest_version(iter(tags)) == "v1.10.0"
+
+
+def test_get_latest_version_non_pep440() -> None:
+    assert get_latest_version(["nightly", "v1.0", "latest"]) == "v1.0"
+    assert get_latest_version(["nightly", "latest"]) is None
+    assert get_latest_version([]) is None
+
+
+def test_get_latest_version_ties() -> None:
+    assert get_latest_version(["1.0", "v1.0", "v1.0.0"]) == "1.0"
+
+
+def test_get_latest_version_prereleases() -> None:
+    tags: list[str] = ["v1.0", "v2.0rc1", "v2.0.dev3"]
+    assert get_latest_version(tags) == "v1.0"
+    assert get_latest_version(tags, prereleases=True) == "v2.0rc1"
+    # Pre-releases are selected when there is no final release
+    assert get_latest_version(["v2.0b1", "v2.0rc1"]) == "v2.0rc1"
+
+
+def test_get_latest_version_postreleases() -> None:
+    tags: list[str] = ["v1.0", "v1.0.post2", "v0.9"]
+    assert get_latest_version(tags) == "v1.0.post2"
+    assert get_latest_version(tags, postreleases=False) == "v1.0"
+    assert get_latest_version(["v1.0.post1"], postreleases=False) == "v1.0.post1"
+
+
+def test_is_newer_version() -> None:
+    assert updates._is_newer_version("1.3.1", "v1.10.0")
+    assert not updates._is_newer_version("1.3.1", "v1.3.1")
+    assert updates._is_newer_version("1.3.1", "Release 1.4.0")